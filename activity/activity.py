@@ -5,6 +5,7 @@ import re
 
 import boto.swf
 import dashboard_queue
+from provider import metrics
 
 """
 Amazon SWF activity base class
@@ -198,6 +199,14 @@ class activity(object):
         shutil.rmtree(tmp_dir)
         self.tmp_dir = None
 
+    @staticmethod
+    def span(name):
+        """
+        Time a step of the activity, the spans are included in
+        the task metrics logged by the worker when the task completes
+        """
+        return metrics.span(name)
+
     @staticmethod
     def emit_monitor_event(settings, item_identifier, version, run, event_type, status, message):
         message = dashboard_queue.build_event_message(item_identifier, version, run, event_type,
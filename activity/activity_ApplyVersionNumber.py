@@ -4,13 +4,13 @@ import os
 import re
 from os import path
 from jats_scraper import jats_scraper
-import boto.s3
 from boto.s3.key import Key
 from boto.s3.connection import S3Connection
 from provider.execution_context import Session
 from provider.article_structure import ArticleInfo
 import provider.article_structure as article_structure
-import provider.s3lib as s3lib
+import provider.bulk_rename as bulk_rename
+import provider.expanded_folder as expanded_folder
 from elifetools import xmlio
 
 """
@@ -65,7 +65,9 @@ class activity_ApplyVersionNumber(activity.activity):
 
             expanded_folder_name = session.get_value(run, 'expanded_folder')
             bucket_folder_name = expanded_folder_name.replace(os.sep, '/')
-            self.rename_article_s3_objects(bucket_folder_name, version)
+            files = self.rename_article_s3_objects(bucket_folder_name, version)
+            # the activities after this one find the renamed files in the manifest
+            expanded_folder.store_manifest(session, run, expanded_folder_name, files)
 
             self.emit_monitor_event(self.settings, article_id, version, run,
                                     self.pretty_name, "end",
@@ -85,7 +87,8 @@ class activity_ApplyVersionNumber(activity.activity):
     def rename_article_s3_objects(self, bucket_folder_name, version):
         """
         Main function to rename article objects on S3
-        and apply the renamed file names to the article XML file
+        and apply the renamed file names to the article XML file,
+        returns the manifest of the renamed files
         """
 
         # Connect to S3 and bucket
@@ -93,10 +96,9 @@ class activity_ApplyVersionNumber(activity.activity):
                                host=self.settings.s3_hostname)
         bucket = s3_conn.lookup(self.expanded_bucket_name)
 
-        # bucket object list
-        s3_key_names = s3lib.get_s3_key_names_from_bucket(
-            bucket=bucket,
-            prefix=bucket_folder_name + "/")
+        # bucket object list, with the ETags to skip files renamed by a previous attempt
+        files = expanded_folder.list_manifest(bucket, bucket_folder_name)
+        s3_key_names = [bucket_folder_name + '/' + name for name in expanded_folder.file_names(files)]
 
         # Get the old name to new name map
         file_name_map = self.build_file_name_map(s3_key_names, version)
@@ -106,14 +108,26 @@ class activity_ApplyVersionNumber(activity.activity):
             self.logger.info('file_name_map: %s' %
                              json.dumps(file_name_map, sort_keys=True, indent=4))
 
-        # rename_s3_objects(old_name_new_name_dict)
-        self.rename_s3_objects(bucket, self.expanded_bucket_name, bucket_folder_name, file_name_map)
+        # rename_s3_objects(old_name_new_name_dict), the old names are kept until the
+        #  article XML links to the new names, a retry still finds them to map
+        report = self.rename_s3_objects(bucket, bucket_folder_name, file_name_map, files)
 
         # rewrite_and_upload_article_xml()
         xml_filename = self.find_xml_filename_in_map(file_name_map)
         self.download_file_from_bucket(bucket, bucket_folder_name, xml_filename)
         self.rewrite_xml_file(xml_filename, file_name_map)
-        self.upload_file_to_bucket(bucket, bucket_folder_name, xml_filename)
+        xml_key = self.upload_file_to_bucket(bucket, bucket_folder_name, xml_filename)
+
+        self.delete_renamed_s3_objects(bucket, bucket_folder_name, report)
+
+        # the renamed files, with the size and ETag of the rewritten article XML
+        renamed_files = [file_info for file_info in
+                         expanded_folder.renamed_manifest(files, file_name_map, report['etags'])
+                         if file_info['name'] != xml_filename]
+        renamed_files.append(expanded_folder.manifest_entry(
+            xml_filename, path.getsize(path.join(self.get_tmp_dir(), xml_filename)),
+            getattr(xml_key, 'etag', None)))
+        return renamed_files
 
     def download_file_from_bucket(self, bucket, bucket_folder_name, filename):
 
@@ -147,6 +161,7 @@ class activity_ApplyVersionNumber(activity.activity):
         key = Key(bucket)
         key.key = key_name
         key.set_contents_from_filename(local_filename)
+        return key
 
 
     def build_file_name_map(self, s3_key_names, version):
@@ -181,23 +196,26 @@ class activity_ApplyVersionNumber(activity.activity):
             new_filename = file_prefix + '-v' + str(version) + '.' + file_extension
         return new_filename
 
-    def rename_s3_objects(self, bucket, bucket_name, bucket_folder_name, file_name_map):
-        # Rename S3 bucket objects directly
-        for old_name, new_name in file_name_map.iteritems():
-            # Do not need to rename if the old and new name are the same
-            if old_name == new_name:
-                continue
-
-            if new_name is not None:
-                old_s3_key = bucket_folder_name + '/' + old_name
-                new_s3_key = bucket_folder_name + '/' + new_name
-
-                # copy old key to new key
-                key = bucket.copy_key(new_s3_key, bucket_name, old_s3_key)
-                if isinstance(key, boto.s3.key.Key):
-                    # delete old key
-                    old_key = bucket.delete_key(old_s3_key)
-
+    def rename_s3_objects(self, bucket, bucket_folder_name, file_name_map, files):
+        # Copy S3 bucket objects to their new names directly
+        report = bulk_rename.copy_keys(bucket, bucket_folder_name, file_name_map, files,
+                                       self.logger)
+        if report['failed']:
+            raise RuntimeError("Failed to rename %s files: %s" %
+                               (len(report['failed']), report['failed']))
+        return report
+
+    def delete_renamed_s3_objects(self, bucket, bucket_folder_name, report):
+        # Delete the old names of the S3 bucket objects copied by rename_s3_objects
+        report = bulk_rename.delete_old_keys(bucket, bucket_folder_name, report, self.logger)
+        if self.logger:
+            self.logger.info("Renamed files in %s: %s copied, %s skipped, %s old keys deleted" %
+                             (bucket_folder_name, len(report['copied']), len(report['skipped']),
+                              len(report['deleted'])))
+        if report['failed']:
+            raise RuntimeError("Failed to delete %s renamed files: %s" %
+                               (len(report['failed']), report['failed']))
+        return report
 
     def find_xml_filename_in_map(self, file_name_map):
         for old_name, new_name in file_name_map.iteritems():
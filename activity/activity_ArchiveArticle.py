@@ -3,12 +3,11 @@ import log
 import json
 import boto
 import random
-import zipfile
 from datetime import datetime
 import os
-from boto.s3.key import Key
 from boto.s3.connection import S3Connection
 import settings as settings_lib
+from provider import zip_stream
 
 """
 activity_PostEIF.py activity
@@ -47,46 +46,22 @@ class activity_ArchiveArticle(activity.activity):
             updated_date = datetime.strptime(update_date_string, "%Y-%m-%dT%H:%M:%SZ")
             status = data['status'].lower()
 
-            # download expanded folder
             conn = S3Connection(self.settings.aws_access_key_id,
                                 self.settings.aws_secret_access_key)
             source_bucket = conn.get_bucket(self.settings.publishing_buckets_prefix +
-                                            self.settings.expanded_bucket)
-            tmp = self.get_tmp_dir()
+                                            self.settings.expanded_bucket, validate=False)
             name = ("elife-" + id + '-' + status + '-v' + version
                     + '-' + updated_date.strftime('%Y%m%d%H%M%S'))
-            zip_dir = tmp + os.sep + name
-            os.makedirs(zip_dir)
             folderlist = source_bucket.list(prefix=expanded_folder.replace(os.sep, '/'))
-            for key in folderlist:
-                save_path = zip_dir + os.sep + os.path.basename(key.name)
-                key.get_contents_to_filename(save_path)
-
-            # rename downloaded folder
-            zip_path = tmp + os.sep + name + '.zip'
-            # zip expanded folder
-            zf = zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED, allowZip64=True)
-            relroot = os.path.abspath(os.path.join(zip_dir, os.pardir))
-            for root, dirs, files in os.walk(zip_dir):
-                # add directory (needed for empty dirs)
-                zf.write(root, os.path.relpath(root, zip_dir))
-                for f in files:
-                    filename = os.path.join(root, f)
-                    if os.path.isfile(filename):
-                        # Archive file name, effectively make the
-                        # zip_dir the root directory by stripping it from the file name f
-                        arcname = root.rstrip(zip_dir) + f
-                        zf.write(filename, arcname)
-            zf.close()
-
-            # upload zip to archive bucket
-            output_bucket = self.settings.publishing_buckets_prefix + self.settings.archive_bucket
-            destination = conn.get_bucket(output_bucket)
-            destination_key = Key(destination)
-            destination_key.key = name + '.zip'
-            destination_key.set_contents_from_filename(zip_path)
 
-            self.clean_tmp_dir()
+            # zip the expanded folder into the archive bucket as it is downloaded
+            output_bucket = self.settings.publishing_buckets_prefix + self.settings.archive_bucket
+            destination = conn.get_bucket(output_bucket, validate=False)
+            report = zip_stream.archive_keys(folderlist, destination, name + '.zip', self.logger)
+            if self.logger:
+                self.logger.info("Archived %s files, %s bytes, to %s/%s.zip in %s bytes" %
+                                 (report['files'], report['bytes_in'], output_bucket, name,
+                                  report['bytes_out']))
 
         except Exception as e:
             self.logger.exception("Exception when archiving article. Message:" + e.message)
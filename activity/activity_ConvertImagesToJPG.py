@@ -56,18 +56,30 @@ class activity_ConvertImagesToJPG(activity.activity):
                             "download": "yes"
                         }}
 
-            for file_name in figures:
-                figure_resource = orig_resource + "/" + file_name
-                file_path = self.get_tmp_dir() + os.sep + file_name
-                file_pointer = storage_context.get_resource_to_file_pointer(figure_resource, file_path)
-
-                cdn_bucket_name = self.settings.publishing_buckets_prefix + self.settings.ppp_cdn_bucket
-                cdn_resource_path = storage_provider + cdn_bucket_name + "/" + article_id + "/"
-
-                publish_locations = [cdn_resource_path]
-
-                image_conversion.generate_images(self.settings, formats, file_pointer, article_structure.ArticleInfo(file_name),
-                                                 publish_locations, self.logger)
+            cdn_bucket_name = self.settings.publishing_buckets_prefix + self.settings.ppp_cdn_bucket
+            cdn_resource_path = storage_provider + cdn_bucket_name + "/" + article_id + "/"
+
+            publish_locations = [cdn_resource_path]
+
+            # one process per core unless settings say otherwise, 1 converts in this process
+            processes = getattr(self.settings, 'image_conversion_processes', None)
+            if processes == 1:
+                for file_name in figures:
+                    figure_resource = orig_resource + "/" + file_name
+                    file_path = self.get_tmp_dir() + os.sep + file_name
+                    file_pointer = storage_context.get_resource_to_file_pointer(figure_resource, file_path)
+
+                    image_conversion.generate_images(self.settings, formats, file_pointer, article_structure.ArticleInfo(file_name),
+                                                     publish_locations, self.logger)
+            else:
+                def download(file_name):
+                    file_path = self.get_tmp_dir() + os.sep + file_name
+                    storage_context.get_resource_to_file_pointer(
+                        orig_resource + "/" + file_name, file_path).close()
+                    return file_path
+
+                image_conversion.convert_figures(self.settings, formats, figures, download,
+                                                 publish_locations, self.logger, processes)
 
             self.emit_monitor_event(self.settings, article_id, version, run, self.pretty_name, "end",
                                     "Finished converting images for " + article_id + ": " +
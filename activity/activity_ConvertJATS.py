@@ -5,7 +5,7 @@ from jats_scraper import jats_scraper
 from boto.s3.key import Key
 from boto.s3.connection import S3Connection
 from provider.execution_context import Session
-from provider.article_structure import ArticleInfo
+import provider.expanded_folder as expanded_folder
 
 """
 ConvertJATS.py activity
@@ -50,10 +50,11 @@ class activity_ConvertJATS(activity.activity):
 
             conn = S3Connection(self.settings.aws_access_key_id,
                                 self.settings.aws_secret_access_key)
-            bucket = conn.get_bucket(expanded_folder_bucket)
+            bucket = conn.get_bucket(expanded_folder_bucket, validate=False)
 
             bucket_folder_name = expanded_folder_name
-            (xml_key, xml_filename) = self.get_article_xml_key(bucket, bucket_folder_name)
+            (xml_key, xml_filename) = self.get_article_xml_key(bucket, bucket_folder_name,
+                                                               session, run)
             if xml_key is None:
                 self.logger.error("Article XML path not found")
                 return False
@@ -79,7 +80,7 @@ class activity_ConvertJATS(activity.activity):
             output_name = xml_filename.replace('.xml', '.json')
             output_bucket = self.settings.publishing_buckets_prefix + self.settings.eif_bucket
             output_path = output_folder + '/' + output_name
-            destination = conn.get_bucket(output_bucket)
+            destination = conn.get_bucket(output_bucket, validate=False)
             destination_key = Key(destination)
             output_key = output_path
             destination_key.key = output_key
@@ -109,15 +110,20 @@ class activity_ConvertJATS(activity.activity):
         return True
 
     @staticmethod
-    def get_article_xml_key(bucket, expanded_folder_name):
-        files = bucket.list(expanded_folder_name + "/", "/")
-        for bucket_file in files:
-            key = bucket.get_key(bucket_file.key)
-            filename = key.name.rsplit('/', 1)[1]
-            info = ArticleInfo(filename)
-            if info.file_type == 'ArticleXML':
-                return key, filename
-        return None
+    def get_article_xml_key(bucket, expanded_folder_name, session=None, run=None):
+        """
+        Find the article XML file by its name in the expanded folder manifest, from the
+        session when given, otherwise from one LIST request, and return its key
+        without requesting it
+        """
+        if session is not None:
+            files = expanded_folder.get_manifest(session, run, bucket, expanded_folder_name)
+        else:
+            files = expanded_folder.list_manifest(bucket, expanded_folder_name)
+        xml_filename = expanded_folder.article_xml_file_name(files)
+        if xml_filename is None:
+            return None, None
+        return Key(bucket, expanded_folder_name + '/' + xml_filename), xml_filename
 
     def add_update_date_to_json(self, json_string, update_date, xml_filename=None):
         """
@@ -3,8 +3,10 @@ import json
 from provider.execution_context import Session
 from provider.storage_provider import StorageContext
 import provider.glencoe_check as glencoe_check
+import provider.endpoint_check as endpoint_check
 import os
-import requests
+import tempfile
+from multiprocessing.pool import ThreadPool
 
 
 """
@@ -12,6 +14,13 @@ activity_CopyGlencoeStillImages.py activity
 """
 
 
+# still images held in memory up to this size while they are uploaded
+SPOOL_SIZE = 5 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+# still images copied at the same time
+POOL_SIZE = 10
+
+
 class ValidationException(RuntimeError):
     pass
 
@@ -124,40 +133,64 @@ class activity_CopyGlencoeStillImages(activity.activity):
 
 
     def store_jpgs(self, glencoe_jpgs, article_id):
-        cdn_still_jpgs = []
-        for jpg in glencoe_jpgs:
-            jpg_filename = self.store_file(jpg, article_id)
-            cdn_still_jpgs.append(jpg_filename)
-        return cdn_still_jpgs
+        """
+        Copy the still images to the CDN concurrently, skipping the stills
+        already there with the same size, and return their CDN file names
+        """
+        storage_context = StorageContext(self.settings)
+        http_session = endpoint_check.session()
+        cdn_sizes = storage_context.list_resource_sizes(self.cdn_folder(article_id))
+        pool = ThreadPool(min(POOL_SIZE, len(glencoe_jpgs)))
+        try:
+            return pool.map(
+                lambda jpg: self.store_file(jpg, article_id, storage_context, http_session, cdn_sizes),
+                glencoe_jpgs)
+        finally:
+            pool.close()
+            pool.join()
+            http_session.close()
+
+    def cdn_folder(self, article_id):
+        return self.settings.storage_provider + "://" + \
+               self.settings.publishing_buckets_prefix + self.settings.ppp_cdn_bucket + "/" + \
+               article_id
 
     def s3_resources(self, path, article_id):
         filename = os.path.split(path)[1]
         filename = glencoe_check.force_article_id(filename, article_id)
-        cdn = self.settings.storage_provider + "://" + \
-               self.settings.publishing_buckets_prefix + self.settings.ppp_cdn_bucket + "/" + \
-               article_id + "/" + filename
+        cdn = self.cdn_folder(article_id) + "/" + filename
         return cdn
 
-    def store_file(self, path, article_id):
-        storage_context = StorageContext(self.settings)
-        r = requests.get(path)
-        if r.status_code == 200:
+    def store_file(self, path, article_id, storage_context=None, http_session=None, cdn_sizes=None):
+        if storage_context is None:
+            storage_context = StorageContext(self.settings)
+        r = endpoint_check.request('get', path, self.logger, http_session, stream=True)
+        try:
+            if r.status_code != 200:
+                raise RuntimeError("Glencoe returned a %s status code for %s" % (r.status_code, path))
             resource = self.s3_resources(path, article_id)
-            self.logger.info("S3 resource: " + resource)
             jpg_filename = os.path.split(resource)[-1]
-            storage_context.set_resource_from_string(resource, r.content,
-                                                     content_type=r.headers['content-type'])
-            return jpg_filename
-        else:
-            raise RuntimeError("Glencoe returned a %s status code for %s" % (r.status_code, path))
 
+            content_length = r.headers.get('content-length')
+            if (cdn_sizes and content_length is not None and
+                    cdn_sizes.get(jpg_filename) == int(content_length)):
+                self.logger.info("S3 resource already in the CDN: " + resource)
+                return jpg_filename
+
+            self.logger.info("S3 resource: " + resource)
+            with tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE) as jpg_file:
+                for chunk in r.iter_content(CHUNK_SIZE):
+                    jpg_file.write(chunk)
+                jpg_file.seek(0)
+                storage_context.set_resource_from_file(
+                    resource, jpg_file, metadata={'Content-Type': r.headers['content-type']})
+            return jpg_filename
+        finally:
+            r.close()
 
     def list_files_from_cdn(self, article_id):
         storage_context = StorageContext(self.settings)
-        article_path_in_cdn = self.settings.storage_provider + "://" + \
-                              self.settings.publishing_buckets_prefix + self.settings.ppp_cdn_bucket + "/" + \
-                              article_id
-        return storage_context.list_resources(article_path_in_cdn)
+        return storage_context.list_resources(self.cdn_folder(article_id))
 
     def validate_jpgs_against_cdn(self, cdn_all_files, cdn_still_jpgs, article_id):
         """checks that for each element of cdn_still_jpgs there are two files in the CDN.
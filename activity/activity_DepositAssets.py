@@ -4,6 +4,8 @@ from provider.execution_context import Session
 from provider.storage_provider import StorageContext
 from mimetypes import guess_type
 from provider import article_structure
+from provider import bulk_copy
+from provider import expanded_folder
 
 """
 DepositAssets.py activity
@@ -46,8 +48,13 @@ class activity_DepositAssets(activity.activity):
             storage_context = StorageContext(self.settings)
             storage_provider = self.settings.storage_provider + "://"
 
-            orig_resource = storage_provider + expanded_folder_bucket + "/" + expanded_folder_name
-            files_in_bucket = storage_context.list_resources(orig_resource)
+            files = expanded_folder.load_manifest(session, run, expanded_folder_name)
+            if files is not None:
+                orig_etags = expanded_folder.file_etags(files)
+            else:
+                orig_resource = storage_provider + expanded_folder_bucket + "/" + expanded_folder_name
+                orig_etags = storage_context.list_resource_etags(orig_resource)
+            files_in_bucket = sorted(orig_etags.keys())
 
             # filter figures that have already been copied (see DepositIngestAssets activity)
             pre_ingest_assets = article_structure.pre_ingest_assets(files_in_bucket)
@@ -59,14 +66,19 @@ class activity_DepositAssets(activity.activity):
 
             no_download_extensions = self.get_no_download_extensions(self.settings.no_download_extensions)
 
-            for file_name in other_assets:
-                orig_resource = storage_provider + expanded_folder_bucket + "/" + expanded_folder_name + "/"
-                dest_resource = storage_provider + cdn_bucket_name + "/" + article_id + "/"
+            orig_resource = storage_provider + expanded_folder_bucket + "/" + expanded_folder_name + "/"
+            dest_resource = storage_provider + cdn_bucket_name + "/" + article_id + "/"
 
-                storage_context.copy_resource(orig_resource + file_name, dest_resource + file_name)
+            # files already deposited with the same content are not copied again
+            dest_etags = dict(
+                (dest_resource + file_name, etag) for file_name, etag in
+                storage_context.list_resource_etags(dest_resource[:-1]).items())
 
-                if self.logger:
-                    self.logger.info("Uploaded file %s to %s" % (file_name, cdn_bucket_name))
+            copies = []
+            for file_name in other_assets:
+                etag = orig_etags[file_name]
+                copies.append(bulk_copy.Copy(orig_resource + file_name, dest_resource + file_name,
+                                             etag=etag))
 
                 file_name_no_extension, extension = file_name.rsplit('.', 1)
                 if extension not in no_download_extensions:
@@ -77,13 +89,26 @@ class activity_DepositAssets(activity.activity):
                     file_download = file_name_no_extension + "-download." + extension
 
                     # file is copied with additional metadata
-                    storage_context.copy_resource(orig_resource + file_name,
-                                                  dest_resource + file_download,
-                                                  additional_dict_metadata=dict_metadata)
+                    copies.append(bulk_copy.Copy(orig_resource + file_name,
+                                                 dest_resource + file_download,
+                                                 additional_dict_metadata=dict_metadata,
+                                                 etag=etag))
+
+            report = bulk_copy.copy_resources(storage_context, copies, dest_etags, self.logger)
+            if self.logger:
+                self.logger.info("Deposited assets to %s: %s copied, %s skipped, %s failed" %
+                                 (cdn_bucket_name, len(report['copied']),
+                                  len(report['skipped']), len(report['failed'])))
+
+            if report['failed']:
+                raise RuntimeError("%s of %s assets failed to copy: %s" %
+                                   (len(report['failed']), len(copies), report['failed']))
 
             self.emit_monitor_event(self.settings, article_id, version, run,
                                     self.pretty_name, "end",
-                                    "Deposited assets for article " + article_id)
+                                    "Deposited assets for article " + article_id + ": " +
+                                    str(len(report['copied'])) + " copied, " +
+                                    str(len(report['skipped'])) + " already deposited")
 
         except Exception as e:
             self.logger.exception("Exception when Depositing assets")
@@ -8,6 +8,7 @@ from collections import namedtuple
 import requests
 import glob
 import re
+from multiprocessing.pool import ThreadPool
 
 import activity
 
@@ -17,11 +18,25 @@ from boto.s3.connection import S3Connection
 import provider.simpleDB as dblib
 import provider.article as articlelib
 import provider.s3lib as s3lib
+import provider.outbox as outbox
+import provider.endpoint_check as endpoint_check
 
 """
 DepositCrossref activity
 """
 
+# articles in one Crossref deposit file, unless settings.crossref_batch_size says otherwise
+BATCH_SIZE = 50
+# article XML files parsed at the same time
+PARSE_POOL_SIZE = 4
+# Crossref can take a while to accept a large deposit
+DEPOSIT_TIMEOUT = (5, 300)
+# a deposit is only posted again when Crossref cannot have received it, a read timeout
+#  or a gateway timeout may have been deposited
+DEPOSIT_RETRY_EXCEPTIONS = (requests.exceptions.ConnectionError,)
+DEPOSIT_RETRY_STATUS_CODES = (502, 503)
+
+
 class activity_DepositCrossref(activity.activity):
 
     def __init__(self, settings, logger, conn=None, token=None, activity_task=None):
@@ -205,43 +220,65 @@ class activity_DepositCrossref(activity.activity):
 
     def generate_crossref_xml(self):
         """
-        Using the POA generateCrossrefXml module
+        Using the POA generateCrossrefXml module, parse the article XML files
+        in parallel and generate one Crossref deposit per batch of approved articles
         """
-        article_xml_files = glob.glob(self.elife_poa_lib.settings.STAGING_TO_HW_DIR + "/*.xml")
-
-        for xml_file in article_xml_files:
-            generate_status = True
-
-            # Convert the single value to a list for processing
-            xml_files = [xml_file]
-            article_list = self.parse_article_xml(xml_files)
-
-            if len(article_list) == 0:
-                self.article_not_published_file_names.append(xml_file)
-                continue
-            else:
-                article = article_list[0]
-
-            if self.approve_to_generate(article) is not True:
-                generate_status = False
-            else:
-                try:
-                    # Will write the XML to the TMP_DIR
-                    self.elife_poa_lib.generate.build_crossref_xml_for_articles(article_list)
-                except:
+        article_xml_files = sorted(glob.glob(self.elife_poa_lib.settings.STAGING_TO_HW_DIR + "/*.xml"))
+        if not article_xml_files:
+            return True
 
-                    generate_status = False
+        # Load the published dates of the v2, v3 etc. files once, not in each thread
+        if any(xml_file.find('v') > -1 for xml_file in article_xml_files):
+            self.article.get_article_bucket_published_dates()
 
-            if generate_status is True:
-                # Add filename to the list of published files
-                self.article_published_file_names.append(xml_file)
+        # Convert each single value to a list for processing
+        pool = ThreadPool(min(PARSE_POOL_SIZE, len(article_xml_files)))
+        try:
+            article_lists = pool.map(lambda xml_file: self.parse_article_xml([xml_file]),
+                                     article_xml_files)
+        finally:
+            pool.close()
+            pool.join()
+
+        approved = []
+        for xml_file, article_list in zip(article_xml_files, article_lists):
+            if len(article_list) > 0 and self.approve_to_generate(article_list[0]) is True:
+                approved.append((xml_file, article_list[0]))
             else:
                 # Add the file to the list of not published articles, may be used later
                 self.article_not_published_file_names.append(xml_file)
 
+        batch_size = getattr(self.settings, 'crossref_batch_size', None) or BATCH_SIZE
+        for index in range(0, len(approved), batch_size):
+            batch = approved[index:index + batch_size]
+            if not self.build_crossref_xml(batch) and len(batch) > 1:
+                # One article can fail a whole batch, the others are generated on their own
+                for xml_file_article in batch:
+                    self.build_crossref_xml([xml_file_article])
+
         # Any files generated is a sucess, even if one failed
         return True
 
+    def build_crossref_xml(self, batch):
+        """
+        Generate one Crossref deposit for a batch of (XML file name, article) and record
+        the file names as published or not published, returns whether it was generated
+        """
+        xml_files = [xml_file for xml_file, article in batch]
+        try:
+            # Will write the XML to the TMP_DIR
+            self.elife_poa_lib.generate.build_crossref_xml_for_articles(
+                [article for xml_file, article in batch])
+        except:
+            if self.logger:
+                self.logger.exception("Failed to generate Crossref XML for %s" % xml_files)
+            if len(batch) == 1:
+                self.article_not_published_file_names += xml_files
+            return False
+        # Add filenames to the list of published files
+        self.article_published_file_names += xml_files
+        return True
+
     def approve_to_generate(self, article):
         """
         Given an article object, decide if crossref deposit should be
@@ -308,13 +345,19 @@ class activity_DepositCrossref(activity.activity):
                    'login_passwd': self.settings.crossref_login_passwd
                   }
 
-        # Crossref XML, should be only one but check for multiple
+        # Crossref XML, one file per batch of articles
         xml_files = glob.glob(sub_dir + file_type)
 
+        http_session = endpoint_check.session()
         for xml_file in xml_files:
-            files = {'file': open(xml_file, 'rb')}
+            # read once so a retry posts the whole file again
+            with open(xml_file, 'rb') as open_file:
+                files = {'file': (os.path.basename(xml_file), open_file.read())}
 
-            r = requests.post(url, data=payload, files=files)
+            r = endpoint_check.request('post', url, self.logger, http_session,
+                                       retry_status_codes=DEPOSIT_RETRY_STATUS_CODES,
+                                       retry_exceptions=DEPOSIT_RETRY_EXCEPTIONS,
+                                       timeout=DEPOSIT_TIMEOUT, data=payload, files=files)
 
             # Check for good HTTP status code
             if r.status_code != 200:
@@ -381,38 +424,9 @@ class activity_DepositCrossref(activity.activity):
         # Move only the published files from the S3 outbox to the published folder
         bucket_name = self.publish_bucket
 
-        # Connect to S3 and bucket
-        s3_conn = S3Connection(self.settings.aws_access_key_id,
-                               self.settings.aws_secret_access_key)
-        bucket = s3_conn.lookup(bucket_name)
-
-        # Concatenate the expected S3 outbox file names
-        s3_key_names = []
-        for name in self.article_published_file_names:
-            filename = name.split(os.sep)[-1]
-            s3_key_name = self.outbox_folder + filename
-            s3_key_names.append(s3_key_name)
-
-        for name in s3_key_names:
-            # Download objects from S3 and save to disk
-
-            # Do not delete the from_folder itself, if it is in the list
-            if name != self.outbox_folder:
-                filename = name.split("/")[-1]
-                new_s3_key_name = to_folder + filename
-
-                # First copy
-                new_s3_key = None
-                try:
-                    new_s3_key = bucket.copy_key(new_s3_key_name, bucket_name, name)
-                except:
-                    pass
-
-                # Then delete the old key if successful
-                if isinstance(new_s3_key, boto.s3.key.Key):
-                    old_s3_key = bucket.get_key(name)
-                    old_s3_key.delete()
-
+        s3_key_names = outbox.outbox_key_names(self.outbox_folder, self.article_published_file_names)
+        bucket = outbox.get_bucket(self.settings, bucket_name)
+        return outbox.move_keys(bucket, s3_key_names, to_folder, self.logger)
 
     def upload_crossref_xml_to_s3(self):
         """
@@ -15,6 +15,7 @@ import requests
 from provider.storage_provider import StorageContext
 from provider.article_structure import ArticleInfo
 import provider.lax_provider as lax_provider
+import provider.expanded_folder as expanded_folder
 
 """
 ExpandArticle.py activity
@@ -49,28 +50,28 @@ class activity_ExpandArticle(activity.activity):
 
         session = Session(self.settings)
 
-        filename_last_element = session.get_value(run, 'filename_last_element')
+        filename_last_element, version = session.get_values(
+            run, ['filename_last_element', 'version'])
         # zip name contains version information for previously archived zip files
         article_structure = ArticleInfo(filename_last_element)
         article_id = article_structure.article_id
-        session.store_value(run, 'article_id', article_id)
-        session.store_value(run, 'file_name', info.file_name)
+        session_values = {'article_id': article_id, 'file_name': info.file_name}
 
         if self.logger:
             self.logger.info("Expanding file %s" % info.file_name)
 
-        version = session.get_value(run, 'version')
-
         status = article_structure.status
         if status is None or (status != 'vor' and status != 'poa'):
+            session.store_values(run, session_values)
             self.logger.error("Name '%s' did not match expected pattern for status" %
                               filename_last_element)
             return activity.activity.ACTIVITY_PERMANENT_FAILURE  # status could not be determined, exit workflow.
 
         article_version_id = article_id + '.' + version
-        session.store_value(run, 'article_version_id', article_version_id)
-        session.store_value(run, 'run', run)
-        session.store_value(run, 'status', status)
+        session_values.update({'article_version_id': article_version_id,
+                               'run': run,
+                               'status': status})
+        session.store_values(run, session_values)
         self.emit_monitor_event(self.settings, article_id, version, run, "Expand Article", "start",
                                 "Starting expansion of article " + article_id)
 
@@ -78,16 +79,17 @@ class activity_ExpandArticle(activity.activity):
         try:
             # download zip to temp folder
             tmp = self.get_tmp_dir()
-            local_zip_file = self.open_file_from_tmp_dir(filename_last_element, mode='wb')
-            storage_resource_origin = self.settings.storage_provider + "://" + info.bucket_name + "/" + info.file_name
-            storage_context.get_resource_to_file(storage_resource_origin, local_zip_file)
-            local_zip_file.close()
+            with self.span('download'):
+                local_zip_file = self.open_file_from_tmp_dir(filename_last_element, mode='wb')
+                storage_resource_origin = self.settings.storage_provider + "://" + info.bucket_name + "/" + info.file_name
+                storage_context.get_resource_to_file(storage_resource_origin, local_zip_file)
+                local_zip_file.close()
 
             # extract zip contents
             folder_name = path.join(article_version_id, run)
             content_folder = path.join(tmp, folder_name)
             makedirs(content_folder)
-            with ZipFile(path.join(tmp, filename_last_element)) as zf:
+            with self.span('extract'), ZipFile(path.join(tmp, filename_last_element)) as zf:
                 zf.extractall(content_folder)
 
             upload_filenames = []
@@ -97,16 +99,23 @@ class activity_ExpandArticle(activity.activity):
             self.check_filenames(upload_filenames)
 
             bucket_folder_name = article_version_id + '/' + run
-            for filename in upload_filenames:
-                source_path = path.join(content_folder, filename)
-                dest_path = bucket_folder_name + '/' + filename
-                storage_resource_dest = self.settings.storage_provider + "://" + self.settings.publishing_buckets_prefix + \
-                                        self.settings.expanded_bucket + "/" + dest_path
-                storage_context.set_resource_from_filename(storage_resource_dest, source_path)
+            # the manifest of the uploaded files saves later activities listing the folder
+            manifest = []
+            with self.span('upload'):
+                for filename in upload_filenames:
+                    source_path = path.join(content_folder, filename)
+                    dest_path = bucket_folder_name + '/' + filename
+                    storage_resource_dest = self.settings.storage_provider + "://" + self.settings.publishing_buckets_prefix + \
+                                            self.settings.expanded_bucket + "/" + dest_path
+                    key = storage_context.set_resource_from_filename(storage_resource_dest, source_path)
+                    manifest.append(expanded_folder.manifest_entry(
+                        filename, path.getsize(source_path), getattr(key, 'etag', None)))
 
             self.clean_tmp_dir()
 
-            session.store_value(run, 'expanded_folder', bucket_folder_name)
+            session.store_values(run, {
+                'expanded_folder': bucket_folder_name,
+                expanded_folder.SESSION_KEY: expanded_folder.manifest_value(bucket_folder_name, manifest)})
             self.emit_monitor_event(self.settings, article_id, version, run, "Expand Article",
                                     "end", "Finished expansion of article " + article_id +
                                     " for version " + version + " run " + str(run) +
@@ -14,6 +14,7 @@ import provider.article as articlelib
 import provider.s3lib as s3lib
 import provider.blacklist as blacklist
 import provider.lax_provider as lax_provider
+import provider.outbox as outbox
 
 import dateutil.parser
 """
@@ -420,19 +421,22 @@ class activity_PubRouterDeposit(activity.activity):
         blank_article = self.create_article()
         # Remove based on published status
 
+        # Look up the status of all the articles in Lax at once
+        statuses = lax_provider.article_statuses(
+            [article.doi_id for article in articles], self.settings)
+
         for article in articles:
             # Article object knows if it is POA or not
             is_poa = article.is_poa
-            # Need to check S3 for whether the DOI was ever POA
-            #  using the blank article object to hopefully make only one S3 connection
-            was_ever_poa = lax_provider.was_ever_poa(article.doi_id, self.settings)
+            status = statuses[article.doi_id]
+            # Need to check Lax for whether the DOI was ever POA
+            was_ever_poa = status['was_ever_poa']
 
             # Set the value on the article object for later, it is useful
             article.was_ever_poa = was_ever_poa
 
             # Now can check if published
-            is_published = blank_article.check_is_article_published(
-                article.doi, is_poa, was_ever_poa)
+            is_published = lax_provider.is_published(status, is_poa, was_ever_poa)
             if is_published is not True:
                 if self.logger:
                     log_info = "Removing because it is not published " + article.doi
@@ -528,14 +532,6 @@ class activity_PubRouterDeposit(activity.activity):
         # Move only the published files from the S3 outbox to the published folder
         bucket_name = self.publish_bucket
 
-        # Connect to S3 and bucket
-        s3_conn = S3Connection(self.settings.aws_access_key_id,
-                               self.settings.aws_secret_access_key)
-        bucket = s3_conn.lookup(bucket_name)
-
-        # Concatenate the expected S3 outbox file names
-        s3_key_names = []
-
         # Compile a list of the published file names
         remove_doi_list = []
         processed_file_names = []
@@ -546,30 +542,9 @@ class activity_PubRouterDeposit(activity.activity):
             if k in remove_doi_list:
                 processed_file_names.append(v)
 
-        for name in processed_file_names:
-            filename = name.split(os.sep)[-1]
-            s3_key_name = self.outbox_folder + filename
-            s3_key_names.append(s3_key_name)
-
-        for name in s3_key_names:
-            # Download objects from S3 and save to disk
-
-            # Do not delete the from_folder itself, if it is in the list
-            if name != self.outbox_folder:
-                filename = name.split("/")[-1]
-                new_s3_key_name = to_folder + filename
-
-                # First copy
-                new_s3_key = None
-                try:
-                    new_s3_key = bucket.copy_key(new_s3_key_name, bucket_name, name)
-                except:
-                    pass
-
-                # Then delete the old key if successful
-                if isinstance(new_s3_key, boto.s3.key.Key):
-                    old_s3_key = bucket.get_key(name)
-                    old_s3_key.delete()
+        s3_key_names = outbox.outbox_key_names(self.outbox_folder, processed_file_names)
+        bucket = outbox.get_bucket(self.settings, bucket_name)
+        return outbox.move_keys(bucket, s3_key_names, to_folder, self.logger)
 
     def is_article_on_blacklist(self, doi_id, workflow):
         """
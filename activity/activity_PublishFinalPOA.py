@@ -23,6 +23,7 @@ from boto.s3.connection import S3Connection
 import provider.s3lib as s3lib
 import provider.simpleDB as dblib
 import provider.lax_provider as lax_provider
+import provider.outbox as outbox
 
 """
 PublishFinalPOA activity
@@ -815,27 +816,9 @@ class activity_PublishFinalPOA(activity.activity):
         """
         Move files from S3 outbox to the published folder
         """
-        bucket_name = self.input_bucket
-
-        # Connect to S3 and bucket
-        s3_conn = S3Connection(self.settings.aws_access_key_id, self.settings.aws_secret_access_key)
-        bucket = s3_conn.lookup(bucket_name)
-
-        for file_name in outbox_files:
-            old_s3_key_name = self.outbox_folder + file_name
-            new_s3_key_name = published_folder_name + file_name
-
-            # First copy
-            new_s3_key = None
-            try:
-                new_s3_key = bucket.copy_key(new_s3_key_name, bucket_name, old_s3_key_name)
-            except:
-                pass
-
-            # Then delete the old key if successful
-            if isinstance(new_s3_key, boto.s3.key.Key):
-                old_s3_key = bucket.get_key(old_s3_key_name)
-                old_s3_key.delete()
+        bucket = outbox.get_bucket(self.settings, self.input_bucket)
+        s3_key_names = outbox.outbox_key_names(self.outbox_folder, outbox_files)
+        return outbox.move_keys(bucket, s3_key_names, published_folder_name, self.logger)
 
 
     def get_filename_from_path(self, f, extension):
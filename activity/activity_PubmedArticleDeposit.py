@@ -18,6 +18,7 @@ import provider.simpleDB as dblib
 import provider.article as articlelib
 import provider.s3lib as s3lib
 import provider.lax_provider as lax_provider
+import provider.outbox as outbox
 
 """
 PubmedArticleDeposit activity
@@ -213,11 +214,12 @@ class activity_PubmedArticleDeposit(activity.activity):
 
         return articles
 
-    def get_article_version_from_lax(self, article_id):
+    def get_article_version_from_lax(self, status):
         """
-        Temporary fix to set the version of the article if available
+        Temporary fix to set the version of the article if available,
+        from its lax_provider.article_status
         """
-        version = lax_provider.article_highest_version(article_id, self.settings)
+        version = status['highest_version']
         if version is None:
             return "-1"
         return version
@@ -230,38 +232,35 @@ class activity_PubmedArticleDeposit(activity.activity):
 
         articles = self.parse_article_xml(article_xml_files)
 
+        # Look up the status of all the articles in Lax at once
+        statuses = lax_provider.article_statuses(
+            [self.article.get_doi_id(article.doi) for article in articles if article.doi],
+            self.settings)
+
         # For each VoR article, set was_ever_poa property
         published_articles = []
 
         for article in articles:
 
             xml_file_name = self.xml_file_to_doi_map[article.doi]
+            status = statuses.get(self.article.get_doi_id(article.doi)) if article.doi else None
 
             # Check if article was ever poa
             # Must be set to True or False to get it published
             if article.doi and article.doi == '10.7554/eLife.11190':
                 # Edge case, ignore this article PoA
                 article.was_ever_poa = False
-            elif (article.is_poa is False and
-                  lax_provider.was_ever_poa(self.article.get_doi_id(article.doi),
-                                            self.settings) is True):
-                article.was_ever_poa = True
-            elif (article.is_poa is False and
-                  lax_provider.was_ever_poa(self.article.get_doi_id(article.doi),
-                                            self.settings) is False):
-                article.was_ever_poa = False
+            elif article.is_poa is False and status and status['was_ever_poa'] is not None:
+                article.was_ever_poa = status['was_ever_poa']
 
             # Check if each article is published
-            if self.article.check_is_article_published(
-                    doi=article.doi,
+            if status and lax_provider.is_published(
+                    status,
                     is_poa=article.is_poa,
                     was_ever_poa=article.was_ever_poa) is True:
 
                 # Try to add the article version if in lax
-                try:
-                    version = self.get_article_version_from_lax(article.doi.split('.')[-1])
-                except:
-                    version = None
+                version = self.get_article_version_from_lax(status)
                 if version and version > 0:
                     article.version = version
 
@@ -377,37 +376,9 @@ class activity_PubmedArticleDeposit(activity.activity):
         # Move only the published files from the S3 outbox to the published folder
         bucket_name = self.publish_bucket
 
-        # Connect to S3 and bucket
-        s3_conn = S3Connection(self.settings.aws_access_key_id,
-                               self.settings.aws_secret_access_key)
-        bucket = s3_conn.lookup(bucket_name)
-
-        # Concatenate the expected S3 outbox file names
-        s3_key_names = []
-        for name in self.article_published_file_names:
-            filename = name.split(os.sep)[-1]
-            s3_key_name = self.outbox_folder + filename
-            s3_key_names.append(s3_key_name)
-
-        for name in s3_key_names:
-            # Download objects from S3 and save to disk
-
-            # Do not delete the from_folder itself, if it is in the list
-            if name != self.outbox_folder:
-                filename = name.split("/")[-1]
-                new_s3_key_name = to_folder + filename
-
-                # First copy
-                new_s3_key = None
-                try:
-                    new_s3_key = bucket.copy_key(new_s3_key_name, bucket_name, name)
-                except:
-                    pass
-
-                # Then delete the old key if successful
-                if isinstance(new_s3_key, boto.s3.key.Key):
-                    old_s3_key = bucket.get_key(name)
-                    old_s3_key.delete()
+        s3_key_names = outbox.outbox_key_names(self.outbox_folder, self.article_published_file_names)
+        bucket = outbox.get_bucket(self.settings, bucket_name)
+        return outbox.move_keys(bucket, s3_key_names, to_folder, self.logger)
 
     def upload_pubmed_xml_to_s3(self):
         """
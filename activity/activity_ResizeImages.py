@@ -13,6 +13,7 @@ from boto.s3.key import Key
 from provider.article_structure import ArticleInfo
 from provider.execution_context import Session
 from provider.storage_provider import StorageContext
+import provider.expanded_folder as expanded_folder
 
 """
 ResizeImages.py activity
@@ -60,16 +61,15 @@ class activity_ResizeImages(activity.activity):
 
             # get information on files in the expanded article bucket for notified zip file
             bucket_folder_name = expanded_folder_name
-            bucket, file_infos = self.get_file_infos(bucket_folder_name)
+            bucket, file_infos = self.get_file_infos(session, run, bucket_folder_name)
 
             image_count = 0
             for file_info in file_infos:
                 image_count += 1
-                key = bucket.get_key(file_info.key)
-                # see : http://stackoverflow.com/questions/9954521/s3-boto-list-keys-sometimes-returns-directory-key
-                if not key.name.endswith("/"):
-                    # process each key in the folder
-                    self.process_key(key, cdn_path)
+                # the manifest has the size, there is no need to request the key
+                key = Key(bucket, bucket_folder_name + '/' + file_info['name'])
+                key.size = file_info['size']
+                self.process_key(key, cdn_path)
             self.emit_monitor_event(self.settings, article_id, version, run, "Resize Images", "end",
                                     "Finished converting images for " + article_id + ": " +
                                     str(image_count) + " images processed ")
@@ -85,16 +85,16 @@ class activity_ResizeImages(activity.activity):
             return activity.activity.ACTIVITY_PERMANENT_FAILURE
         return activity.activity.ACTIVITY_SUCCESS
 
-    def get_file_infos(self, folder_name):
+    def get_file_infos(self, session, run, folder_name):
         # connect to S3 and obtain the expanded article bucket
         self.conn = S3Connection(self.settings.aws_access_key_id,
                                  self.settings.aws_secret_access_key,
                                  host=self.settings.s3_hostname)
         bucket = self.conn.get_bucket(self.settings.publishing_buckets_prefix +
-                                      self.settings.expanded_bucket)
+                                      self.settings.expanded_bucket, validate=False)
 
-        # get the keys for the files in the folder and return along with a reference to the bucket
-        file_infos = bucket.list(folder_name + "/", "/")
+        # the files in the folder come from the manifest, the folder is listed only if there is none
+        file_infos = expanded_folder.get_manifest(session, run, bucket, folder_name)
         return bucket, file_infos
 
     def process_key(self, key, cdn_path):
@@ -57,7 +57,8 @@ class activity_ScheduleCrossref(activity.activity):
                                 "Starting scheduling of crossref deposit for " + article_id)
 
         try:
-            (xml_key, xml_filename) = ConvertJATS.get_article_xml_key(bucket, expanded_folder_name)
+            (xml_key, xml_filename) = ConvertJATS.get_article_xml_key(bucket, expanded_folder_name,
+                                                                      session, run)
 
             # Rename the XML file to match what is used already
             new_key_name = self.new_crossref_xml_name(
@@ -1,9 +1,8 @@
 import activity
 from boto.s3.connection import S3Connection
-import tempfile
-from github import Github
 from github import GithubException
 import provider.lax_provider as lax_provider
+import provider.github_sync as github_sync
 from provider.storage_provider import StorageContext
 
 """
@@ -59,27 +58,24 @@ class activity_UpdateRepository(activity.activity):
                 s3_file_path = data['article_id'] + "/" + xml_file
 
                 #download xml
-                with tempfile.TemporaryFile(mode='r+') as tmp:
-                    storage_context = StorageContext(self.settings)
-                    storage_provider = self.settings.storage_provider + "://"
-                    published_path = storage_provider + self.settings.publishing_buckets_prefix + \
-                                       self.settings.ppp_cdn_bucket
+                storage_context = StorageContext(self.settings)
+                storage_provider = self.settings.storage_provider + "://"
+                published_path = storage_provider + self.settings.publishing_buckets_prefix + \
+                                   self.settings.ppp_cdn_bucket
 
-                    resource = published_path + "/" + s3_file_path
+                resource = published_path + "/" + s3_file_path
 
-                    storage_context.get_resource_to_file(resource, tmp)
+                file_content = storage_context.get_resource_as_string(resource)
 
-                    file_content = storage_context.get_resource_as_string(resource)
+                message = self.update_github(self.settings.git_repo_path + xml_file, file_content)
 
-                    message = self.update_github(self.settings.git_repo_path + xml_file, file_content)
-
-                    self.logger.info(message)
-                    self.emit_monitor_event(self.settings, data['article_id'], data['version'], data['run'],
-                                    self.pretty_name, "end",
-                                    "Finished Updating repository for article. Details: " + message)
-                    return True
+                self.logger.info(message)
+                self.emit_monitor_event(self.settings, data['article_id'], data['version'], data['run'],
+                                self.pretty_name, "end",
+                                "Finished Updating repository for article. Details: " + message)
+                return True
 
-            except RetryException as e:
+            except (RetryException, github_sync.ConflictException) as e:
                 self.logger.info(e.message)
                 return activity.activity.ACTIVITY_TEMPORARY_FAILURE
 
@@ -94,40 +90,21 @@ class activity_UpdateRepository(activity.activity):
 
     def update_github(self, repo_file, content):
 
-        g = Github(self.settings.github_token)
-        user = g.get_user('elifesciences')
-        article_xml_repo = user.get_repo(self.settings.git_repo_name)
+        sync = github_sync.get_sync(self.settings, self.logger)
+        exists = github_sync.tree_path(repo_file) in sync.blob_shas()
 
         try:
-            xml_file = article_xml_repo.get_contents(repo_file)
+            #only commits when there are changes
+            paths, commit_sha = sync.commit_files({repo_file: content},
+                                                  "Updates xml" if exists else "Creates XML")
         except GithubException as e:
-            self.logger.info("GithubException - description: " + e.message)
-            self.logger.info("GithubException: file " + repo_file + " may not exist in github yet. We will try to add it in the repo.")
-            try:
-                response = article_xml_repo.create_file(repo_file, "Creates XML", content)
-            except GithubException as e:
-                self._retry_or_cancel(e)
-            return "File " + repo_file + " successfully added. Commit: " + str(response)
+            self.logger.info("Exception: file " + repo_file + ". Error: " + str(e))
+            self._retry_or_cancel(e)
 
-        except Exception as e:
-            self.logger.info("Exception: file " + repo_file + ". Error: " + e.message)
-            raise
-
-        try:
-            #check for changes first
-            if content == xml_file.decoded_content:
-                return "No changes in file " + repo_file
-
-            #there are changes
-            try:
-                response = article_xml_repo.update_file(repo_file , "Updates xml", content, xml_file.sha)
-            except GithubException as e:
-                self._retry_or_cancel(e)
-            return "File " + repo_file + " successfully updated. Commit: " + str(response)
-
-        except Exception as e:
-            self.logger.info("Exception: file " + repo_file + ". Error: " + e.message)
-            raise
+        if not paths:
+            return "No changes in file " + repo_file
+        return ("File " + repo_file + " successfully " + ("updated" if exists else "added") +
+                ". Commit: " + str(commit_sha))
 
     def _retry_or_cancel(self, e):
         if e.status == 409:
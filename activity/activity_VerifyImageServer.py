@@ -4,7 +4,8 @@ from provider.execution_context import Session
 from provider.storage_provider import StorageContext
 import provider.article_structure as article_structure
 import provider.iiif as iiif
-import requests
+import provider.endpoint_check as endpoint_check
+import time
 
 """
 activity_VerifyImageServer.py activity
@@ -55,14 +56,16 @@ class activity_VerifyImageServer(activity.activity):
 
             iiif_path_for_article = self.settings.iiif_resolver.replace('{article_id}', article_id)
 
+            start = time.time()
             results = self.retrieve_endpoints_check(original_figures, iiif_path_for_article)
+            report = endpoint_check.report(results, start)
+            self.logger.info("IIIF endpoints checked: %s" % json.dumps(report))
 
-            bad_images = list(filter(lambda x: x[0] == False, results))
-
-            if len(bad_images) > 0:
+            if len(report['failed']) > 0:
                 # print endpoints that did not work
                 self.emit_monitor_event(self.settings, article_id, version, run, self.pretty_name, "error",
-                                        "Some images are not available through the IIIF endpoint: " + str(bad_images))
+                                        "%s of %s images are not available through the IIIF endpoint: %s" %
+                                        (len(report['failed']), report['checked'], report['failed']))
 
                 return activity.activity.ACTIVITY_PERMANENT_FAILURE
 
@@ -78,5 +81,5 @@ class activity_VerifyImageServer(activity.activity):
             return activity.activity.ACTIVITY_PERMANENT_FAILURE
 
     def retrieve_endpoints_check(self, original_figures, iiif_path_for_article):
-        return list(map(lambda fig: iiif.try_endpoint(iiif.endpoint(self.settings, iiif_path_for_article, fig), self.logger),
-                        original_figures))
\ No newline at end of file
+        endpoints = [iiif.endpoint(self.settings, iiif_path_for_article, fig) for fig in original_figures]
+        return iiif.try_endpoints(endpoints, self.logger)
@@ -0,0 +1,57 @@
+import os
+import zipfile
+from StringIO import StringIO
+
+"""
+Build synthetic article zip files for the benchmark, based on the test
+article 00353 with a configurable number of figures and video size
+"""
+
+FILES_SOURCE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                            'tests', 'files_source')
+TEST_DATA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                         'tests', 'test_data')
+
+ARTICLE_ID = '00353'
+ZIP_FILE_NAME = 'elife-00353-vor-v1-20121213000000.zip'
+
+
+def read_file(path):
+    with open(path, 'rb') as open_file:
+        return open_file.read()
+
+
+def article_files(figures=10, video_bytes=0, supplements=0):
+    """
+    Return a list of (file name, data) for a synthetic article. Figures reuse the
+    test TIFF image, the video and supplementary files are filled with
+    incompressible bytes so they behave like real media in a zip
+    """
+    files = [
+        ('elife-00353-v1.xml', read_file(os.path.join(FILES_SOURCE, 'elife-00353-v1.xml'))),
+        ('elife-00353-v1.pdf', read_file(os.path.join(FILES_SOURCE, 'elife-00353-v1.pdf')))
+    ]
+    figure_data = read_file(os.path.join(FILES_SOURCE, 'elife-00353-fig1-v1.tif'))
+    for number in range(1, figures + 1):
+        files.append(('elife-00353-fig%s-v1.tif' % number, figure_data))
+    if video_bytes:
+        files.append(('elife-00353-fig1-video1.mp4', os.urandom(video_bytes)))
+    for number in range(1, supplements + 1):
+        files.append(('elife-00353-supp%s-v1.docx' % number, os.urandom(64 * 1024)))
+    return files
+
+
+def article_zip(figures=10, video_bytes=0, supplements=0):
+    "Return the bytes of an article zip as it would arrive in the production bucket"
+    zip_buffer = StringIO()
+    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED, allowZip64=True) as new_zip:
+        for file_name, data in article_files(figures, video_bytes, supplements):
+            new_zip.writestr(file_name, data)
+    return zip_buffer.getvalue()
+
+
+def poa_outbox_files():
+    "Return a list of (file name, data) of the PoA outbox test files"
+    outbox_dir = os.path.join(TEST_DATA, 'poa', 'outbox')
+    return [(file_name, read_file(os.path.join(outbox_dir, file_name)))
+            for file_name in sorted(os.listdir(outbox_dir))]
@@ -0,0 +1,197 @@
+import json
+import logging
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from optparse import OptionParser, SUPPRESS_HELP
+
+"""
+Benchmark activity hot paths offline against the stand-ins in benchmark.stand_ins
+
+Each scenario runs in its own process so the peak RSS is per activity, for example:
+
+    python benchmark/run.py
+    python benchmark/run.py -s ExpandArticle -s ResizeImages --figures 50 --video-bytes 50000000
+    python benchmark/run.py --compare master HEAD
+"""
+
+HARNESS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(HARNESS_DIR)
+
+
+def run_child(options):
+    """
+    Run a single scenario from the code in options.source and
+    print the measurements as JSON on the last line of output
+    """
+    # import the harness before the code under test takes over the path
+    sys.path.insert(0, HARNESS_DIR)
+    import stand_ins
+    import scenarios
+    sys.path.remove(HARNESS_DIR)
+
+    stand_ins.install()
+    os.chdir(options.source)
+    sys.path.insert(0, options.source)
+
+    logger = logging.getLogger('benchmark')
+    logger.addHandler(logging.NullHandler())
+
+    measurements = {'scenario': options.child, 'status': None}
+    try:
+        activity_name, data = scenarios.SCENARIOS[options.child](options)
+        module_name = 'activity.activity_' + activity_name
+        __import__(module_name)
+        activity_class = getattr(sys.modules[module_name], 'activity_' + activity_name)
+        activity_object = activity_class(scenarios.settings, logger, None, None, None)
+
+        start = time.time()
+        result = activity_object.do_activity(data)
+        measurements['wall_time'] = time.time() - start
+        measurements['status'] = str(result)
+        if 'provider.metrics' in sys.modules:
+            # revisions with instrumentation also report their own task metrics
+            measurements['task_metrics'] = sys.modules['provider.metrics'].current().to_dict()
+    except Exception as e:
+        measurements['status'] = 'error'
+        measurements['error'] = '%s: %s' % (type(e).__name__, str(e).strip().split('\n')[0])
+
+    measurements.update(stand_ins.RECORDER.to_dict())
+    # ru_maxrss is in kilobytes on Linux
+    measurements['peak_rss'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    sys.stdout.write('\n' + json.dumps(measurements) + '\n')
+
+
+def run_scenario(scenario, source, options):
+    "Run a scenario in a child process and return its measurements"
+    args = [sys.executable, os.path.abspath(__file__), '--child', scenario,
+            '--source', source,
+            '--figures', str(options.figures),
+            '--video-bytes', str(options.video_bytes),
+            '--supplements', str(options.supplements),
+            '--folders', str(options.folders)]
+    process = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    stdout, stderr = process.communicate()
+    try:
+        return json.loads(stdout.strip().split('\n')[-1])
+    except ValueError:
+        return {'scenario': scenario, 'status': 'error',
+                'error': (stderr.strip().split('\n') or [''])[-1]}
+
+
+def run_all(source, options):
+    results = []
+    for scenario in options.scenarios:
+        runs = [run_scenario(scenario, source, options) for _ in range(options.repeat)]
+        # report the fastest run, request counts do not change between runs
+        timed = [run for run in runs if 'wall_time' in run]
+        results.append(min(timed, key=lambda run: run['wall_time']) if timed else runs[0])
+    return results
+
+
+def checkout(revision):
+    "Check out a revision into a temporary git worktree and return its path"
+    path = tempfile.mkdtemp(prefix='benchmark-')
+    with open(os.devnull, 'w') as devnull:
+        subprocess.check_call(['git', 'worktree', 'add', '--detach', path, revision],
+                              cwd=REPO_DIR, stdout=devnull, stderr=devnull)
+    return path
+
+
+def remove_checkout(path):
+    shutil.rmtree(path, ignore_errors=True)
+    subprocess.call(['git', 'worktree', 'prune'], cwd=REPO_DIR)
+
+
+def total_bytes(result):
+    return sum(result.get('bytes_in', {}).values()) + sum(result.get('bytes_out', {}).values())
+
+
+def format_result(label, result):
+    if result.get('status') == 'error':
+        return '%-18s %-12s error: %s' % (result['scenario'], label, result.get('error'))
+    requests = ' '.join('%s=%s' % (service, count)
+                        for service, count in sorted(result.get('requests', {}).items()))
+    return '%-18s %-12s %8.3fs %9.1fMB moved %7.1fMB rss  %s' % (
+        result['scenario'], label, result.get('wall_time', 0),
+        total_bytes(result) / 1048576.0, result['peak_rss'] / 1048576.0, requests)
+
+
+def format_delta(base, other):
+    if 'wall_time' not in base or 'wall_time' not in other:
+        return None
+    base_requests = sum(base['requests'].values())
+    other_requests = sum(other['requests'].values())
+    return '%-18s %-12s %+8.1f%% time, %+d requests' % (
+        base['scenario'], 'delta', 100.0 * (other['wall_time'] - base['wall_time']) /
+        max(base['wall_time'], 0.000001), other_requests - base_requests)
+
+
+def main():
+    sys.path.insert(0, HARNESS_DIR)
+    import scenarios
+    sys.path.remove(HARNESS_DIR)
+
+    parser = OptionParser()
+    parser.add_option("-s", "--scenario", action="append", dest="scenarios",
+                      help="scenario to run, can be repeated: " +
+                      ", ".join(sorted(scenarios.SCENARIOS.keys())))
+    parser.add_option("--figures", default=10, type="int", dest="figures",
+                      help="number of figures in the synthetic article")
+    parser.add_option("--video-bytes", default=0, type="int", dest="video_bytes",
+                      help="size of the video file in the synthetic article")
+    parser.add_option("--supplements", default=0, type="int", dest="supplements",
+                      help="number of supplementary files in the synthetic article")
+    parser.add_option("--folders", default=20, type="int", dest="folders",
+                      help="number of article folders in the bucket for S3Monitor")
+    parser.add_option("--repeat", default=1, type="int", dest="repeat",
+                      help="run each scenario this many times and report the fastest")
+    parser.add_option("--source", default=REPO_DIR, dest="source",
+                      help="directory of the code to benchmark")
+    parser.add_option("--compare", nargs=2, dest="compare", metavar="REV_A REV_B",
+                      help="benchmark two git revisions and report the difference")
+    parser.add_option("--json", action="store_true", dest="json", default=False,
+                      help="output the raw measurements as JSON")
+    parser.add_option("--child", dest="child", help=SUPPRESS_HELP)
+    (options, args) = parser.parse_args()
+
+    if options.child:
+        run_child(options)
+        return
+
+    if not options.scenarios:
+        options.scenarios = sorted(scenarios.SCENARIOS.keys())
+
+    if options.compare:
+        results = []
+        for revision in options.compare:
+            path = checkout(revision)
+            try:
+                results.append(run_all(path, options))
+            finally:
+                remove_checkout(path)
+        if options.json:
+            print json.dumps(dict(zip(['a', 'b'], results)), indent=4)
+            return
+        rev_a, rev_b = options.compare
+        for base, other in zip(results[0], results[1]):
+            print format_result(rev_a, base)
+            print format_result(rev_b, other)
+            delta = format_delta(base, other)
+            if delta:
+                print delta
+    else:
+        results = run_all(options.source, options)
+        if options.json:
+            print json.dumps(results, indent=4)
+            return
+        for result in results:
+            print format_result('', result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+import json
+
+import articles
+import stand_ins
+
+"""
+Benchmark scenarios: each one seeds the stand-ins with the data an activity
+expects to find, and returns the activity name and the input data to run it with
+"""
+
+RUN = '1ee54f9a-cb28-4c8e-8232-4b317cf4beda'
+
+
+class settings(object):
+    domain = 'Publish.benchmark'
+    default_task_list = 'DefaultTaskList'
+    setLevel = 'INFO'
+
+    aws_access_key_id = ''
+    aws_secret_access_key = ''
+
+    sqs_region = 'eu-west-1'
+    S3_monitor_queue = 'incoming-queue'
+    event_monitor_queue = 'event-property-incoming-queue'
+    workflow_starter_queue = 'workflow-starter-queue'
+    website_ingest_queue = 'website-ingest-queue'
+
+    storage_provider = 's3'
+    s3_hostname = 's3-eu-west-1.amazonaws.com'
+    publishing_buckets_prefix = 'bench-'
+    production_bucket = 'elife-production-final'
+    eif_bucket = 'elife-publishing-eif'
+    expanded_bucket = 'elife-publishing-expanded'
+    ppp_cdn_bucket = 'elife-publishing-cdn'
+    archive_bucket = 'elife-publishing-archive'
+    bucket = 'elife-articles'
+    bot_bucket = 'elife-bot'
+    poa_bucket = 'elife-ejp-poa-delivery'
+    poa_packaging_bucket = 'elife-poa-packaging'
+    lens_jpg_bucket = 'elife-production-lens-jpg'
+    prefix = ''
+    delimiter = '/'
+
+    simpledb_region = 'eu-west-1'
+    simpledb_domain_postfix = '_benchmark'
+
+    ses_sender_email = 'sender@example.org'
+    ses_poa_sender_email = 'sender@example.org'
+    ses_poa_recipient_email = 'admin@example.org'
+    ses_pmc_sender_email = 'sender@example.org'
+    ses_pmc_recipient_email = 'admin@example.org'
+    ses_pmc_revision_recipient_email = 'admin@example.org'
+
+    PMC_FTP_URI = 'ftp.example.org'
+    PMC_FTP_USERNAME = ''
+    PMC_FTP_PASSWORD = ''
+    PMC_FTP_CWD = ''
+
+    lax_article_versions = 'http://lax.example.org/api/v1/article/10.7554/eLife.{article_id}/version/'
+    verify_ssl = False
+
+    session_class = 'RedisSession'
+    redis_host = '127.0.0.1'
+    redis_port = 6379
+    redis_db = 0
+    redis_expire_key = 86400
+    workflow_context_path = 'workflow-context/'
+
+
+def bucket_name(name):
+    return settings.publishing_buckets_prefix + name
+
+
+def store_session(values):
+    for key, value in values.items():
+        stand_ins.REDIS_STORE[RUN][key] = value
+
+
+def expand_article(options):
+    zip_data = articles.article_zip(options.figures, options.video_bytes, options.supplements)
+    stand_ins.put_object(bucket_name(settings.production_bucket), articles.ZIP_FILE_NAME, zip_data)
+    store_session({'filename_last_element': articles.ZIP_FILE_NAME, 'version': '1'})
+    data = {
+        'run': RUN,
+        'event_name': 'ObjectCreated:Put',
+        'event_time': '2016-06-07T10:45:18.141126Z',
+        'bucket_name': bucket_name(settings.production_bucket),
+        'file_name': articles.ZIP_FILE_NAME,
+        'file_etag': stand_ins.etag_for(zip_data),
+        'file_size': len(zip_data)
+    }
+    return 'ExpandArticle', data
+
+
+def resize_images(options):
+    expanded_folder = articles.ARTICLE_ID + '.1/' + RUN
+    for file_name, file_data in articles.article_files(
+            options.figures, options.video_bytes, options.supplements):
+        stand_ins.put_object(bucket_name(settings.expanded_bucket),
+                             expanded_folder + '/' + file_name, file_data)
+    store_session({'article_id': articles.ARTICLE_ID, 'version': '1',
+                   'expanded_folder': expanded_folder})
+    return 'ResizeImages', {'run': RUN}
+
+
+def pmc_deposit(options):
+    zip_data = articles.article_zip(options.figures, options.video_bytes, options.supplements)
+    stand_ins.put_object(bucket_name(settings.archive_bucket), articles.ZIP_FILE_NAME, zip_data)
+    return 'PMCDeposit', {'data': {'document': articles.ZIP_FILE_NAME}}
+
+
+def publish_final_poa(options):
+    for file_name, file_data in articles.poa_outbox_files():
+        stand_ins.put_object(settings.poa_packaging_bucket, 'outbox/' + file_name, file_data)
+    lax_url = settings.lax_article_versions.split('{article_id}')[0]
+    stand_ins.HTTP_ROUTES[lax_url] = (404, json.dumps({}))
+    return 'PublishFinalPOA', {}
+
+
+def s3_monitor(options):
+    # one folder per article, each holding the article files
+    for number in range(options.folders):
+        for file_name, file_data in articles.article_files(figures=options.figures):
+            stand_ins.put_object(settings.bucket, '%05d/%s' % (number, file_name), '')
+    return 'S3Monitor', {'data': {'bucket': settings.bucket}}
+
+
+SCENARIOS = {
+    'ExpandArticle': expand_article,
+    'ResizeImages': resize_images,
+    'PMCDeposit': pmc_deposit,
+    'PublishFinalPOA': publish_final_poa,
+    'S3Monitor': s3_monitor,
+}
@@ -0,0 +1,559 @@
+import hashlib
+import json
+import uuid
+from collections import defaultdict
+
+import boto.resultset
+import boto.s3.key
+import boto.s3.bucket
+import boto.s3.prefix
+import boto.s3.multidelete
+import boto.sqs.message
+import requests
+from mock import patch
+
+"""
+In-memory stand-ins for S3, SQS, SimpleDB, SWF, Redis, FTP and HTTP endpoints
+used by the benchmark harness. Every call that would be a network round trip
+is counted in a Recorder, along with the bytes moved, so runs can be compared
+without touching AWS.
+"""
+
+# Keep hold of the real boto classes before any patching happens
+BotoKey = boto.s3.key.Key
+BotoBucket = boto.s3.bucket.Bucket
+
+
+class Recorder(object):
+    """
+    Count requests and bytes per service
+    """
+    def __init__(self):
+        self.requests = defaultdict(int)
+        self.operations = defaultdict(int)
+        self.bytes_in = defaultdict(int)
+        self.bytes_out = defaultdict(int)
+
+    def call(self, service, operation, bytes_in=0, bytes_out=0):
+        self.requests[service] += 1
+        self.operations[service + '.' + operation] += 1
+        self.bytes_in[service] += bytes_in
+        self.bytes_out[service] += bytes_out
+
+    def to_dict(self):
+        return {
+            'requests': dict(self.requests),
+            'operations': dict(self.operations),
+            'bytes_in': dict(self.bytes_in),
+            'bytes_out': dict(self.bytes_out)
+        }
+
+
+RECORDER = Recorder()
+
+# bucket name -> {key name: (data, metadata)}
+S3_STORE = defaultdict(dict)
+# queue name -> list of message bodies
+SQS_STORE = defaultdict(list)
+# domain name -> {item name: attributes}
+SDB_STORE = defaultdict(dict)
+# hash name -> {field: value}
+REDIS_STORE = defaultdict(dict)
+# url prefix -> (status_code, body)
+HTTP_ROUTES = {}
+
+
+def etag_for(data):
+    return '"%s"' % hashlib.md5(data).hexdigest()
+
+
+def key_name(name):
+    "storage_provider builds key names with a leading slash"
+    return name.lstrip('/') if name else name
+
+
+def put_object(bucket_name, name, data, metadata=None):
+    "Seed an object into the S3 stand-in without counting a request"
+    S3_STORE[bucket_name][key_name(name)] = (data, dict(metadata or {}))
+
+
+# S3
+
+class FakeS3Connection(object):
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def get_bucket(self, bucket_name, validate=True, headers=None):
+        if validate:
+            RECORDER.call('s3', 'ListObjects')
+        return FakeBucket(self, bucket_name)
+
+    def lookup(self, bucket_name, validate=True, headers=None):
+        return self.get_bucket(bucket_name, validate, headers)
+
+    def create_bucket(self, bucket_name, *args, **kwargs):
+        RECORDER.call('s3', 'CreateBucket')
+        S3_STORE[bucket_name]
+        return FakeBucket(self, bucket_name)
+
+
+class FakeKey(BotoKey):
+
+    def _objects(self):
+        return S3_STORE[self.bucket.name]
+
+    def _load(self, data, metadata):
+        self.size = len(data)
+        self.etag = etag_for(data)
+        self.metadata = dict(metadata)
+        self.content_type = metadata.get('Content-Type', self.content_type)
+        self.last_modified = '2018-01-01T00:00:00.000Z'
+
+    def _data(self):
+        data, metadata = self._objects()[key_name(self.name)]
+        return data
+
+    def get_contents_as_string(self, *args, **kwargs):
+        data = self._data()
+        RECORDER.call('s3', 'GetObject', bytes_in=len(data))
+        return data
+
+    def get_contents_to_file(self, fp, *args, **kwargs):
+        fp.write(self.get_contents_as_string())
+
+    def get_file(self, fp, *args, **kwargs):
+        self.get_contents_to_file(fp)
+
+    def get_contents_to_filename(self, filename, *args, **kwargs):
+        with open(filename, 'wb') as fp:
+            self.get_contents_to_file(fp)
+
+    def set_contents_from_string(self, string_data, *args, **kwargs):
+        if isinstance(string_data, unicode):
+            string_data = string_data.encode('utf-8')
+        metadata = dict(self.metadata)
+        if self.content_type and self.content_type != self.DefaultContentType:
+            metadata['Content-Type'] = self.content_type
+        RECORDER.call('s3', 'PutObject', bytes_out=len(string_data))
+        self._objects()[key_name(self.name)] = (string_data, metadata)
+        self._load(string_data, metadata)
+        return len(string_data)
+
+    def set_contents_from_file(self, fp, *args, **kwargs):
+        return self.set_contents_from_string(fp.read())
+
+    def set_contents_from_filename(self, filename, *args, **kwargs):
+        with open(filename, 'rb') as fp:
+            return self.set_contents_from_file(fp)
+
+    def exists(self, headers=None):
+        RECORDER.call('s3', 'HeadObject')
+        return key_name(self.name) in self._objects()
+
+    def delete(self, headers=None):
+        return self.bucket.delete_key(self.name)
+
+    def copy(self, dst_bucket, dst_key, metadata=None, *args, **kwargs):
+        return self.bucket.connection.get_bucket(dst_bucket, validate=False).copy_key(
+            dst_key, self.bucket.name, self.name, metadata=metadata)
+
+
+class FakeBucket(BotoBucket):
+    def __init__(self, connection=None, name=None, key_class=FakeKey):
+        BotoBucket.__init__(self, connection, name, key_class)
+
+    def _objects(self):
+        return S3_STORE[self.name]
+
+    def _key(self, name):
+        data, metadata = self._objects()[name]
+        key = FakeKey(self, name)
+        key._load(data, metadata)
+        return key
+
+    def new_key(self, key_name=None):
+        return FakeKey(self, key_name)
+
+    def get_key(self, name, headers=None, version_id=None, response_headers=None, validate=True):
+        if not validate:
+            return FakeKey(self, name)
+        RECORDER.call('s3', 'HeadObject')
+        if key_name(name) not in self._objects():
+            return None
+        return self._key(key_name(name))
+
+    def _listing(self, prefix='', delimiter='', marker=''):
+        prefix = prefix or ''
+        results = []
+        prefixes = set()
+        for name in sorted(self._objects().keys()):
+            if not name.startswith(prefix) or (marker and name <= marker):
+                continue
+            rest = name[len(prefix):]
+            if delimiter and delimiter in rest:
+                common = prefix + rest.split(delimiter, 1)[0] + delimiter
+                if common not in prefixes:
+                    prefixes.add(common)
+                    results.append(boto.s3.prefix.Prefix(self, common))
+                continue
+            results.append(self._key(name))
+        return results
+
+    def list(self, prefix='', delimiter='', marker='', headers=None, encoding_type=None):
+        results = self._listing(prefix, delimiter, marker)
+        # one LIST per page of 1000 results
+        for page in range(0, max(len(results), 1), 1000):
+            RECORDER.call('s3', 'ListObjects')
+        return iter(results)
+
+    def get_all_keys(self, headers=None, **params):
+        RECORDER.call('s3', 'ListObjects')
+        max_keys = int(params.get('max_keys', 1000))
+        results = self._listing(params.get('prefix', ''), params.get('delimiter', ''),
+                                params.get('marker', ''))
+        result_set = boto.resultset.ResultSet()
+        result_set.extend(results[:max_keys])
+        result_set.is_truncated = len(results) > max_keys
+        return result_set
+
+    def copy_key(self, new_key_name, src_bucket_name, src_key_name, metadata=None, *args, **kwargs):
+        data, src_metadata = S3_STORE[src_bucket_name][key_name(src_key_name)]
+        RECORDER.call('s3', 'CopyObject')
+        new_metadata = dict(metadata) if metadata is not None else dict(src_metadata)
+        self._objects()[key_name(new_key_name)] = (data, new_metadata)
+        return self._key(key_name(new_key_name))
+
+    def delete_key(self, name, headers=None, version_id=None, mfa_token=None):
+        RECORDER.call('s3', 'DeleteObject')
+        self._objects().pop(key_name(name), None)
+
+    def delete_keys(self, keys, quiet=False, mfa_token=None, headers=None):
+        result = boto.s3.multidelete.MultiDeleteResult(self)
+        keys = list(keys)
+        for page in range(0, len(keys), 1000):
+            RECORDER.call('s3', 'DeleteObjects')
+        for key in keys:
+            name = key if isinstance(key, basestring) else key.name
+            self._objects().pop(key_name(name), None)
+            result.deleted.append(boto.s3.multidelete.Deleted(key=name))
+        return result
+
+
+# SQS
+
+class FakeQueue(object):
+    def __init__(self, name):
+        self.name = name
+        self.message_class = boto.sqs.message.Message
+
+    def set_message_class(self, message_class):
+        self.message_class = message_class
+
+    def _message(self, body):
+        message = self.message_class(self)
+        # bodies are stored already encoded, as SQS would return them
+        message.set_body(message.decode(body))
+        message.id = str(uuid.uuid4())
+        message.receipt_handle = message.id
+        return message
+
+    def write(self, message, delay_seconds=None):
+        body = message.get_body_encoded()
+        RECORDER.call('sqs', 'SendMessage', bytes_out=len(body))
+        SQS_STORE[self.name].append(body)
+        return message
+
+    def write_batch(self, messages):
+        RECORDER.call('sqs', 'SendMessageBatch')
+        for message_id, body, delay_seconds in messages:
+            SQS_STORE[self.name].append(body)
+        return {'results': [{'id': m[0]} for m in messages], 'errors': []}
+
+    def get_messages(self, num_messages=1, visibility_timeout=None, attributes=None,
+                     wait_time_seconds=None, message_attributes=None):
+        RECORDER.call('sqs', 'ReceiveMessage')
+        bodies = SQS_STORE[self.name][:num_messages]
+        del SQS_STORE[self.name][:num_messages]
+        return [self._message(body) for body in bodies]
+
+    def read(self, visibility_timeout=None, wait_time_seconds=None, message_attributes=None):
+        messages = self.get_messages(1, visibility_timeout, wait_time_seconds=wait_time_seconds)
+        return messages[0] if messages else None
+
+    def delete_message(self, message):
+        RECORDER.call('sqs', 'DeleteMessage')
+        return True
+
+    def delete_message_batch(self, messages):
+        RECORDER.call('sqs', 'DeleteMessageBatch')
+        return {'results': [{'id': m.id} for m in messages], 'errors': []}
+
+    def change_message_visibility_batch(self, messages):
+        RECORDER.call('sqs', 'ChangeMessageVisibilityBatch')
+        return {'results': [], 'errors': []}
+
+    def count(self, *args, **kwargs):
+        RECORDER.call('sqs', 'GetQueueAttributes')
+        return len(SQS_STORE[self.name])
+
+
+class FakeSQSConnection(object):
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def get_queue(self, queue_name, owner_acct_id=None):
+        RECORDER.call('sqs', 'GetQueueUrl')
+        return FakeQueue(queue_name)
+
+    def delete_message(self, queue, message):
+        return queue.delete_message(message)
+
+    def change_message_visibility(self, queue, receipt_handle, visibility_timeout):
+        RECORDER.call('sqs', 'ChangeMessageVisibility')
+        return True
+
+
+def fake_sqs_connect_to_region(region_name, **kwargs):
+    return FakeSQSConnection()
+
+
+# SimpleDB
+
+class FakeItem(dict):
+    def __init__(self, domain, name, attrs=None):
+        dict.__init__(self, attrs or {})
+        self.domain = domain
+        self.name = name
+
+    def add_value(self, key, value):
+        self[key] = value
+
+    def save(self, replace=True):
+        self.domain.put_attributes(self.name, dict(self), replace)
+
+
+class FakeDomain(object):
+    def __init__(self, connection, name):
+        self.connection = connection
+        self.name = name
+
+    def get_item(self, item_name, consistent_read=False):
+        RECORDER.call('sdb', 'GetAttributes')
+        attrs = SDB_STORE[self.name].get(item_name)
+        if attrs is None:
+            return None
+        return FakeItem(self, item_name, attrs)
+
+    def put_attributes(self, item_name, attributes, replace=True, expected_value=None):
+        RECORDER.call('sdb', 'PutAttributes')
+        SDB_STORE[self.name].setdefault(item_name, {}).update(attributes)
+        return True
+
+    def delete_attributes(self, item_name, attributes=None, expected_values=None):
+        RECORDER.call('sdb', 'DeleteAttributes')
+        SDB_STORE[self.name].pop(item_name, None)
+        return True
+
+    def select(self, query='', next_token=None, consistent_read=False, max_items=None):
+        "Queries are not evaluated, every item in the domain is returned"
+        RECORDER.call('sdb', 'Select')
+        if 'count(*)' in query:
+            return [FakeItem(self, 'Domain', {'Count': str(len(SDB_STORE[self.name]))})]
+        return [FakeItem(self, name, attrs) for name, attrs in SDB_STORE[self.name].items()]
+
+
+class FakeSDBConnection(object):
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def get_domain(self, domain_name, validate=True):
+        if validate:
+            RECORDER.call('sdb', 'Select')
+        return FakeDomain(self, domain_name)
+
+    def lookup(self, domain_name, validate=True):
+        return self.get_domain(domain_name, validate)
+
+    def create_domain(self, domain_name):
+        RECORDER.call('sdb', 'CreateDomain')
+        return FakeDomain(self, domain_name)
+
+
+def fake_sdb_connect_to_region(region_name, **kwargs):
+    return FakeSDBConnection()
+
+
+# SWF
+
+class FakeLayer1(object):
+    """
+    Every SWF API call is counted, and answered with an empty result
+    """
+    responses = {
+        'start_workflow_execution': lambda: {'runId': str(uuid.uuid4())},
+        'count_closed_workflow_executions': lambda: {'count': 0, 'truncated': False},
+        'count_open_workflow_executions': lambda: {'count': 0, 'truncated': False},
+        'list_closed_workflow_executions': lambda: {'executionInfos': []},
+        'list_open_workflow_executions': lambda: {'executionInfos': []},
+    }
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+
+        def call(*args, **kwargs):
+            RECORDER.call('swf', name)
+            response = self.responses.get(name)
+            return response() if response else {}
+        return call
+
+
+# Redis
+
+class FakePipeline(object):
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def __getattr__(self, name):
+        method = getattr(FakeRedis, name)
+
+        def queue(*args, **kwargs):
+            self.commands.append((method, args, kwargs))
+            return self
+        return queue
+
+    def execute(self):
+        RECORDER.call('redis', 'pipeline')
+        results = [method(self.redis, *args, **kwargs) for method, args, kwargs in self.commands]
+        self.commands = []
+        return results
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.commands = []
+
+
+class FakeRedis(object):
+    """
+    Commands run directly are counted as one round trip each,
+    commands run in a pipeline are counted when it is executed
+    """
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __getattribute__(self, name):
+        attribute = object.__getattribute__(self, name)
+        if name in ('hset', 'hget', 'hmset', 'hmget', 'hgetall', 'expire', 'delete'):
+            def call(*args, **kwargs):
+                RECORDER.call('redis', name)
+                return attribute(*args, **kwargs)
+            return call
+        return attribute
+
+    def hset(self, name, key, value):
+        REDIS_STORE[name][key] = str(value)
+        return 1
+
+    def hget(self, name, key):
+        return REDIS_STORE[name].get(key)
+
+    def hmset(self, name, mapping):
+        for key, value in mapping.items():
+            REDIS_STORE[name][key] = str(value)
+        return True
+
+    def hmget(self, name, keys, *args):
+        return [REDIS_STORE[name].get(key) for key in list(keys) + list(args)]
+
+    def hgetall(self, name):
+        return dict(REDIS_STORE[name])
+
+    def expire(self, name, time):
+        return True
+
+    def delete(self, *names):
+        for name in names:
+            REDIS_STORE.pop(name, None)
+        return len(names)
+
+    def pipeline(self, transaction=True, shard_hint=None):
+        return FakePipeline(self)
+
+
+def fake_redis_connection_pool(*args, **kwargs):
+    return None
+
+
+# FTP
+
+class FakeFTP(object):
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+
+        def call(*args, **kwargs):
+            RECORDER.call('ftp', name)
+        return call
+
+    def storbinary(self, command, fp, blocksize=8192, *args, **kwargs):
+        RECORDER.call('ftp', 'storbinary', bytes_out=len(fp.read()))
+
+    def storlines(self, command, fp, *args, **kwargs):
+        RECORDER.call('ftp', 'storlines', bytes_out=len(fp.read()))
+
+
+# HTTP
+
+def fake_http_request(session, method, url, **kwargs):
+    """
+    Answer requests from HTTP_ROUTES by the longest matching url prefix,
+    or an empty JSON object
+    """
+    data = kwargs.get('data') or ''
+    status_code, body = 200, '{}'
+    matches = [prefix for prefix in HTTP_ROUTES if url.startswith(prefix)]
+    if matches:
+        status_code, body = HTTP_ROUTES[max(matches, key=len)]
+    if not isinstance(body, basestring):
+        body = json.dumps(body)
+    RECORDER.call('http', method.upper(), bytes_in=len(body),
+                  bytes_out=len(data) if isinstance(data, basestring) else 0)
+    response = requests.models.Response()
+    response.status_code = status_code
+    response.reason = 'OK' if status_code == 200 else 'Stand-in'
+    response.url = url
+    response._content = body
+    return response
+
+
+def install():
+    """
+    Replace the AWS, Redis, FTP and HTTP client classes with the stand-ins.
+    Must be called before the code under test is imported, because modules
+    bind names such as S3Connection when they are imported.
+    Returns the started patchers
+    """
+    patchers = [
+        patch('boto.s3.connection.S3Connection', FakeS3Connection),
+        patch('boto.s3.key.Key', FakeKey),
+        patch('boto.s3.bucket.Bucket', FakeBucket),
+        patch('boto.sqs.connect_to_region', fake_sqs_connect_to_region),
+        patch('boto.sdb.connect_to_region', fake_sdb_connect_to_region),
+        patch('boto.swf.layer1.Layer1', FakeLayer1),
+        patch('redis.StrictRedis', FakeRedis),
+        patch('redis.ConnectionPool', fake_redis_connection_pool),
+        patch('ftplib.FTP', FakeFTP),
+        patch('requests.sessions.Session.request', fake_http_request),
+    ]
+    for patcher in patchers:
+        patcher.start()
+    return patchers
@@ -1,6 +1,10 @@
 import calendar
+import os
+import random
+import threading
 import time
 import importlib
+from multiprocessing.pool import ThreadPool
 from optparse import OptionParser
 
 import settings as settingsLib
@@ -9,254 +13,195 @@ import boto.swf
 import boto.s3
 from boto.s3.connection import S3Connection
 
+import log
 import provider.swfmeta as swfmetalib
+import provider.execution_history as execution_history
+import provider.pending_work as pending_work
+from provider import process
+from provider.cron_schedule import Job, due_jobs, seconds_to_next_minute
 import starter
+from starter import starter_helper
 
 import newrelic.agent
 
 """
 SWF cron
+
+Run once per invocation, or as a daemon with --daemon evaluating the schedule every minute
 """
 
-def run_cron(settings):
-
-    current_time = time.gmtime()
-
-    # Based on the minutes of the current time, run certain starters
-    if current_time.tm_min >= 0 and current_time.tm_min <= 59:
-        # Jobs to start at any time during the hour
-
-        workflow_conditional_start(
-            settings=settings,
-            starter_name="cron_FiveMinute",
-            workflow_id="cron_FiveMinute",
-            start_seconds=60 * 3)
-
-    # Based on the minutes of the current time, run certain starters
-    if current_time.tm_min >= 0 and current_time.tm_min <= 29:
-        # Jobs to start at the top of the hour
-        #print "Top of the hour"
-
-        #workflow_conditional_start(
-        #  settings           = settings,
-        #  starter_name  = "starter_S3Monitor",
-        #  workflow_id   = "S3Monitor",
-        #  start_seconds = 60*31)
-
-        workflow_conditional_start(
-            settings=settings,
-            starter_name="starter_DepositCrossref",
-            workflow_id="DepositCrossref",
-            start_seconds=60 * 31)
-
-    elif current_time.tm_min >= 30 and current_time.tm_min <= 59:
-        # Jobs to start at the bottom of the hour
-        #print "Bottom of the hour"
-
-        # POA Publish once per day 12:30 UTC
-        #  Set to 11:30 UTC during British Summer Time for 12:30 local UK time
-        if current_time.tm_hour == 11:
-            workflow_conditional_start(
-                settings=settings,
-                starter_name="starter_PublishPOA",
-                workflow_id="PublishPOA",
-                start_seconds=60 * 31)
-
-        # POA bucket polling
-        workflow_conditional_start(
-            settings=settings,
-            starter_name="starter_S3Monitor",
-            workflow_id="S3Monitor_POA",
-            start_seconds=60 * 31)
-
-        # PMC deposits once per day 20:30 UTC
-        if current_time.tm_hour == 20:
-            workflow_conditional_start(
-                settings=settings,
-                starter_name="starter_PubRouterDeposit",
-                workflow_id="PubRouterDeposit_PMC",
-                start_seconds=60 * 31)
-
-        # Web of Science deposits once per day 21:30 UTC
-        if current_time.tm_hour == 21:
-            workflow_conditional_start(
-                settings=settings,
-                starter_name="starter_PubRouterDeposit",
-                workflow_id="PubRouterDeposit_WoS",
-                start_seconds=60 * 31)
-
-        # Scopus deposits once per day 22:30 UTC
-        if current_time.tm_hour == 22:
-            workflow_conditional_start(
-                settings=settings,
-                starter_name="starter_PubRouterDeposit",
-                workflow_id="PubRouterDeposit_Scopus",
-                start_seconds=60 * 31)
-
-    if current_time.tm_min >= 45 and current_time.tm_min <= 59:
-        # Bottom quarter of the hour
-
-        # POA Package once per day 11:45 UTC
-        # Set to 10:45 UTC during British Summer Time for 11:45 local UK time
-        if current_time.tm_hour == 10:
-            workflow_conditional_start(
-                settings=settings,
-                starter_name="cron_NewS3POA",
-                workflow_id="cron_NewS3POA",
-                start_seconds=60 * 31)
-
-        # Author emails once per day 17:45 UTC
-        # Set to 16:45 UTC during British Summer Time for 17:45 local UK time
-        if current_time.tm_hour == 16:
-            workflow_conditional_start(
-                settings=settings,
-                starter_name="starter_PublicationEmail",
-                workflow_id="PublicationEmail",
-                start_seconds=60 * 31)
-
-        # Pub router deposits once per day 23:45 UTC
-        if current_time.tm_hour == 23:
-            workflow_conditional_start(
-                settings=settings,
-                starter_name="starter_PubRouterDeposit",
-                workflow_id="PubRouterDeposit_HEFCE",
-                start_seconds=60 * 31)
-
-        # Cengage deposits once per day 22:45 UTC
-        if current_time.tm_hour == 22:
-            workflow_conditional_start(
-                settings=settings,
-                starter_name="starter_PubRouterDeposit",
-                workflow_id="PubRouterDeposit_Cengage",
-                start_seconds=60 * 31)
-
-        # GoOA / CAS deposits once per day 21:45 UTC
-        if current_time.tm_hour == 21:
-            workflow_conditional_start(
-                settings=settings,
-                starter_name="starter_PubRouterDeposit",
-                workflow_id="PubRouterDeposit_GoOA",
-                start_seconds=60 * 31)
-
-        workflow_conditional_start(
-            settings=settings,
-            starter_name="starter_PubmedArticleDeposit",
-            workflow_id="PubmedArticleDeposit",
-            start_seconds=60 * 31)
-
-        workflow_conditional_start(
-            settings=settings,
-            starter_name="starter_AdminEmail",
-            workflow_id="AdminEmail",
-            start_seconds=(60*60*4)-(14*60))
-
-def workflow_conditional_start(settings, starter_name, start_seconds, data=None,
-                               workflow_id=None, workflow_name=None, workflow_version=None):
+# workflows started at the same time
+POOL_SIZE = 5
+
+# starter classes by starter name, imported once
+starters = {}
+starters_lock = threading.Lock()
+
+s3_connections = {}
+s3_connections_lock = threading.Lock()
+
+
+def get_s3_connection(settings):
+    "One S3 connection per process for the start conditions"
+    with s3_connections_lock:
+        if settings.aws_access_key_id not in s3_connections:
+            s3_connections[settings.aws_access_key_id] = S3Connection(
+                settings.aws_access_key_id, settings.aws_secret_access_key)
+        return s3_connections[settings.aws_access_key_id]
+
+
+def pubmed_outbox_has_files(settings):
+    "Special for pubmed, only start a workflow if the outbox is not empty"
+    bucket = get_s3_connection(settings).get_bucket(settings.poa_packaging_bucket,
+                                                    validate=False)
+    return pending_work.bucket_has_pending_keys(bucket, "pubmed/outbox/")
+
+
+# Times are UTC. The daily POA jobs are an hour earlier during British Summer Time
+#  so they run at the same local UK time
+SCHEDULE = [
+    # Jobs to start at any time during the hour
+    Job("cron_FiveMinute", "cron_FiveMinute", "* * * * *", start_seconds=60 * 3),
+    # Jobs to start at the top of the hour
+    Job("DepositCrossref", "starter_DepositCrossref", "0-29 * * * *", start_seconds=60 * 31),
+    # Jobs to start at the bottom of the hour
+    # POA Publish once per day 11:30 UTC
+    Job("PublishPOA", "starter_PublishPOA", "30-59 11 * * *", start_seconds=60 * 31),
+    # POA bucket polling
+    Job("S3Monitor_POA", "starter_S3Monitor", "30-59 * * * *", start_seconds=60 * 31,
+        start_args={"workflow": "S3Monitor_POA"}),
+    # PMC deposits once per day 20:30 UTC
+    Job("PubRouterDeposit_PMC", "starter_PubRouterDeposit", "30-59 20 * * *",
+        start_seconds=60 * 31, start_args={"workflow": "PMC"}),
+    # Web of Science deposits once per day 21:30 UTC
+    Job("PubRouterDeposit_WoS", "starter_PubRouterDeposit", "30-59 21 * * *",
+        start_seconds=60 * 31, start_args={"workflow": "WoS"}),
+    # Scopus deposits once per day 22:30 UTC
+    Job("PubRouterDeposit_Scopus", "starter_PubRouterDeposit", "30-59 22 * * *",
+        start_seconds=60 * 31, start_args={"workflow": "Scopus"}),
+    # Bottom quarter of the hour
+    # POA Package once per day 10:45 UTC
+    Job("cron_NewS3POA", "cron_NewS3POA", "45-59 10 * * *", start_seconds=60 * 31),
+    # Author emails once per day 16:45 UTC
+    Job("PublicationEmail", "starter_PublicationEmail", "45-59 16 * * *",
+        start_seconds=60 * 31),
+    # Pub router deposits once per day 23:45 UTC
+    Job("PubRouterDeposit_HEFCE", "starter_PubRouterDeposit", "45-59 23 * * *",
+        start_seconds=60 * 31, start_args={"workflow": "HEFCE"}),
+    # Cengage deposits once per day 22:45 UTC
+    Job("PubRouterDeposit_Cengage", "starter_PubRouterDeposit", "45-59 22 * * *",
+        start_seconds=60 * 31, start_args={"workflow": "Cengage"}),
+    # GoOA / CAS deposits once per day 21:45 UTC
+    Job("PubRouterDeposit_GoOA", "starter_PubRouterDeposit", "45-59 21 * * *",
+        start_seconds=60 * 31, start_args={"workflow": "GoOA"}),
+    Job("PubmedArticleDeposit", "starter_PubmedArticleDeposit", "45-59 * * * *",
+        start_seconds=60 * 31, condition=pubmed_outbox_has_files),
+    Job("AdminEmail", "starter_AdminEmail", "45-59 * * * *",
+        start_seconds=(60 * 60 * 4) - (14 * 60), start_args={"workflow": "AdminEmail"}),
+]
+
+
+def run_cron(settings, logger=None, current_time=None, schedule=SCHEDULE, swfmeta=None):
     """
-    Given workflow criteria, check the workflow completion history for the last time run
-    If it last run more than start_seconds ago, start a new workflow
+    Start the jobs of schedule due at current_time whose last completed run is old
+    enough, returns the workflow ids started.
+    swfmeta, when supplied, is the connection to look up the SWF history with
     """
 
-    diff_seconds = None
-    last_startTimestamp = None
-
+    if current_time is None:
+        current_time = time.gmtime()
+
+    jobs = due_jobs(schedule, current_time)
+    if not jobs:
+        return []
+
+    # One look at the SWF history answers when each job last completed
+    last_startTimestamps = execution_history.last_completed_start_timestamps(
+        settings, [job.workflow_id for job in jobs], swfmeta)
+
+    current_timestamp = calendar.timegm(current_time)
+    jobs = [job for job in jobs
+            if job.is_stale(last_startTimestamps.get(job.workflow_id), current_timestamp)]
+    if not jobs:
+        return []
+
+    pool = ThreadPool(min(POOL_SIZE, len(jobs)))
+    try:
+        started = pool.map(lambda job: start_job(settings, job, logger), jobs)
+    finally:
+        pool.close()
+        pool.join()
+    return [job.workflow_id for job, was_started in zip(jobs, started) if was_started]
+
+
+def get_starter(starter_name):
+    "Return the starter class for a starter name like starter_DepositCrossref"
+    with starters_lock:
+        if starter_name not in starters:
+            module = importlib.import_module("starter." + starter_name)
+            starters[starter_name] = getattr(module, starter_name)
+        return starters[starter_name]
+
+
+def start_job(settings, job, logger=None):
+    "Start the workflow of job unless its condition is false, returns whether it started"
+    try:
+        if job.jitter:
+            time.sleep(random.uniform(0, job.jitter))
+        if job.condition is not None and not job.condition(settings):
+            return False
+        s = get_starter(job.starter_name)()
+        s.start(settings=settings, **job.start_args)
+        if logger:
+            logger.info("Started %s", job.workflow_id)
+        return True
+    except Exception:
+        if logger:
+            logger.exception("Failed to start %s", job.workflow_id)
+        return False
+
+
+def run_daemon(settings, logger, flag):
+    "Evaluate the schedule at the start of every minute until flag turns red"
+    application = newrelic.agent.register_application(timeout=10.0)
+    starter_helper.reuse_swf_connections()
     swfmeta = swfmetalib.SWFMeta(settings)
     swfmeta.connect()
-
-    last_startTimestamp = swfmeta.get_last_completed_workflow_execution_startTimestamp(
-        workflow_id=workflow_id,
-        workflow_name=workflow_name,
-        workflow_version=workflow_version)
-
-    current_timestamp = calendar.timegm(time.gmtime())
-
-    if last_startTimestamp is not None:
-        diff_seconds = current_timestamp - start_seconds - last_startTimestamp
-        print diff_seconds
-
-    if diff_seconds >= 0 or last_startTimestamp is None:
-        # Start a new workflow
-        # Load the starter module
-        module_name = "starter." + starter_name
-        importlib.import_module(module_name)
-        full_path = "starter." + starter_name + "." + starter_name + "()"
-        s = eval(full_path)
-
-        # Customised start functions
-        if starter_name == "starter_S3Monitor":
-
-            if workflow_id == "S3Monitor":
-                s.start(settings=settings, workflow="S3Monitor")
-            if workflow_id == "S3Monitor_POA":
-                s.start(settings=settings, workflow="S3Monitor_POA")
-
-        elif starter_name == "starter_AdminEmail":
-            s.start(settings=settings, workflow="AdminEmail")
-
-        elif starter_name == "starter_PubmedArticleDeposit":
-            # Special for pubmed, only start a workflow if the outbox is not empty
-            bucket_name = settings.poa_packaging_bucket
-            outbox_folder = "pubmed/outbox/"
-
-            # Connect to S3 and bucket
-            s3_conn = S3Connection(settings.aws_access_key_id, settings.aws_secret_access_key)
-            bucket = s3_conn.lookup(bucket_name)
-
-            s3_key_names = get_s3_key_names_from_bucket(
-                bucket=bucket,
-                prefix=outbox_folder
-                )
-            if len(s3_key_names) > 0:
-                s.start(settings=settings)
-
-        elif starter_name == "starter_PubRouterDeposit":
-            # PubRouterDeposit has different variants specified by the workflow variable
-            workflow = workflow_id.split("_")[-1]
-            s.start(settings=settings, workflow=workflow)
-
-        elif (starter_name == "cron_FiveMinute"
-              or starter_name == "starter_PublishPOA"
-              or starter_name == "cron_NewS3POA"
-              or starter_name == "starter_PublicationEmail"
-              or starter_name == "starter_DepositCrossref"):
-            s.start(settings=settings)
-
-def get_s3_key_names_from_bucket(bucket, prefix=None, delimiter='/', headers=None):
-    """
-    Given a connected boto bucket object, and optional parameters,
-    from the prefix (folder name), get the s3 key names for
-    non-folder objects, optionally that match a particular
-    list of file extensions
-    """
-    s3_keys = []
-    s3_key_names = []
-
-    # Get a list of S3 objects
-    bucketList = bucket.list(prefix=prefix, delimiter=delimiter, headers=headers)
-
-    for item in bucketList:
-        if isinstance(item, boto.s3.key.Key):
-            # Can loop through each prefix and search for objects
-            s3_keys.append(item)
-
-    # Convert to key names instead of objects to make it testable later
-    for key in s3_keys:
-        s3_key_names.append(key.name)
-
-    return s3_key_names
-
-if __name__ == "__main__":
-    # Add options
+    while flag.green():
+        next_minute = time.time() + seconds_to_next_minute()
+        while flag.green() and time.time() < next_minute:
+            time.sleep(min(1, max(next_minute - time.time(), 0)))
+        if flag.red():
+            break
+        with newrelic.agent.BackgroundTask(application, name='run_cron', group='cron.py'):
+            try:
+                started = run_cron(settings, logger, swfmeta=swfmeta)
+                if started:
+                    logger.info("Started %s", ", ".join(started))
+            except Exception:
+                logger.exception("Failed to run the cron")
+    logger.info("graceful shutdown")
+
+
+def main(flag):
     parser = OptionParser()
     parser.add_option("-e", "--env", default="dev", action="store", type="string",
                       dest="env", help="set the environment to run, either dev or live")
+    parser.add_option("-d", "--daemon", default=False, action="store_true", dest="daemon",
+                      help="keep running and start the jobs due every minute")
     (options, args) = parser.parse_args()
-    if options.env:
-        ENV = options.env
 
-    import settings as settingsLib
-    settings = settingsLib.get_settings(ENV)
+    settings = settingsLib.get_settings(options.env)
+    identity = "cron_%s" % os.getpid()
+    logger = log.logger("cron.log", settings.setLevel, identity=identity)
 
-    application = newrelic.agent.register_application(timeout=10.0)
-    with newrelic.agent.BackgroundTask(application, name='run_cron', group='cron.py'):
-        run_cron(settings=settings)
+    if options.daemon:
+        run_daemon(settings, logger, flag)
+    else:
+        application = newrelic.agent.register_application(timeout=10.0)
+        with newrelic.agent.BackgroundTask(application, name='run_cron', group='cron.py'):
+            run_cron(settings=settings, logger=logger)
+
+
+if __name__ == "__main__":
+    process.monitor_interrupt(main)
@@ -2,8 +2,10 @@ import boto.sqs
 from boto.sqs.message import Message
 import json
 import uuid
+from provider import metrics
 
 
+@metrics.timed('sqs')
 def send_message(message, settings):
     conn = boto.sqs.connect_to_region(settings.sqs_region,
                                       aws_access_key_id=settings.aws_access_key_id,
@@ -1,9 +1,8 @@
 from optparse import OptionParser
-import boto.sqs
 import log
 import json
-from boto.sqs.message import Message
 from provider import process
+from provider import sqs_consumer
 import base64
 from dateutil.parser import parse
 import newrelic.agent
@@ -22,30 +21,23 @@ class LaxResponseAdapter:
 
     def listen(self, flag):
         self.logger.info("started")
-        conn = boto.sqs.connect_to_region(self._settings.sqs_region,
-                                          aws_access_key_id=self._settings.aws_access_key_id,
-                                          aws_secret_access_key=self._settings.aws_secret_access_key)
+        conn = sqs_consumer.connect(self._settings)
         input_queue = conn.get_queue(self._settings.lax_response_queue)
         output_queue = conn.get_queue(self._settings.workflow_starter_queue)
         if input_queue is not None:
-            while flag.green():
-
-                self.logger.debug('reading queue')
-                queue_message = input_queue.read(visibility_timeout=60, wait_time_seconds=20)
-                if queue_message is not None:
-                    self.logger.info('got message id: %s', queue_message.id)
-                    try:
-                        self.process_message(queue_message, output_queue)
-                        queue_message.delete()
-                    except ShortRetryException as e:
-                        self.logger.info('short retry: %s because of %s', queue_message.id, e)
-                        queue_message.change_visibility(visibility_timeout=10)
-
-            self.logger.info("graceful shutdown")
-
+            self.consumer(input_queue, output_queue).run(flag)
         else:
             self.logger.error("Could not obtain queue, exiting")
 
+    def consumer(self, input_queue, output_queue):
+        "Workflow starter messages are sent in batches, a message that cannot be parsed is kept"
+        return sqs_consumer.Consumer(input_queue, self.handle_message, self.logger,
+                                     out_queue=output_queue)
+
+    def handle_message(self, queue_message):
+        self.logger.info('got message id: %s', queue_message.id)
+        return sqs_consumer.forward(self.process_message(queue_message))
+
     def parse_token(self, token):
         try:
             token_parsed = base64.decodestring(token)
@@ -123,13 +115,10 @@ class LaxResponseAdapter:
             raise
 
     @newrelic.agent.background_task(group='lax_response_adapter.py')
-    def process_message(self, message, output_queue):
+    def process_message(self, message):
+        "Return the workflow starter message for a Lax message"
         message_str = str(message.get_body())
-        workflow_starter_message = self.parse_message(message_str)
-
-        m = Message()
-        m.set_body(json.dumps(workflow_starter_message))
-        output_queue.write(m)
+        return self.parse_message(message_str)
 
 if __name__ == "__main__":
 
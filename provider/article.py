@@ -677,34 +677,8 @@ class article(object):
         article_id = str(doi_id).zfill(5)
 
         # work around circular dependency article/lax_provider
-        from lax_provider import article_versions, poa_vor_status
-        status_code, data = article_versions(article_id, self.settings)
-
-        if status_code == 200:
-            poa_status, vor_status = poa_vor_status(data)
-        else:
-            poa_status, vor_status = None, None
-
-        # Now a decision can be made
-        if (is_poa is True or
-                (is_poa is False and was_ever_poa is False) or
-                (is_poa is False and was_ever_poa is None)):
-            # In this case, any version is sufficient
-            if poa_status or vor_status:
-                return True
-            else:
-                return False
-        elif is_poa is False and was_ever_poa is True:
-            # In the case of was ever PoA but is not PoA
-            #  check there is a VoR version
-            if vor_status:
-                return True
-            else:
-                return False
-
-        # Default
-        return False
-
+        from lax_provider import article_status, is_published
+        return is_published(article_status(article_id, self.settings), is_poa, was_ever_poa)
 
     def check_is_article_published_by_url(self, doi, is_poa, was_ever_poa, article_url=None):
         """
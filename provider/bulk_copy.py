@@ -0,0 +1,59 @@
+from multiprocessing.pool import ThreadPool
+
+"""
+Copy many resources in a storage context concurrently, skipping those already in place
+"""
+
+POOL_SIZE = 10
+
+
+class Copy(object):
+    "A resource to copy, with the metadata to set on the copy, if any"
+
+    def __init__(self, orig_resource, dest_resource, additional_dict_metadata=None, etag=None):
+        self.orig_resource = orig_resource
+        self.dest_resource = dest_resource
+        self.additional_dict_metadata = additional_dict_metadata
+        # ETag of the original resource, when known
+        self.etag = etag
+
+
+def copy_resources(storage_context, copies, dest_etags=None, logger=None, pool_size=POOL_SIZE):
+    """
+    Copy each Copy with one server side copy, at most pool_size at a time. A copy is
+    skipped when dest_etags, the ETags of the destination resources by resource,
+    shows the destination already has the same content.
+    Returns a report of the destination resources copied, skipped and failed
+    """
+    dest_etags = dest_etags or {}
+    report = {'copied': [], 'skipped': [], 'failed': []}
+
+    pending = []
+    for copy in copies:
+        if copy.etag is not None and dest_etags.get(copy.dest_resource) == copy.etag:
+            report['skipped'].append(copy.dest_resource)
+        else:
+            pending.append(copy)
+
+    def copy_resource(copy):
+        try:
+            storage_context.copy_resource(copy.orig_resource, copy.dest_resource,
+                                          additional_dict_metadata=copy.additional_dict_metadata)
+            return True
+        except Exception:
+            if logger:
+                logger.exception("Failed to copy %s to %s" %
+                                 (copy.orig_resource, copy.dest_resource))
+            return False
+
+    if pending:
+        pool = ThreadPool(min(pool_size, len(pending)))
+        try:
+            results = pool.map(copy_resource, pending)
+        finally:
+            pool.close()
+            pool.join()
+        for copy, success in zip(pending, results):
+            report['copied' if success else 'failed'].append(copy.dest_resource)
+
+    return report
@@ -0,0 +1,114 @@
+from multiprocessing.pool import ThreadPool
+
+"""
+Rename many S3 keys of a folder: concurrent server side copies, then the old keys deleted
+with multi-object deletes. Renaming again after a failure only does what is left to do.
+The copies and the deletes can be done separately, for work to be done between the two
+while the old keys are still there
+"""
+
+POOL_SIZE = 10
+# S3 limit for a single DeleteObjects request
+MAX_DELETE_KEYS = 1000
+
+
+def rename_keys(bucket, folder, file_name_map, files, logger=None, pool_size=POOL_SIZE):
+    """
+    Rename the files of a folder in bucket from the old to the new names of file_name_map,
+    copying them with copy_keys then deleting the old keys with delete_old_keys.
+    Returns the report of both
+    """
+    report = copy_keys(bucket, folder, file_name_map, files, logger, pool_size)
+    return delete_old_keys(bucket, folder, report, logger)
+
+
+def copy_keys(bucket, folder, file_name_map, files, logger=None, pool_size=POOL_SIZE):
+    """
+    Copy the files of a folder in bucket from the old to the new names of file_name_map.
+    files is the expanded_folder manifest of the folder as listed before renaming, a file
+    already under its new name with the ETag of the old one is not copied again, and a file
+    only found under its new name was renamed before.
+    Returns a report of the new names copied and skipped, the names failed, new names not
+    copied, the ETags of the copies by new name, and the old names to delete
+    """
+    etags = dict((file_info['name'], file_info['etag']) for file_info in files)
+    report = {'copied': [], 'skipped': [], 'failed': [], 'deleted': [], 'etags': {},
+              'old_names': []}
+
+    copies = []
+    old_names = []
+    for old_name, new_name in sorted(file_name_map.items()):
+        # Do not need to rename if the old and new name are the same
+        if new_name is None or old_name == new_name:
+            continue
+        if old_name not in etags:
+            if new_name in etags:
+                report['skipped'].append(new_name)
+            else:
+                report['failed'].append(new_name)
+                if logger:
+                    logger.error("Cannot rename %s to %s, the file is missing" %
+                                 (old_name, new_name))
+            continue
+        if new_name in etags and etags[new_name] == etags[old_name]:
+            report['skipped'].append(new_name)
+            old_names.append(old_name)
+        else:
+            copies.append((old_name, new_name))
+
+    def copy_key(names):
+        old_name, new_name = names
+        try:
+            new_key = bucket.copy_key(folder + '/' + new_name, bucket.name, folder + '/' + old_name)
+            return True, getattr(new_key, 'etag', None)
+        except Exception:
+            if logger:
+                logger.exception("Failed to copy %s to %s" % (old_name, new_name))
+            return False, None
+
+    if copies:
+        pool = ThreadPool(min(pool_size, len(copies)))
+        try:
+            results = pool.map(copy_key, copies)
+        finally:
+            pool.close()
+            pool.join()
+        for (old_name, new_name), (success, etag) in zip(copies, results):
+            if success:
+                report['copied'].append(new_name)
+                report['etags'][new_name] = etag
+                old_names.append(old_name)
+            else:
+                report['failed'].append(new_name)
+
+    # old keys are only deleted once their copy is in place
+    report['old_names'] = old_names
+    return report
+
+
+def delete_old_keys(bucket, folder, report, logger=None):
+    "Delete the old keys of the report of copy_keys, adding the names deleted and failed"
+    deleted, failed = delete_keys(
+        bucket, [folder + '/' + old_name for old_name in report['old_names']], logger)
+    report['deleted'] = [key_name[len(folder) + 1:] for key_name in deleted]
+    report['failed'] += [key_name[len(folder) + 1:] for key_name in failed]
+    return report
+
+
+def delete_keys(bucket, key_names, logger=None):
+    """
+    Delete the keys of bucket with multi-object deletes of up to MAX_DELETE_KEYS keys.
+    Returns the key names deleted and the key names failed
+    """
+    deleted = []
+    failed = []
+    for index in range(0, len(key_names), MAX_DELETE_KEYS):
+        chunk = key_names[index:index + MAX_DELETE_KEYS]
+        result = bucket.delete_keys(chunk, quiet=True)
+        errors = set(error.key for error in result.errors)
+        for error in result.errors:
+            if logger:
+                logger.error("Failed to delete %s: %s" % (error.key, error.message))
+        for key_name in chunk:
+            (failed if key_name in errors else deleted).append(key_name)
+    return deleted, failed
@@ -0,0 +1,102 @@
+import calendar
+import time
+
+"""
+Schedule table of cron jobs: each job has a cron expression of when it is due, the
+minimum time since its last completed run before it is started again, and optionally
+a condition it is only started on and a jitter it is started within
+"""
+
+# minute, hour, day of month, month, day of week
+FIELD_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+
+def parse_field(field, low, high):
+    "The values of a cron expression field like *, */5, 30-59, 1,15 or 0-30/10"
+    values = set()
+    for part in field.split(','):
+        step = 1
+        if '/' in part:
+            part, step = part.split('/', 1)
+            step = int(step)
+        if part == '*':
+            start, end = low, high
+        elif '-' in part:
+            start, end = [int(value) for value in part.split('-', 1)]
+        else:
+            start = int(part)
+            end = high if step > 1 else start
+        if step < 1 or not low <= start <= end <= high:
+            raise ValueError("Cron field %s is not within %s-%s" % (field, low, high))
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+
+class CronExpression(object):
+    """
+    Five field cron expression, due when each field matches the time, the day of month
+    and the day of week included, Sunday is 0 or 7
+    """
+
+    def __init__(self, expression):
+        fields = expression.split()
+        if len(fields) != len(FIELD_RANGES):
+            raise ValueError("Cron expression %s does not have five fields" % expression)
+        self.expression = expression
+        (self.minutes, self.hours, self.days, self.months, weekdays) = [
+            parse_field(field, low, high) for field, (low, high) in zip(fields, FIELD_RANGES)]
+        self.weekdays = frozenset(weekday % 7 for weekday in weekdays)
+
+    def matches(self, time_struct):
+        return (time_struct.tm_min in self.minutes and
+                time_struct.tm_hour in self.hours and
+                time_struct.tm_mday in self.days and
+                time_struct.tm_mon in self.months and
+                # tm_wday is 0 on Monday
+                (time_struct.tm_wday + 1) % 7 in self.weekdays)
+
+    def __repr__(self):
+        return "CronExpression(%r)" % self.expression
+
+
+class Job(object):
+    """
+    A workflow the cron starts with starter_name and start_args when schedule is due,
+    its last completed run started more than start_seconds ago, and condition, called
+    with the settings, is true. The start is delayed by up to jitter seconds
+    """
+
+    def __init__(self, workflow_id, starter_name, schedule, start_seconds, start_args=None,
+                 condition=None, jitter=0):
+        self.workflow_id = workflow_id
+        self.starter_name = starter_name
+        self.schedule = CronExpression(schedule)
+        self.start_seconds = start_seconds
+        self.start_args = start_args or {}
+        self.condition = condition
+        self.jitter = jitter
+
+    def is_due(self, time_struct):
+        return self.schedule.matches(time_struct)
+
+    def is_stale(self, last_startTimestamp, current_timestamp=None):
+        "Whether the last completed run started, if ever, more than start_seconds ago"
+        if last_startTimestamp is None:
+            return True
+        if current_timestamp is None:
+            current_timestamp = calendar.timegm(time.gmtime())
+        return current_timestamp - self.start_seconds - last_startTimestamp >= 0
+
+    def __repr__(self):
+        return "Job(%r, %r, %r)" % (self.workflow_id, self.starter_name, self.schedule.expression)
+
+
+def due_jobs(schedule, time_struct):
+    "The jobs of schedule due at time_struct"
+    return [job for job in schedule if job.is_due(time_struct)]
+
+
+def seconds_to_next_minute(timestamp=None):
+    if timestamp is None:
+        timestamp = time.time()
+    return 60 - timestamp % 60
@@ -0,0 +1,86 @@
+import random
+import time
+from multiprocessing.pool import ThreadPool
+import requests
+from requests.adapters import HTTPAdapter
+
+"""
+Check many HTTP endpoints at once: a pooled session, bounded concurrency,
+per request timeouts and a capped number of retries with jittered backoff
+"""
+
+POOL_SIZE = 10
+# connect and read timeouts in seconds
+TIMEOUT = (5, 30)
+MAX_RETRIES = 3
+RETRY_DELAY = 0.5
+RETRY_STATUS_CODES = (502, 503, 504)
+RETRY_EXCEPTIONS = (requests.exceptions.Timeout, requests.exceptions.ConnectionError)
+
+
+def session(pool_size=POOL_SIZE):
+    "A requests session keeping up to pool_size connections open per host"
+    http_session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    http_session.mount('http://', adapter)
+    http_session.mount('https://', adapter)
+    return http_session
+
+
+def backoff(attempt):
+    "Seconds to wait before retry number attempt, full jitter on an exponential delay"
+    return random.uniform(0, RETRY_DELAY * (2 ** attempt))
+
+
+def request(method, url, logger, http_session=None, retry_status_codes=RETRY_STATUS_CODES,
+            max_retries=MAX_RETRIES, timeout=TIMEOUT, retry_exceptions=RETRY_EXCEPTIONS,
+            **kwargs):
+    """
+    Make a request with http_session, or requests when there is none, retrying
+    the retry_exceptions, timeouts and connection errors by default, and the
+    retry_status_codes at most max_retries times.
+    Returns the last response, or raises the last exception
+    """
+    attempt = 0
+    while True:
+        try:
+            response = getattr(http_session or requests, method)(url, timeout=timeout, **kwargs)
+            if response.status_code not in retry_status_codes or attempt >= max_retries:
+                return response
+            reason = "response code was %s" % response.status_code
+        except retry_exceptions as e:
+            if attempt >= max_retries:
+                raise
+            reason = str(e)
+        if logger:
+            logger.info('short retry of %s because %s', url, reason)
+        time.sleep(backoff(attempt))
+        attempt += 1
+
+
+def check_endpoints(endpoints, check, pool_size=POOL_SIZE):
+    """
+    Call check for each endpoint, at most pool_size at a time,
+    and return the results in the order of the endpoints
+    """
+    if not endpoints:
+        return []
+    pool = ThreadPool(min(pool_size, len(endpoints)))
+    try:
+        return pool.map(check, endpoints)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def report(results, start):
+    """
+    Given a list of (success, endpoint) results and the time the check started,
+    return a summary of the check
+    """
+    failed = [endpoint for success, endpoint in results if not success]
+    return {
+        'checked': len(results),
+        'failed': failed,
+        'seconds': round(time.time() - start, 3)
+    }
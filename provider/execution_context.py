@@ -1,6 +1,21 @@
+import threading
 import redis
 from pydoc import locate
 
+# Redis connection pools shared by all the sessions of the process, by server
+connection_pools = {}
+connection_pools_lock = threading.Lock()
+
+
+def connection_pool(settings):
+    "Return the shared connection pool for the Redis server in settings"
+    server = (settings.redis_host, settings.redis_port, settings.redis_db)
+    with connection_pools_lock:
+        if server not in connection_pools:
+            connection_pools[server] = redis.ConnectionPool(
+                host=settings.redis_host, port=settings.redis_port, db=settings.redis_db)
+        return connection_pools[server]
+
 
 def Session(settings):
     settings_session_class = "RedisSession"  # Default
@@ -31,6 +46,10 @@ class FileSession(object):
         f = open(self.settings.workflow_context_path + self.get_full_key(execution_id, key), 'w')
         f.write(value)
 
+    def store_values(self, execution_id, values):
+        for key, value in values.items():
+            self.store_value(execution_id, key, value)
+
     def get_value(self, execution_id, key):
         try:
             f = open(self.settings.workflow_context_path + self.get_full_key(execution_id, key), 'r')
@@ -38,19 +57,54 @@ class FileSession(object):
         except:
             return None
 
+    def get_values(self, execution_id, keys):
+        return [self.get_value(execution_id, key) for key in keys]
+
     @staticmethod
     def get_full_key(execution_id, key):
         return execution_id + '__' + key
 
 
+def stored_value(value):
+    "The value as Redis returns it once stored, a UTF-8 encoded string"
+    if isinstance(value, unicode):
+        return value.encode('utf-8')
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+
 class RedisSession(object):
+    """
+    Session values of an execution in a Redis hash. All the values of an execution are
+    read with one request the first time one is needed and kept for the life of the
+    session, usually one activity task, and each store is one pipelined request
+    """
+
     def __init__(self, settings):
         self.expire_key = settings.redis_expire_key
-        self.r = redis.StrictRedis(host=settings.redis_host, port=settings.redis_port, db=settings.redis_db)
+        self.r = redis.StrictRedis(connection_pool=connection_pool(settings))
+        self.cache = {}
 
     def store_value(self, execution_id, key, value):
-        self.r.hset(execution_id, key, value)
-        self.r.expire(execution_id, self.expire_key)
+        self.store_values(execution_id, {key: value})
+
+    def store_values(self, execution_id, values):
+        if not values:
+            return
+        pipeline = self.r.pipeline(transaction=False)
+        pipeline.hmset(execution_id, values)
+        pipeline.expire(execution_id, self.expire_key)
+        pipeline.execute()
+        if execution_id in self.cache:
+            self.cache[execution_id].update(
+                (key, stored_value(value)) for key, value in values.items())
 
     def get_value(self, execution_id, key):
-        return self.r.hget(execution_id,key)
+        return self.get_values(execution_id, [key])[0]
+
+    def get_values(self, execution_id, keys):
+        if execution_id not in self.cache:
+            self.cache[execution_id] = self.r.hgetall(execution_id)
+        values = self.cache[execution_id]
+        return [values.get(key) for key in keys]
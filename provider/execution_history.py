@@ -0,0 +1,108 @@
+import calendar
+import json
+import os
+import time
+
+import provider.swfmeta as swfmetalib
+
+"""
+Start timestamps of the last completed executions of many workflow ids at once
+
+The closed executions of the domain are listed once, indexed by workflow id, and the
+index is saved to a small file so the next run only lists the executions closed since
+"""
+
+CACHE_FILE = 'cron_history.json'
+# SWF keeps 90 days of closed executions
+MAX_AGE = 60 * 60 * 24 * 90
+# widening windows of days listed when there is no index yet
+DAYS_LIST = [0.25, 1, 7, 90]
+PAGE_SIZE = 1000
+
+
+def load_cache(path):
+    "The index saved to path, an empty one if it is missing or unreadable"
+    try:
+        with open(path) as open_file:
+            cache = json.load(open_file)
+        if isinstance(cache.get('checked'), (int, long, float)) and isinstance(
+                cache.get('latest'), dict):
+            return cache
+    except (IOError, ValueError, AttributeError):
+        pass
+    return {'checked': None, 'latest': {}}
+
+
+def save_cache(path, cache):
+    "Write the index to a new file renamed over path, a reader never sees half of it"
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as open_file:
+        json.dump(cache, open_file)
+    os.rename(tmp_path, path)
+
+
+def index_executions(infos, latest):
+    "Keep in latest the greatest startTimestamp of each workflow id in infos"
+    for execution in infos["executionInfos"]:
+        workflow_id = execution['execution']['workflowId']
+        if latest.get(workflow_id) is None or execution['startTimestamp'] > latest[workflow_id]:
+            latest[workflow_id] = execution['startTimestamp']
+
+
+def list_completed(swfmeta, start_oldest_date, start_latest_date):
+    "The executions completed that started between the dates"
+    return swfmeta.get_closed_workflow_executionInfos(
+        start_oldest_date=int(start_oldest_date),
+        start_latest_date=int(start_latest_date),
+        close_status="COMPLETED",
+        maximum_page_size=PAGE_SIZE)
+
+
+def list_closed_since(swfmeta, close_oldest_date, close_latest_date):
+    "The executions completed that closed between the dates, whenever they started"
+    return swfmeta.get_closed_workflow_executionInfos(
+        close_oldest_date=int(close_oldest_date),
+        close_latest_date=int(close_latest_date),
+        close_status="COMPLETED",
+        maximum_page_size=PAGE_SIZE)
+
+
+def last_completed_start_timestamps(settings, workflow_ids, swfmeta=None, path=None):
+    """
+    The startTimestamp of the last completed execution of each of workflow_ids, None for
+    those with no completed execution in the SWF history
+    """
+    path = path or getattr(settings, 'cron_history_file', None) or CACHE_FILE
+    if swfmeta is None:
+        swfmeta = swfmetalib.SWFMeta(settings)
+        swfmeta.connect()
+    now = calendar.timegm(time.gmtime())
+    cache = load_cache(path)
+
+    if cache['checked'] is not None and now - cache['checked'] < MAX_AGE:
+        # only what completed since the last check
+        index_executions(list_closed_since(swfmeta, cache['checked'], now), cache['latest'])
+        known = set(cache.get('known', [])) | set(cache['latest'])
+        unknown = [workflow_id for workflow_id in workflow_ids if workflow_id not in known]
+        for workflow_id in unknown:
+            # a workflow id the index was not built for, look back through its history
+            cache['latest'][workflow_id] = \
+                swfmeta.get_last_completed_workflow_execution_startTimestamp(
+                    workflow_id=workflow_id)
+    else:
+        cache = {'checked': None, 'latest': {}}
+        for days in DAYS_LIST:
+            index_executions(list_completed(swfmeta, now - int(60 * 60 * 24 * days), now),
+                             cache['latest'])
+            if all(cache['latest'].get(workflow_id) for workflow_id in workflow_ids):
+                break
+        unknown = workflow_ids
+    cache['known'] = sorted(set(cache.get('known', [])) | set(unknown) | set(cache['latest']))
+    cache['checked'] = now
+
+    try:
+        save_cache(path, cache)
+    except (IOError, OSError):
+        # the next run lists the history again
+        pass
+    return dict((workflow_id, cache['latest'].get(workflow_id)) for workflow_id in workflow_ids)
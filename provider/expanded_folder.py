@@ -0,0 +1,97 @@
+import json
+from provider.article_structure import ArticleInfo
+
+"""
+Manifest of the files in the expanded folder of an article, kept in the session of the run
+so activities can find their files without listing and requesting each S3 key again
+"""
+
+SESSION_KEY = 'expanded_folder_manifest'
+
+
+def manifest_entry(name, size, etag):
+    "A file of the manifest, with its ArticleInfo file type"
+    return {'name': name, 'size': size, 'etag': etag, 'file_type': ArticleInfo(name).file_type}
+
+
+def manifest_from_keys(keys):
+    "Given the keys from a bucket listing, return the manifest of the files"
+    return [manifest_entry(key.name.rsplit('/', 1)[1], key.size, key.etag)
+            for key in keys if not key.name.endswith('/')]
+
+
+def list_manifest(bucket, folder):
+    "List the folder once, the file details come from the LIST response"
+    return manifest_from_keys(bucket.list(folder + "/", "/"))
+
+
+def manifest_value(folder, files):
+    "The manifest as stored in the session under SESSION_KEY"
+    return json.dumps({'folder': folder, 'files': files})
+
+
+def store_manifest(session, run, folder, files):
+    session.store_value(run, SESSION_KEY, manifest_value(folder, files))
+
+
+def load_manifest(session, run, folder):
+    "Return the manifest stored in the session for the folder, or None"
+    value = session.get_value(run, SESSION_KEY)
+    if not value:
+        return None
+    try:
+        manifest = json.loads(value)
+    except ValueError:
+        return None
+    if manifest.get('folder') != folder:
+        return None
+    return manifest['files']
+
+
+def renamed_manifest(files, file_name_map, etags=None):
+    """
+    The manifest of files after renaming them from the old to the new names of
+    file_name_map, etags has the ETag of each new name copied, other files keep theirs
+    """
+    etags = etags or {}
+    renamed = {}
+    for file_info in files:
+        name = file_name_map.get(file_info['name']) or file_info['name']
+        if name in renamed and name == file_info['name']:
+            # listed under both names, the old file is the one renamed
+            continue
+        renamed[name] = manifest_entry(name, file_info['size'],
+                                       etags.get(name, file_info['etag']))
+    return [renamed[name] for name in sorted(renamed)]
+
+
+def get_manifest(session, run, bucket, folder):
+    "Return the manifest from the session, listing the folder only if it is not there yet"
+    files = load_manifest(session, run, folder)
+    if files is None:
+        files = list_manifest(bucket, folder)
+        store_manifest(session, run, folder, files)
+    return files
+
+
+def file_names(files):
+    return [file_info['name'] for file_info in files]
+
+
+def file_etags(files):
+    "ETag of each file by name"
+    return dict((file_info['name'], file_info['etag']) for file_info in files)
+
+
+def file_type(file_info):
+    if 'file_type' in file_info:
+        return file_info['file_type']
+    return ArticleInfo(file_info['name']).file_type
+
+
+def article_xml_file_name(files):
+    "Return the name of the article XML file in the manifest, or None"
+    for file_info in files:
+        if file_type(file_info) == 'ArticleXML':
+            return file_info['name']
+    return None
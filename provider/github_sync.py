@@ -0,0 +1,104 @@
+import hashlib
+import threading
+import time
+from github import Github, GithubException, InputGitTreeElement
+
+"""
+Keep files of a GitHub repository up to date: one client per repository and process,
+content compared with the blob SHAs of the repository tree rather than downloading each
+file, and any number of files committed at once in a single tree and commit
+"""
+
+# seconds the blob SHAs listed from the repository tree are trusted
+TREE_TTL = 600
+# attempts to move the branch to a new commit when it moved on in the meantime
+MAX_ATTEMPTS = 3
+FILE_MODE = '100644'
+
+syncs = {}
+syncs_lock = threading.Lock()
+
+
+class ConflictException(RuntimeError):
+    pass
+
+
+def blob_sha(content):
+    "The SHA git gives a blob of content"
+    if isinstance(content, unicode):
+        content = content.encode('utf8')
+    return hashlib.sha1('blob %d\0%s' % (len(content), content)).hexdigest()
+
+
+def tree_path(path):
+    "Paths in settings start with a slash, those of the tree do not"
+    return path.lstrip('/')
+
+
+class GithubSync(object):
+
+    def __init__(self, token, owner, repo_name, logger=None, branch=None):
+        self.repo = Github(token).get_user(owner).get_repo(repo_name)
+        self.branch = branch or self.repo.default_branch
+        self.logger = logger
+        self.lock = threading.Lock()
+        self.shas = {}
+        self.shas_time = None
+
+    def blob_shas(self):
+        "The blob SHA of each file path of the branch, listed again once older than TREE_TTL"
+        with self.lock:
+            if self.shas_time is None or time.time() - self.shas_time > TREE_TTL:
+                head = self.repo.get_git_ref('heads/' + self.branch).object.sha
+                tree = self.repo.get_git_tree(head, recursive=True)
+                self.shas = dict((element.path, element.sha) for element in tree.tree
+                                 if element.type == 'blob')
+                self.shas_time = time.time()
+            return dict(self.shas)
+
+    def changes(self, files):
+        "The files, a dict of content by path, whose content is not the one in the repository"
+        shas = self.blob_shas()
+        return dict((tree_path(path), content) for path, content in files.items()
+                    if shas.get(tree_path(path)) != blob_sha(content))
+
+    def commit_files(self, files, message):
+        """
+        Commit the files that changed, from a dict of content by path, in a single commit
+        on top of the branch. Returns the paths committed, added or updated, and the SHA of
+        the commit, None when nothing changed
+        """
+        changes = self.changes(files)
+        if not changes:
+            return [], None
+        elements = [InputGitTreeElement(path, FILE_MODE, 'blob', content=content)
+                    for path, content in sorted(changes.items())]
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            ref = self.repo.get_git_ref('heads/' + self.branch)
+            parent = self.repo.get_git_commit(ref.object.sha)
+            tree = self.repo.create_git_tree(elements, parent.tree)
+            commit = self.repo.create_git_commit(message, tree, [parent])
+            try:
+                ref.edit(commit.sha)
+                break
+            except GithubException as e:
+                # 422 when the branch is no longer at the parent commit
+                if e.status != 422:
+                    raise
+                if attempt == MAX_ATTEMPTS:
+                    raise ConflictException("Branch %s kept moving, %s not committed: %s" %
+                                            (self.branch, sorted(changes), e.data))
+                if self.logger:
+                    self.logger.info("Committing again, branch %s moved on", self.branch)
+        with self.lock:
+            self.shas.update((path, blob_sha(content)) for path, content in changes.items())
+        return sorted(changes), commit.sha
+
+
+def get_sync(settings, logger=None, owner='elifesciences'):
+    "The GithubSync of the repository of settings, created once per process"
+    key = (settings.github_token, owner, settings.git_repo_name)
+    with syncs_lock:
+        if key not in syncs:
+            syncs[key] = GithubSync(settings.github_token, owner, settings.git_repo_name, logger)
+        return syncs[key]
@@ -1,7 +1,7 @@
 import sys, json
-import requests
 import re
 from functional import seq
+import provider.endpoint_check as endpoint_check
 
 '''
 glencoe_resp = {
@@ -50,12 +50,12 @@ def validate_sources(gc_data):
         assert len(available_sources) == len(known_sources), msg
 
 
-def metadata(msid, settings):
+def metadata(msid, settings, http_session=None):
     padded_msid = str(msid).zfill(5)
     doi = "10.7554/eLife." + padded_msid
     url = settings.video_url + doi
 
-    resp = requests.get(url)
+    resp = endpoint_check.request('get', url, None, http_session)
 
     assert resp.status_code != 404, "article has no videos - url requested: %s" % url
     assert resp.status_code == 200, "unhandled status code from Glencoe: %s - url requested: %s" % \
@@ -1,24 +1,26 @@
-import requests
-
-class ShortRetryException(RuntimeError):
-    pass
+import provider.endpoint_check as endpoint_check
 
 def endpoint(settings, iiif_path_for_article, figure):
     iiif_path_for_figure = iiif_path_for_article.replace('{article_fig}', figure)
     return settings.path_to_iiif_server + iiif_path_for_figure
 
-def try_endpoint(endpoint, logger):
+def try_endpoint(endpoint, logger, http_session=None):
     try:
-        response = requests.head(endpoint)
-        if response.status_code == 504:
-            raise ShortRetryException("Response code was %s" % response.status_code)
+        response = endpoint_check.request('head', endpoint, logger, http_session,
+                                          retry_status_codes=(504,))
         if response.status_code != 200:
             logger.error("Error status code != 200. Status code: %s for URL %s\nContent:\n%s", response.status_code, endpoint, response.content)
             return False, endpoint
         return True, endpoint
-    except ShortRetryException as e:
-        logger.info('short retry because %s', e)
-        return try_endpoint(endpoint, logger)
     except Exception as e:
         logger.exception(str(e))
         return False, endpoint
+
+def try_endpoints(endpoints, logger, pool_size=endpoint_check.POOL_SIZE):
+    "Check the endpoints concurrently over one pooled session"
+    http_session = endpoint_check.session(pool_size)
+    try:
+        return endpoint_check.check_endpoints(
+            endpoints, lambda url: try_endpoint(url, logger, http_session), pool_size)
+    finally:
+        http_session.close()
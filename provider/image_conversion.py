@@ -1,23 +1,28 @@
+import logging
+import multiprocessing
+import os
+import time
+from multiprocessing.pool import ThreadPool
 import provider.imageresize as resizer
+from provider.article_structure import ArticleInfo
 from provider.storage_provider import StorageContext
 from mimetypes import guess_type
 
+# figures downloaded and uploaded at the same time while others are converted
+IO_POOL_SIZE = 8
+
 
 def generate_images(settings, formats, fp, info, publish_locations, logger):
         try:
-            for format_spec_name in formats:
-                format_spec = formats[format_spec_name]
-                # if sources not present or includes file extension for this image
-                if 'sources' not in format_spec or info.extension in [
-                        x.strip() for x in format_spec['sources'].split(',')]:
-                    download = 'download' in format_spec and format_spec['download']
-                    fp.seek(0)  # rewind the tape
-                    filename, image = resizer.resize(format_spec, fp, info, logger)
-                    if filename is not None and image is not None:
-                        store_in_publish_locations(settings, filename, image, publish_locations, download)
-                        logger.info("Stored image %s as %s" % (filename, str(publish_locations)))
-                    else:
-                        raise RuntimeError("filename or image is None. resizer.resize problem.")
+            for format_spec in format_specs(formats, info):
+                download = 'download' in format_spec and format_spec['download']
+                fp.seek(0)  # rewind the tape
+                filename, image = resizer.resize(format_spec, fp, info, logger)
+                if filename is not None and image is not None:
+                    store_in_publish_locations(settings, filename, image, publish_locations, download)
+                    logger.info("Stored image %s as %s" % (filename, str(publish_locations)))
+                else:
+                    raise RuntimeError("filename or image is None. resizer.resize problem.")
         finally:
             fp.close()
 
@@ -41,4 +46,96 @@ def store_in_publish_locations(settings, filename, image, publish_locations, dow
                                                   additional_dict_metadata=dict_metadata)
 
         finally:
-            image.close()
\ No newline at end of file
+            image.close()
+
+
+def format_specs(formats, info):
+    "The format specs of formats that apply to the file of info"
+    return [formats[format_spec_name] for format_spec_name in formats
+            if 'sources' not in formats[format_spec_name] or info.extension in [
+                x.strip() for x in formats[format_spec_name]['sources'].split(',')]]
+
+
+def convert_file(formats, file_path):
+    """
+    Convert a local image file to each of the formats that apply to it, the images are
+    written next to the file. Runs in a worker process, returns a list of
+    (file name, image path, download) and the seconds spent converting
+    """
+    start = time.time()
+    logger = logging.getLogger(__name__)
+    info = ArticleInfo(os.path.basename(file_path))
+    images = []
+    with open(file_path, 'rb') as fp:
+        for index, format_spec in enumerate(format_specs(formats, info)):
+            download = 'download' in format_spec and format_spec['download']
+            fp.seek(0)  # rewind the tape
+            filename, image = resizer.resize(format_spec, fp, info, logger)
+            if filename is None or image is None:
+                raise RuntimeError("filename or image is None. resizer.resize problem.")
+            image_path = "%s.%s.%s" % (file_path, index, filename)
+            with open(image_path, 'wb') as image_file:
+                image_file.write(image.getvalue())
+            images.append((filename, image_path, download))
+    return images, time.time() - start
+
+
+def convert_figures(settings, formats, file_names, download, publish_locations, logger,
+                    processes=None, io_pool_size=IO_POOL_SIZE):
+    """
+    Convert the figures with a pool of processes, one per core unless processes is given,
+    while the figures are downloaded and the images uploaded by a pool of threads.
+    download is called with a file name and returns the path of the downloaded file
+    """
+    processes = min(processes or multiprocessing.cpu_count(), len(file_names))
+    if processes < 1:
+        return
+    timings = dict((file_name, {}) for file_name in file_names)
+
+    def timed_download(file_name):
+        start = time.time()
+        file_path = download(file_name)
+        timings[file_name]['download'] = time.time() - start
+        return file_name, file_path
+
+    def upload(file_name, images):
+        start = time.time()
+        for filename, image_path, download in images:
+            store_in_publish_locations(settings, filename, open(image_path, 'rb'),
+                                       publish_locations, download)
+            logger.info("Stored image %s as %s" % (filename, str(publish_locations)))
+        timings[file_name]['upload'] = time.time() - start
+
+    # the processes are forked before the threads are started
+    process_pool = multiprocessing.Pool(processes)
+    io_pool = ThreadPool(min(io_pool_size, len(file_names)))
+    uploads = []
+
+    def queue_upload(file_name):
+        "Callback of the conversion of file_name, its images are uploaded right away"
+        def converted(result):
+            images, timings[file_name]['convert'] = result
+            uploads.append(io_pool.apply_async(upload, (file_name, images)))
+        return converted
+
+    try:
+        # figures are converted as soon as they are downloaded
+        conversions = [process_pool.apply_async(convert_file, (formats, file_path),
+                                                callback=queue_upload(file_name))
+                       for file_name, file_path in io_pool.imap_unordered(timed_download,
+                                                                          file_names)]
+        # the callback of a conversion has run once its result is ready
+        for conversion in conversions:
+            conversion.get()
+        for result in uploads:
+            result.get()
+    finally:
+        process_pool.terminate()
+        process_pool.join()
+        io_pool.terminate()
+        io_pool.join()
+
+    for file_name in file_names:
+        logger.info("Converted %s: download %.2fs, convert %.2fs, upload %.2fs" % (
+            file_name, timings[file_name]['download'], timings[file_name]['convert'],
+            timings[file_name]['upload']))
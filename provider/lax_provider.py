@@ -1,20 +1,26 @@
 import requests
 import time
+from multiprocessing.pool import ThreadPool
 from . import article
 import base64
 import json
 from dateutil.parser import parse
 import log
 import os
+from . import metrics
 
 identity = "process_%s" % os.getpid()
 logger = log.logger("lax_provider.log", 'INFO', identity)
 
+# concurrent requests to Lax when looking up the status of a batch of articles
+POOL_SIZE = 8
+
 
 class ErrorCallingLaxException(Exception):
     pass
 
 
+@metrics.timed('lax')
 def article_versions(article_id, settings):
     url = settings.lax_article_versions.replace('{article_id}', article_id)
     response = requests.get(url, verify=settings.verify_ssl)
@@ -105,15 +111,61 @@ def poa_vor_status(data):
 
 def was_ever_poa(article_id, settings):
     "Use Lax data to check if the article was ever a PoA article"
+    return article_status(article_id, settings)['was_ever_poa']
+
+
+def article_status(article_id, settings):
+    """
+    Look up the versions of an article in Lax once and derive from them
+    the PoA and VoR status, whether it was ever PoA and its highest version
+    """
     status_code, data = article_versions(article_id, settings)
+    status = {'poa': None, 'vor': None, 'was_ever_poa': None, 'highest_version': None}
     if status_code == 200:
-        poa_status, vor_status = poa_vor_status(data)
-        if poa_status is True:
-            return True
-        else:
-            return False
-    else:
-        return None
+        status['poa'], status['vor'] = poa_vor_status(data)
+        status['was_ever_poa'] = status['poa'] is True
+        status['highest_version'] = max(
+            [int(vd["version"]) for vd in data or [] if "version" in vd] or [0])
+    elif status_code == 404:
+        # same as article_highest_version
+        status['highest_version'] = "1"
+    return status
+
+
+def article_statuses(article_ids, settings, pool_size=POOL_SIZE):
+    """
+    Look up the status of each article concurrently, one Lax request per article,
+    returns a dict of article_status by article_id
+    """
+    article_ids = sorted(set(article_ids))
+    if not article_ids:
+        return {}
+    pool = ThreadPool(min(pool_size, len(article_ids)))
+    try:
+        statuses = pool.map(lambda article_id: article_status(article_id, settings), article_ids)
+    finally:
+        pool.close()
+        pool.join()
+    return dict(zip(article_ids, statuses))
+
+
+def is_published(status, is_poa, was_ever_poa):
+    """
+    Decide from an article_status whether the article is published,
+    considering whether it is or was ever PoA
+    """
+    if (is_poa is True or
+            (is_poa is False and was_ever_poa is False) or
+            (is_poa is False and was_ever_poa is None)):
+        # In this case, any version is sufficient
+        return bool(status['poa'] or status['vor'])
+    elif is_poa is False and was_ever_poa is True:
+        # In the case of was ever PoA but is not PoA
+        #  check there is a VoR version
+        return bool(status['vor'])
+    # Default
+    return False
+
 
 def prepare_action_message(settings, article_id, run, expanded_folder, version, status, eif_location, action, force=False):
         xml_bucket = settings.publishing_buckets_prefix + settings.expanded_bucket
@@ -0,0 +1,91 @@
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import wraps
+
+"""
+Per-task instrumentation: call counts and latencies per backend and timed spans.
+A worker processes one activity task at a time, so the metrics for the task being
+processed are kept for the process, and are reset by start_task()
+"""
+
+
+class TaskMetrics(object):
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.start = time.time()
+        self.calls = defaultdict(lambda: {'count': 0, 'errors': 0, 'seconds': 0.0})
+        self.spans = []
+
+    def record_call(self, backend, operation, seconds, error=False):
+        with self.lock:
+            for name in (backend, backend + '.' + operation):
+                self.calls[name]['count'] += 1
+                self.calls[name]['seconds'] += seconds
+                if error:
+                    self.calls[name]['errors'] += 1
+
+    def record_span(self, name, start, seconds):
+        with self.lock:
+            self.spans.append({'name': name, 'offset': round(start - self.start, 3),
+                               'seconds': round(seconds, 3)})
+
+    def to_dict(self):
+        with self.lock:
+            calls = {}
+            for name, call in self.calls.items():
+                calls[name] = {'count': call['count'], 'errors': call['errors'],
+                               'seconds': round(call['seconds'], 3)}
+            return {
+                'seconds': round(time.time() - self.start, 3),
+                'calls': calls,
+                'spans': list(self.spans)
+            }
+
+
+_current = TaskMetrics()
+
+
+def start_task():
+    "Discard the metrics of the previous task and start recording a new one"
+    global _current
+    _current = TaskMetrics()
+    return _current
+
+
+def current():
+    return _current
+
+
+def timed(backend, operation=None):
+    """
+    Decorator counting the calls to the decorated function and its latency against a backend,
+    for example @timed('s3') or @timed('lax', 'article_versions')
+    """
+    def decorator(function):
+        name = operation or function.__name__
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.time()
+            error = True
+            try:
+                result = function(*args, **kwargs)
+                error = False
+                return result
+            finally:
+                _current.record_call(backend, name, time.time() - start, error)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def span(name):
+    "Time a block of code as a named span of the current task"
+    start = time.time()
+    try:
+        yield
+    finally:
+        _current.record_span(name, start, time.time() - start)
@@ -0,0 +1,58 @@
+import os
+from multiprocessing.pool import ThreadPool
+from boto.s3.connection import S3Connection
+from provider.bulk_rename import delete_keys
+
+"""
+Move files out of an S3 outbox folder: concurrent server side copies to the published
+folder, then the outbox keys deleted with multi-object deletes
+"""
+
+POOL_SIZE = 10
+
+
+def get_bucket(settings, bucket_name):
+    "The outbox bucket, without the request to check that it exists"
+    s3_conn = S3Connection(settings.aws_access_key_id, settings.aws_secret_access_key)
+    return s3_conn.get_bucket(bucket_name, validate=False)
+
+
+def move_keys(bucket, key_names, to_folder, logger=None, pool_size=POOL_SIZE):
+    """
+    Move each key of key_names in bucket to to_folder under its file name, a key is only
+    deleted once it is copied. Folder keys are left in place.
+    Returns a report of the key names moved and failed, those not copied or not deleted
+    """
+    report = {'moved': [], 'failed': []}
+    key_names = [key_name for key_name in key_names if not key_name.endswith('/')]
+    if not key_names:
+        return report
+
+    def copy_key(key_name):
+        new_key_name = to_folder + key_name.split('/')[-1]
+        try:
+            bucket.copy_key(new_key_name, bucket.name, key_name)
+            return True
+        except Exception:
+            if logger:
+                logger.exception("Failed to copy %s to %s" % (key_name, new_key_name))
+            return False
+
+    pool = ThreadPool(min(pool_size, len(key_names)))
+    try:
+        results = pool.map(copy_key, key_names)
+    finally:
+        pool.close()
+        pool.join()
+
+    copied = [key_name for key_name, success in zip(key_names, results) if success]
+    report['failed'] = [key_name for key_name, success in zip(key_names, results) if not success]
+    deleted, failed = delete_keys(bucket, copied, logger)
+    report['moved'] = deleted
+    report['failed'] += failed
+    return report
+
+
+def outbox_key_names(outbox_folder, file_names):
+    "The outbox key names of local file paths or file names"
+    return [outbox_folder + file_name.split(os.sep)[-1] for file_name in file_names]
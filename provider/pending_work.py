@@ -0,0 +1,65 @@
+import threading
+import time
+from boto.s3.key import Key
+
+"""
+Whether a starter has work waiting, answered with a single small request however much
+work is waiting, and kept for a short while so repeated checks cost nothing
+"""
+
+# seconds an answer is kept
+CACHE_SECONDS = 60
+# SimpleDB EmailQueue date format
+DATE_FORMAT = "%Y-%m-%dT%H:%M:%S.000Z"
+
+answers = {}
+answers_lock = threading.Lock()
+
+
+def cached(key, probe, seconds=CACHE_SECONDS):
+    "The answer of probe for key, called again once the last answer is older than seconds"
+    now = time.time()
+    with answers_lock:
+        if key in answers and now - answers[key][0] < seconds:
+            return answers[key][1]
+    answer = probe()
+    with answers_lock:
+        answers[key] = (now, answer)
+    return answer
+
+
+def s3_prefix_has_keys(bucket, prefix, delimiter='/', max_keys=10):
+    """
+    Whether there is a key in the prefix folder of bucket, other than the folder itself,
+    listing max_keys at a time until one is found
+    """
+    marker = ''
+    while True:
+        result = bucket.get_all_keys(prefix=prefix, delimiter=delimiter, max_keys=max_keys,
+                                     marker=marker)
+        if any(isinstance(item, Key) and item.name != prefix for item in result):
+            return True
+        if not result.is_truncated or not len(result):
+            return False
+        # only subfolders so far
+        marker = result.next_marker or result[-1].name
+
+
+def email_queue_has_items(db, date_scheduled_before=None):
+    """
+    Whether an email not yet sent is in the SimpleDB EmailQueue, scheduled before
+    date_scheduled_before when supplied, selecting a single item name rather than
+    counting them all
+    """
+    domain_name = "EmailQueue"
+    query = db.elife_get_email_queue_query(
+        DATE_FORMAT, db.get_domain_name(domain_name), query_type="names", limit=1,
+        date_scheduled_before=date_scheduled_before)
+    for item in db.get_domain(domain_name).select(query, max_items=1):
+        return True
+    return False
+
+
+def bucket_has_pending_keys(bucket, prefix, seconds=CACHE_SECONDS):
+    return cached(('s3', bucket.name, prefix), lambda: s3_prefix_has_keys(bucket, prefix),
+                  seconds)
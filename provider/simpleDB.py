@@ -7,6 +7,8 @@ import boto.sdb
 import boto.s3
 from boto.s3.connection import S3Connection
 
+from provider import metrics
+
 """
 SimpleDB S3 data provider
 A home for SimpleDB functions so code is not duplicated
@@ -43,6 +45,7 @@ class SimpleDB(object):
                                             self.settings.aws_secret_access_key)
         return self.sdb_conn
 
+    @metrics.timed('sdb')
     def get_item(self, domain_name, item_name, consistent_read=True):
         """
         Encapsulate boto.sdb get_item, by additionally specifying the domain to read from
@@ -55,6 +58,7 @@ class SimpleDB(object):
         dom = self.domains[domain_name]
         return dom.get_item(item_name, consistent_read)
 
+    @metrics.timed('sdb')
     def put_attributes(self, domain_name, item_name, item_attrs):
         """
         Encapsulate boto.sdb put_attributes, by additionally specifying the domain to put into
@@ -110,6 +114,7 @@ class SimpleDB(object):
         return boto.sdb.connect_to_region(region, aws_access_key_id=aws_access_key_id,
                                           aws_secret_access_key=aws_secret_access_key)
 
+    @metrics.timed('sdb')
     def sdb_domain_exists(self, domain_name_env):
         exists = None
         try:
@@ -120,6 +125,7 @@ class SimpleDB(object):
             exists = False
         return exists
 
+    @metrics.timed('sdb')
     def sdb_create_domain(self, domain_name_env):
         dom = self.sdb_conn.create_domain(domain_name_env)
         return dom
@@ -181,6 +187,7 @@ class SimpleDB(object):
         bucket_name = self.settings.lens_jpg_bucket
         return self.elife_get_generic_delivery_S3_file_items(bucket_name, last_updated_since)
 
+    @metrics.timed('sdb')
     def elife_get_generic_delivery_S3_file_items(self, bucket_name, last_updated_since=None):
         """
         From the SimpleDB domain for the S3FileLog, return a list of matching item to the attributes
@@ -248,6 +255,7 @@ class SimpleDB(object):
 
         return query
 
+    @metrics.timed('sdb')
     def elife_get_article_S3_file_items(self, file_data_type=None, doi_id=None,
                                         last_updated_since=None, latest=None):
         """
@@ -418,13 +426,15 @@ class SimpleDB(object):
 
         return item_list
 
+    @metrics.timed('sdb')
     def elife_get_email_queue_items(self, query_type="items", sort_by=None, limit=None,
                                     sent_status=None, email_type=None, doi_id=None,
                                     date_scheduled_before=None, date_sent_before=None,
                                     recipient_email=None):
         """
         From the SimpleDB domain for the EmailQueue, return list of matching item to the attributes
-          query_type:       Type of query: "items" return items, "count" return a count of items
+          query_type:       Type of query: "items" return items, "count" return a count of items,
+                            "names" return only the item names
             sent_status:    True, False, None - Booleans will be converted to strings for the query
             email_type:               template type or email type
             doi_id:                   five digit numeric string as the unique portion of the DOI
@@ -537,6 +547,8 @@ class SimpleDB(object):
             query = query + 'select * from '
         elif query_type == "count":
             query = query + 'select count(*) from '
+        elif query_type == "names":
+            query = query + 'select itemName() from '
         query = query + domain_name + ''
         query = query + where_clause
         query = query + order_by
@@ -720,6 +732,7 @@ class SimpleDB(object):
         # Default
         return None
 
+    @metrics.timed('s3')
     def elife_save_email_body_to_s3(self, body_s3key, body):
         """
         From the S3 bucket, get the object content for the body_s3key key
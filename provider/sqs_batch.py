@@ -0,0 +1,77 @@
+import json
+import time
+from boto.sqs.message import Message
+
+"""
+Send and delete SQS messages in batches, and count the messages going through a queue consumer
+"""
+
+# SQS limit for a single ReceiveMessage / SendMessageBatch / DeleteMessageBatch
+MAX_MESSAGES = 10
+# seconds between two throughput log lines
+THROUGHPUT_INTERVAL = 60
+
+
+def chunks(items, size=MAX_MESSAGES):
+    for index in range(0, len(items), size):
+        yield items[index:index + size]
+
+
+def send_messages(queue, messages, logger):
+    """
+    Given a list of (item, message) tuples, where the message is a dict to send as JSON,
+    send the messages with SendMessageBatch and return the items whose message was sent
+    """
+    sent = []
+    for chunk in chunks(messages):
+        entries = []
+        for index, (item, message) in enumerate(chunk):
+            m = Message()
+            m.set_body(json.dumps(message))
+            entries.append((str(index), m.get_body_encoded(), 0))
+        result = queue.write_batch(entries)
+        failed_ids = set(error['id'] for error in result.errors)
+        for error in result.errors:
+            logger.error("Failed to send message: %s" % error)
+        sent += [item for index, (item, message) in enumerate(chunk)
+                 if str(index) not in failed_ids]
+    return sent
+
+
+def delete_messages(queue, queue_messages, logger):
+    "Delete the messages with DeleteMessageBatch, return the number deleted"
+    deleted = 0
+    for chunk in chunks(queue_messages):
+        result = queue.delete_message_batch(chunk)
+        for error in result.errors:
+            logger.error("Failed to delete message: %s" % error)
+        deleted += len(chunk) - len(result.errors)
+    return deleted
+
+
+class Throughput(object):
+    """
+    Counts of messages by kind, for example received and sent,
+    logged with their rate every THROUGHPUT_INTERVAL seconds
+    """
+
+    def __init__(self, logger, interval=THROUGHPUT_INTERVAL):
+        self.logger = logger
+        self.interval = interval
+        self.counts = {}
+        self.start = time.time()
+
+    def add(self, kind, count):
+        self.counts[kind] = self.counts.get(kind, 0) + count
+
+    def log_if_due(self):
+        "Log the counts since the last time and start counting again, once the interval is over"
+        seconds = float(time.time() - self.start)
+        if seconds < self.interval:
+            return False
+        counts = ", ".join("%s %s (%.2f/s)" % (kind, count, count / seconds)
+                           for kind, count in sorted(self.counts.items()))
+        self.logger.info("throughput over %.0f seconds: %s" % (seconds, counts or "no messages"))
+        self.counts = {}
+        self.start = time.time()
+        return True
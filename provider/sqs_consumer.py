@@ -0,0 +1,171 @@
+import threading
+from multiprocessing.pool import ThreadPool
+import boto.sqs
+from provider import sqs_batch
+
+"""
+Long running SQS queue consumer the queue daemons are built on
+
+A consumer receives batches of messages with long polling and calls a handler for each
+message, several at a time when its concurrency is above 1. The handler returns what to
+do with the message, see Outcome. The messages to forward are sent in batches to the
+output queue, the messages done with are deleted in batches, and while a batch is being
+handled the visibility timeout of its messages is extended so a slow handler does not let
+them be received again. When the flag goes red the batch in hand is finished before the
+consumer stops
+"""
+
+WAIT_TIME_SECONDS = 20
+VISIBILITY_TIMEOUT = 60
+
+
+class Outcome(object):
+    "What to do with a message once handled"
+
+    def __init__(self, action, message=None, delay=None):
+        self.action = action
+        self.message = message
+        self.delay = delay
+
+
+# delete the message
+DONE = Outcome('done')
+# leave the message to be received again once its visibility timeout is over
+KEEP = Outcome('keep')
+
+
+def forward(message):
+    "Send the message dict to the output queue, then delete the message"
+    return Outcome('forward', message=message)
+
+
+def retry(delay):
+    "Make the message visible again after delay seconds"
+    return Outcome('retry', delay=delay)
+
+
+def connect(settings):
+    return boto.sqs.connect_to_region(settings.sqs_region,
+                                      aws_access_key_id=settings.aws_access_key_id,
+                                      aws_secret_access_key=settings.aws_secret_access_key)
+
+
+class VisibilityExtender(object):
+    """
+    Extends the visibility timeout of the messages not handled yet every half
+    visibility timeout, until stopped
+    """
+
+    def __init__(self, queue, queue_messages, visibility_timeout, logger):
+        self.queue = queue
+        self.pending = dict((queue_message.id, queue_message) for queue_message in queue_messages)
+        self.visibility_timeout = visibility_timeout
+        self.logger = logger
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run)
+        self.thread.daemon = True
+
+    def start(self):
+        self.thread.start()
+
+    def handled(self, queue_message):
+        with self.lock:
+            self.pending.pop(queue_message.id, None)
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+
+    def run(self):
+        while not self.stopped.wait(self.visibility_timeout / 2.0):
+            with self.lock:
+                pending = self.pending.values()
+            for chunk in sqs_batch.chunks(pending):
+                try:
+                    self.queue.change_message_visibility_batch(
+                        [(queue_message, self.visibility_timeout) for queue_message in chunk])
+                except Exception:
+                    self.logger.exception("Failed to extend the visibility timeout of messages")
+
+
+class Consumer(object):
+
+    def __init__(self, queue, handle, logger, out_queue=None,
+                 batch_size=sqs_batch.MAX_MESSAGES, wait_time_seconds=WAIT_TIME_SECONDS,
+                 visibility_timeout=VISIBILITY_TIMEOUT, concurrency=1):
+        self.queue = queue
+        self.handle = handle
+        self.logger = logger
+        self.out_queue = out_queue
+        self.batch_size = min(batch_size, sqs_batch.MAX_MESSAGES)
+        self.wait_time_seconds = wait_time_seconds
+        self.visibility_timeout = visibility_timeout
+        self.concurrency = concurrency
+        self.throughput = sqs_batch.Throughput(logger)
+
+    def run(self, flag):
+        "Consume messages until the flag goes red"
+        pool = ThreadPool(self.concurrency) if self.concurrency > 1 else None
+        try:
+            while flag.green():
+                self.logger.debug('reading queue')
+                queue_messages = self.queue.get_messages(
+                    num_messages=self.batch_size,
+                    visibility_timeout=self.visibility_timeout,
+                    wait_time_seconds=self.wait_time_seconds)
+                if queue_messages:
+                    self.logger.info('got %s messages' % len(queue_messages))
+                    self.process_batch(queue_messages, pool)
+                self.throughput.log_if_due()
+        finally:
+            if pool:
+                pool.close()
+                pool.join()
+        self.logger.info("graceful shutdown")
+
+    def process_batch(self, queue_messages, pool=None):
+        "Handle a batch of messages and act on their outcomes with batch requests"
+        self.throughput.add('received', len(queue_messages))
+        extender = VisibilityExtender(self.queue, queue_messages, self.visibility_timeout,
+                                      self.logger)
+        extender.start()
+        try:
+            def handle(queue_message):
+                try:
+                    return self.handle_message(queue_message)
+                finally:
+                    extender.handled(queue_message)
+            outcomes = pool.map(handle, queue_messages) if pool else map(handle, queue_messages)
+        finally:
+            extender.stop()
+
+        done = []
+        forwards = []
+        retries = []
+        for queue_message, outcome in zip(queue_messages, outcomes):
+            if outcome.action == 'done':
+                done.append(queue_message)
+            elif outcome.action == 'forward':
+                forwards.append((queue_message, outcome.message))
+            elif outcome.action == 'retry':
+                retries.append((queue_message, outcome.delay))
+
+        if forwards:
+            sent = sqs_batch.send_messages(self.out_queue, forwards, self.logger)
+            self.throughput.add('sent', len(sent))
+            done += sent
+        if done:
+            self.throughput.add('deleted', sqs_batch.delete_messages(self.queue, done, self.logger))
+        if retries:
+            self.throughput.add('retried', len(retries))
+            for chunk in sqs_batch.chunks(retries):
+                self.queue.change_message_visibility_batch(chunk)
+
+    def handle_message(self, queue_message):
+        "Call the handler, a message it fails on is kept"
+        try:
+            return self.handle(queue_message) or DONE
+        except Exception:
+            self.logger.exception('error handling message id: %s' % queue_message.id)
+            return KEEP
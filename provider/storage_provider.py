@@ -4,6 +4,8 @@ from boto.s3.connection import S3Connection
 from boto.s3.bucket import Bucket
 import re
 import os
+import threading
+from provider import metrics
 
 
 def StorageContext(*args):
@@ -20,6 +22,8 @@ class S3StorageContext:
         self.context = {}
         self.context['buckets'] = {}
         self.settings = settings
+        # the bucket and connection caches can be shared by threads
+        self.lock = threading.RLock()
 
 
     #Resource format expected s3://my-bucket/my/path/abc.zip
@@ -36,24 +40,29 @@ class S3StorageContext:
         bucket = self.get_bucket_from_cache(bucket_name)
         return bucket, s3_key
 
+    @metrics.timed('s3')
     def get_resource_to_file(self, resource, file):
         bucket, s3_key = self.s3_storage_objects(resource)
         key = Key(bucket)
         key.key = s3_key
         key.get_contents_to_file(file)
 
+    @metrics.timed('s3')
     def get_resource_as_string(self, resource):
         bucket, s3_key = self.s3_storage_objects(resource)
         key = Key(bucket)
         key.key = s3_key
         return key.get_contents_as_string()
 
+    @metrics.timed('s3')
     def set_resource_from_filename(self, resource, file):
         bucket, s3_key = self.s3_storage_objects(resource)
         key = Key(bucket)
         key.key = s3_key
         key.set_contents_from_filename(file)
+        return key
 
+    @metrics.timed('s3')
     def set_resource_from_file(self, resource, file, metadata=None):
         bucket, s3_key = self.s3_storage_objects(resource)
         key = Key(bucket)
@@ -65,6 +74,7 @@ class S3StorageContext:
 
         key.set_contents_from_file(file)
 
+    @metrics.timed('s3')
     def set_resource_from_string(self, resource, data, content_type=None):
         bucket, s3_key = self.s3_storage_objects(resource)
         key = Key(bucket)
@@ -74,6 +84,7 @@ class S3StorageContext:
 
         key.set_contents_from_string(data)
 
+    @metrics.timed('s3')
     def get_resource_to_file_pointer(self, resource, file_path):
         bucket, s3_key = self.s3_storage_objects(resource)
         key = Key(bucket)
@@ -90,6 +101,7 @@ class S3StorageContext:
         fp = open(file_path, mode='rb')
         return fp
 
+    @metrics.timed('s3')
     def list_resources(self, folder):
         bucket, s3_key = self.s3_storage_objects(folder)
         folder = s3_key[1:] if s3_key[:1] == "/" else s3_key
@@ -102,6 +114,31 @@ class S3StorageContext:
 
         return files
 
+    def list_resource_keys(self, folder):
+        "Return the keys of the resources in a folder by file name, from the bucket listing"
+        bucket, s3_key = self.s3_storage_objects(folder)
+        folder = s3_key[1:] if s3_key[:1] == "/" else s3_key
+        keys = {}
+        for key in bucket.list(prefix=folder + "/"):
+            keys[key.name.rsplit('/', 1)[1]] = key
+        return keys
+
+    @metrics.timed('s3')
+    def list_resource_etags(self, folder):
+        """
+        Return the ETag of each resource in a folder by file name,
+        from the bucket listing without requesting each key
+        """
+        return dict((file_name, key.etag)
+                    for file_name, key in self.list_resource_keys(folder).items())
+
+    @metrics.timed('s3')
+    def list_resource_sizes(self, folder):
+        "Return the size of each resource in a folder by file name, from the bucket listing"
+        return dict((file_name, key.size)
+                    for file_name, key in self.list_resource_keys(folder).items())
+
+    @metrics.timed('s3')
     def copy_resource(self, orig_resource, dest_resource, additional_dict_metadata=None):
         orig_bucket, orig_s3_key = self.s3_storage_objects(orig_resource)
 
@@ -114,20 +151,17 @@ class S3StorageContext:
 
         dest_bucket, dest_s3_key = self.s3_storage_objects(dest_resource)
 
-        dest_key = dest_bucket.get_key(dest_s3_key, validate=True)
-        if dest_key is None:
-            dest_key = dest_bucket.new_key(dest_s3_key)
-            dest_key.set_contents_from_string('')
-
-        dest_bucket.copy_key(dest_key.name[1:], orig_bucket.name, orig_s3_key[1:], metadata=metadata)
+        # a single server side copy, it creates or replaces the destination
+        dest_bucket.copy_key(dest_s3_key[1:], orig_bucket.name, orig_s3_key[1:], metadata=metadata)
 
     def get_bucket_from_cache(self, bucket_name):
 
-        if bucket_name in self.context['buckets']:
-            bucket =  self.context['buckets'][bucket_name]
-        else:
-            bucket = self.get_bucket(bucket_name)
-            self.context['buckets'][bucket_name] = bucket
+        with self.lock:
+            if bucket_name in self.context['buckets']:
+                bucket =  self.context['buckets'][bucket_name]
+            else:
+                bucket = self.get_bucket(bucket_name)
+                self.context['buckets'][bucket_name] = bucket
         return bucket
 
     def get_bucket(self, bucket_name):
@@ -138,11 +172,12 @@ class S3StorageContext:
 
     def get_connection_from_cache(self):
 
-        if 'connection' in self.context:
-            connection =  self.context['connection']
-        else:
-            connection = self.get_connection()
-            self.context['connection'] = connection
+        with self.lock:
+            if 'connection' in self.context:
+                connection =  self.context['connection']
+            else:
+                connection = self.get_connection()
+                self.context['connection'] = connection
         return connection
 
     def get_connection(self):
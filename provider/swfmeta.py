@@ -33,7 +33,7 @@ class SWFMeta(object):
                                             close_status=None):
         """
         Get the count of executions from SWF, limited to 90 days by Amazon,
-        for the criteria supplied
+        for the criteria supplied, either the start dates or the close dates
         Relies on boto.swf.count_closed_workflow_executions
         Note: Cannot send a workflow_name and close_status at the same time
         """
@@ -59,7 +59,8 @@ class SWFMeta(object):
     def get_closed_workflow_executionInfos(self, domain=None, workflow_id=None,
                                            workflow_name=None, workflow_version=None,
                                            start_oldest_date=None, start_latest_date=None,
-                                           close_status=None, maximum_page_size=100):
+                                           close_status=None, maximum_page_size=100,
+                                           close_oldest_date=None, close_latest_date=None):
         """
         Get the full history of executions from SWF, limited to 90 days by Amazon,
         for the criteria supplied
@@ -89,6 +90,8 @@ class SWFMeta(object):
             workflow_version=workflow_version,
             start_oldest_date=start_oldest_date,
             start_latest_date=start_latest_date,
+            close_oldest_date=close_oldest_date,
+            close_latest_date=close_latest_date,
             close_status=close_status_to_query,
             maximum_page_size=maximum_page_size)
 
@@ -114,6 +117,8 @@ class SWFMeta(object):
                             workflow_version=workflow_version,
                             start_oldest_date=start_oldest_date,
                             start_latest_date=start_latest_date,
+                            close_oldest_date=close_oldest_date,
+                            close_latest_date=close_latest_date,
                             close_status=close_status_to_query,
                             maximum_page_size=maximum_page_size,
                             next_page_token=next_page_token)
@@ -0,0 +1,114 @@
+import os
+import re
+import yaml
+
+"""
+Route new S3 files to workflow starters with the rules in newFileWorkflows.yaml
+
+Patterns are compiled once. A bucket name pattern without regex syntax, apart from the
+anchors, is looked up in a dict of exact bucket names, and the rules that apply to a
+bucket are remembered the first time the bucket is seen, so routing an event only
+matches the file name patterns of the rules for its bucket
+"""
+
+LITERAL_PATTERN = re.compile(r'^\^?((?:[^\\.^$*+?{}\[\]|()]|\\[\\.^$*+?{}\[\]|()/-])*)\$$')
+
+
+def literal_bucket_name(pattern):
+    """
+    Return the bucket name a pattern matches exactly, or None when it is a real pattern,
+    for example 'elife-production-final$' or '^elife\\.bucket$'
+    """
+    match = LITERAL_PATTERN.match(pattern)
+    if match:
+        return re.sub(r'\\(.)', r'\1', match.group(1))
+    return None
+
+
+class Rule(object):
+
+    def __init__(self, name, rule):
+        self.name = name
+        self.starter_name = rule['starter_name']
+        self.bucket_name_pattern = rule['bucket_name_pattern']
+        self.bucket_name = literal_bucket_name(self.bucket_name_pattern)
+        self.bucket_name_regex = re.compile(self.bucket_name_pattern)
+        self.file_name_regex = re.compile(rule['file_name_pattern'])
+
+
+class RuleMatcher(object):
+
+    def __init__(self, rules):
+        # rules are tried in name order so routing does not depend on dict order
+        self.rules = [Rule(name, rules[name]) for name in sorted(rules or {})]
+        self.exact = {}
+        self.patterns = []
+        for rule in self.rules:
+            if rule.bucket_name is not None:
+                self.exact.setdefault(rule.bucket_name, []).append(rule)
+            else:
+                self.patterns.append(rule)
+        self.bucket_cache = {}
+
+    def bucket_rules(self, bucket_name):
+        "Rules that apply to a bucket, in name order"
+        if bucket_name not in self.bucket_cache:
+            rules = self.exact.get(bucket_name, []) + [
+                rule for rule in self.patterns if rule.bucket_name_regex.match(bucket_name)]
+            self.bucket_cache[bucket_name] = sorted(rules, key=lambda rule: rule.name)
+        return self.bucket_cache[bucket_name]
+
+    def starter_name(self, bucket_name, file_name):
+        "Return the starter name of the first rule matching the file, or None"
+        for rule in self.bucket_rules(bucket_name):
+            if rule.file_name_regex.match(file_name):
+                return rule.starter_name
+        return None
+
+
+class RulesFile(object):
+    """
+    Rules loaded from a YAML file, reloaded when the file changes
+    """
+
+    def __init__(self, path, logger=None):
+        self.path = path
+        self.logger = logger
+        self.mtime = None
+        self.matcher = None
+        self.reload_if_changed()
+
+    def load(self):
+        with open(self.path, 'r') as open_file:
+            return RuleMatcher(yaml.safe_load(open_file))
+
+    def reload_if_changed(self):
+        """
+        Reload the rules if the file was modified since they were loaded, a file that
+        cannot be read or parsed keeps the previous rules once some were loaded
+        """
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            if self.matcher is None:
+                raise
+            return False
+        if mtime == self.mtime:
+            return False
+        # remember the change even if it does not load, to only log it once
+        self.mtime = mtime
+        try:
+            matcher = self.load()
+        except (IOError, yaml.YAMLError, KeyError, TypeError, re.error):
+            if self.matcher is None:
+                raise
+            if self.logger:
+                self.logger.exception("Could not reload rules from %s" % self.path)
+            return False
+        self.matcher = matcher
+        if self.logger:
+            self.logger.info("Loaded %s rules from %s" % (len(matcher.rules), self.path))
+        return True
+
+    def starter_name(self, bucket_name, file_name):
+        return self.matcher.starter_name(bucket_name, file_name)
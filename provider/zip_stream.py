@@ -0,0 +1,192 @@
+import collections
+import os
+import struct
+import time
+import zipfile
+import zlib
+from multiprocessing.pool import ThreadPool
+from StringIO import StringIO
+from tempfile import SpooledTemporaryFile
+
+"""
+Build a zip archive of S3 keys and upload it to S3 while it is being written
+
+The keys are fetched a few at a time ahead of the one being added to the zip, each is
+spooled in memory or on disk once too big, and the zip is written to a multipart upload
+whose parts are sent while the following entries are written, so the memory and disk used
+are bounded by the fetch window and the part size rather than the size of the archive
+"""
+
+POOL_SIZE = 4
+# keys fetched ahead of the one being added to the zip
+WINDOW = 8
+# S3 minimum part size is 5 MB, except for the last part
+PART_SIZE = 16 * 1024 * 1024
+# parts being uploaded at the same time while the zip is written
+MAX_PENDING_PARTS = 2
+# a fetched key bigger than this is spooled to disk
+SPOOL_SIZE = 8 * 1024 * 1024
+CHUNK_SIZE = 1024 * 1024
+# already compressed formats are stored, deflating them again only costs time
+STORED_EXTENSIONS = ['avi', 'docx', 'gif', 'gz', 'jpeg', 'jpg', 'mov', 'mp3', 'mp4',
+                     'pdf', 'png', 'pptx', 'xlsx', 'zip']
+DATA_DESCRIPTOR_SIGNATURE = 0x08074b50
+
+
+class MultipartUploadStream(object):
+    """
+    Write only file object uploading what is written to an S3 key, a part at a time
+    in the background
+    """
+
+    def __init__(self, bucket, key_name, part_size=PART_SIZE, max_pending_parts=MAX_PENDING_PARTS):
+        self.upload = bucket.initiate_multipart_upload(key_name)
+        self.part_size = part_size
+        self.buffer = StringIO()
+        self.position = 0
+        self.part_number = 0
+        self.pending = collections.deque()
+        self.max_pending_parts = max_pending_parts
+        self.pool = ThreadPool(max_pending_parts)
+
+    def write(self, data):
+        self.buffer.write(data)
+        self.position += len(data)
+        if self.buffer.tell() >= self.part_size:
+            self.send_part()
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def send_part(self):
+        while len(self.pending) >= self.max_pending_parts:
+            self.pending.popleft().get()
+        self.part_number += 1
+        part = self.buffer
+        part.seek(0)
+        self.pending.append(self.pool.apply_async(
+            self.upload.upload_part_from_file, (part, self.part_number)))
+        self.buffer = StringIO()
+
+    def close(self):
+        "Send the last part and complete the upload"
+        if self.buffer.tell() or not self.part_number:
+            self.send_part()
+        try:
+            while self.pending:
+                self.pending.popleft().get()
+        finally:
+            self.pool.close()
+            self.pool.join()
+        return self.upload.complete_upload()
+
+    def abort(self):
+        self.pool.terminate()
+        self.upload.cancel_upload()
+
+
+def compress_type(file_name):
+    extension = file_name.rsplit('.', 1)[-1].lower() if '.' in file_name else ''
+    return zipfile.ZIP_STORED if extension in STORED_EXTENSIONS else zipfile.ZIP_DEFLATED
+
+
+def write_entry(zip_file, arcname, fileobj, size):
+    """
+    Add the content of fileobj to zip_file, read a chunk at a time, with the CRC and
+    sizes in a data descriptor after the data so the output is never seeked back
+    """
+    zinfo = zipfile.ZipInfo(arcname, time.localtime(time.time())[:6])
+    zinfo.external_attr = 0o600 << 16
+    zinfo.compress_type = compress_type(arcname)
+    zinfo.flag_bits |= 0x08
+    zinfo.header_offset = zip_file.fp.tell()
+    # deflating can make the data a little bigger than it was
+    zip64 = size + size / 1000 + 1024 > zipfile.ZIP64_LIMIT
+    if zip64:
+        zinfo.extract_version = zinfo.create_version = 45
+    zip_file.fp.write(zinfo.FileHeader(zip64))
+
+    compressor = None
+    if zinfo.compress_type == zipfile.ZIP_DEFLATED:
+        compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+    crc = 0
+    file_size = compress_size = 0
+    while True:
+        data = fileobj.read(CHUNK_SIZE)
+        if not data:
+            break
+        file_size += len(data)
+        crc = zlib.crc32(data, crc)
+        if compressor:
+            data = compressor.compress(data)
+        compress_size += len(data)
+        zip_file.fp.write(data)
+    if compressor:
+        data = compressor.flush()
+        compress_size += len(data)
+        zip_file.fp.write(data)
+
+    zinfo.CRC = crc & 0xffffffff
+    zinfo.file_size = file_size
+    zinfo.compress_size = compress_size
+    zip_file.fp.write(struct.pack('<LLQQ' if zip64 else '<LLLL', DATA_DESCRIPTOR_SIGNATURE,
+                                  zinfo.CRC, zinfo.compress_size, zinfo.file_size))
+    zip_file.filelist.append(zinfo)
+    zip_file.NameToInfo[zinfo.filename] = zinfo
+    return zinfo
+
+
+def fetch(key):
+    "Return the content of the key spooled to a file object"
+    spool = SpooledTemporaryFile(max_size=SPOOL_SIZE)
+    key.get_contents_to_file(spool)
+    spool.seek(0)
+    return spool
+
+
+def archive_keys(keys, bucket, key_name, logger=None, pool_size=POOL_SIZE, window=WINDOW,
+                 part_size=PART_SIZE):
+    """
+    Write the keys in a zip uploaded to key_name in bucket, each under its file name,
+    fetching up to window keys ahead with pool_size threads.
+    Returns a report of the files archived and of the bytes read and written
+    """
+    keys = [key for key in keys if not key.name.endswith('/')]
+    report = {'files': 0, 'bytes_in': 0, 'bytes_out': 0}
+    stream = MultipartUploadStream(bucket, key_name, part_size)
+    pool = ThreadPool(pool_size)
+    zip_file = None
+    try:
+        zip_file = zipfile.ZipFile(stream, 'w', zipfile.ZIP_DEFLATED, allowZip64=True)
+        fetches = collections.deque()
+        next_key = 0
+        while next_key < len(keys) or fetches:
+            while next_key < len(keys) and len(fetches) < window:
+                fetches.append((keys[next_key], pool.apply_async(fetch, (keys[next_key],))))
+                next_key += 1
+            key, result = fetches.popleft()
+            spool = result.get()
+            try:
+                zinfo = write_entry(zip_file, os.path.basename(key.name), spool, key.size)
+            finally:
+                spool.close()
+            report['files'] += 1
+            report['bytes_in'] += zinfo.file_size
+        zip_file.close()
+        stream.close()
+        report['bytes_out'] = stream.tell()
+    except Exception:
+        if logger:
+            logger.exception("Failed to archive to %s" % key_name)
+        if zip_file:
+            # the unfinished zip is not to be closed once the upload is cancelled
+            zip_file.fp = None
+        stream.abort()
+        raise
+    finally:
+        pool.terminate()
+        pool.join()
+    return report
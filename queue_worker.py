@@ -1,18 +1,13 @@
-import random
-import time
-import json
 from provider import process
 from optparse import OptionParser
 from S3utility.s3_notification_info import S3NotificationInfo
 from S3utility.s3_sqs_message import S3SQSMessage
-import boto.sqs
-from boto.sqs.message import Message
 import settings as settings_lib
 import log
 import os
-import yaml
-import re
 import newrelic.agent
+from provider.workflow_rules import RulesFile
+from provider import sqs_consumer
 
 # Add parent directory for imports, so activity classes can use elife-api-prototype
 parentdir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -34,77 +29,74 @@ def work(ENV, flag):
     logger = log.logger(log_file, settings.setLevel, identity)
 
     # Simple connect
-    conn = boto.sqs.connect_to_region(settings.sqs_region,
-                                      aws_access_key_id=settings.aws_access_key_id,
-                                      aws_secret_access_key=settings.aws_secret_access_key)
+    conn = sqs_consumer.connect(settings)
     queue = conn.get_queue(settings.S3_monitor_queue)
-    queue.set_message_class(S3SQSMessage)
 
-    rules = load_rules()
-    application = newrelic.agent.application()
+    rules = load_rules(logger)
 
     # Poll for an activity task indefinitely
     if queue is not None:
-        while flag.green():
-
-            logger.info('reading message')
-            queue_message = queue.read(30)
-            # TODO : check for more-than-once delivery
-            # ( Dynamo conditional write? http://tinyurl.com/of3tmop )
-
-            if queue_message is None:
-                logger.info('no messages available')
-            else:
-                with newrelic.agent.BackgroundTask(application, name=queue_message.notification_type, group='queue_worker.py'):
-                    logger.info('got message id: %s' % queue_message.id)
-                    if queue_message.notification_type == 'S3Event':
-                        info = S3NotificationInfo.from_S3SQSMessage(queue_message)
-                        logger.info("S3NotificationInfo: %s", info.to_dict())
-                        workflow_name = get_starter_name(rules, info)
-                        if workflow_name is None:
-                            logger.info("Could not handle file %s in bucket %s" % (info.file_name, info.bucket_name))
-                            return False
-
-                        # build message
-                        message = {
-                            'workflow_name': workflow_name,
-                            'workflow_data': info.to_dict()
-                        }
-
-                        # send workflow initiation message
-                        out_queue = conn.get_queue(settings.workflow_starter_queue)
-                        m = Message()
-                        m.set_body(json.dumps(message))
-                        out_queue.write(m)
-
-                        # cancel incoming message
-                        logger.info("cancelling message")
-                        queue.delete_message(queue_message)
-                        logger.info("message cancelled")
-                    else:
-                        # TODO : log
-                        pass
-            time.sleep(10)
-
-        logger.info("graceful shutdown")
+        queue.set_message_class(S3SQSMessage)
+        out_queue = conn.get_queue(settings.workflow_starter_queue)
+
+        def handle(queue_message):
+            # pick up rule changes without restarting the worker
+            rules.reload_if_changed()
+            return handle_message(queue_message, rules, logger)
+
+        # TODO : check for more-than-once delivery
+        # ( Dynamo conditional write? http://tinyurl.com/of3tmop )
+        sqs_consumer.Consumer(queue, handle, logger, out_queue=out_queue).run(flag)
 
     else:
         logger.error('error obtaining queue')
 
 
-def load_rules():
+def handle_message(queue_message, rules, logger):
+    """
+    Forward the workflow starter message for an S3 event message, drop the S3 event
+    messages no rule will ever route and keep the others
+    """
+    message = route_message(queue_message, rules, logger)
+    if message is not None:
+        return sqs_consumer.forward(message)
+    elif queue_message.notification_type == 'S3Event':
+        return sqs_consumer.DONE
+    return sqs_consumer.KEEP
+
+
+@newrelic.agent.background_task(group='queue_worker.py')
+def route_message(queue_message, rules, logger):
+    """
+    Given an S3 event message, return the workflow starter message for it,
+    or None if it cannot be handled
+    """
+    logger.info('got message id: %s' % queue_message.id)
+    if queue_message.notification_type == 'S3Event':
+        info = S3NotificationInfo.from_S3SQSMessage(queue_message)
+        logger.info("S3NotificationInfo: %s", info.to_dict())
+        workflow_name = get_starter_name(rules, info)
+        if workflow_name is None:
+            logger.info("Could not handle file %s in bucket %s" % (info.file_name, info.bucket_name))
+            return None
+
+        # build message
+        return {
+            'workflow_name': workflow_name,
+            'workflow_data': info.to_dict()
+        }
+    else:
+        # TODO : log
+        return None
+
+
+def load_rules(logger=None):
     # load the rules from the YAML file
-    stream = file('newFileWorkflows.yaml', 'r')
-    return yaml.load(stream)
+    return RulesFile('newFileWorkflows.yaml', logger)
 
 
 def get_starter_name(rules, info):
-    for rule_name in rules:
-        rule = rules[rule_name]
-        if re.match(rule['bucket_name_pattern'], info.bucket_name) and \
-                re.match(rule['file_name_pattern'], info.file_name):
-            return rule['starter_name']
-        pass
+    return rules.starter_name(info.bucket_name, info.file_name)
 
 
 def reload_module(module_name):
@@ -5,16 +5,18 @@ from S3utility.s3_notification_info import S3NotificationInfo
 import settings as settings_lib
 from optparse import OptionParser
 import log
-import boto.sqs
 from provider import process
+from provider import sqs_consumer
 import json
 import importlib
 import os
+import threading
 import uuid
 import newrelic.agent
 
 # this is not an unused import, it is used dynamically
 import starter
+from starter import starter_helper
 
 """
 Example message:
@@ -27,9 +29,16 @@ Example message:
 }
 """
 
+# number of workflows started at the same time
+POOL_SIZE = 10
+
 settings = None
 logger = None
 
+# starter classes by workflow name, imported once
+starters = {}
+starters_lock = threading.Lock()
+
 
 def main(flag):
     global settings
@@ -51,36 +60,40 @@ def main(flag):
 
     # Simple connect
     queue = get_queue()
+    starter_helper.reuse_swf_connections()
+    consumer(queue).run(flag)
 
-    while flag.green():
-        messages = queue.get_messages(1, visibility_timeout=60,
-                                      wait_time_seconds=20)
-        if messages:
-            logger.info(str(len(messages)) + " message received")
-            logger.info('message contents: %s', messages[0])
-            process_message(messages[0])
-        else:
-            logger.debug("No messages received")
-
-    logger.info("graceful shutdown")
 
 def get_queue():
-    conn = boto.sqs.connect_to_region(settings.sqs_region,
-                                      aws_access_key_id=settings.aws_access_key_id,
-                                      aws_secret_access_key=settings.aws_secret_access_key)
+    conn = sqs_consumer.connect(settings)
     queue = conn.get_queue(settings.workflow_starter_queue)
     return queue
 
 
-def process_message(message):
+def consumer(queue):
+    "Start the workflows of a batch of messages concurrently, every message is then deleted"
+    return sqs_consumer.Consumer(queue, start_message, logger, concurrency=POOL_SIZE)
+
+
+def start_message(message):
     try:
+        logger.info('message contents: %s', message)
         message_payload = json.loads(str(message.get_body()))
         name = message_payload.get('workflow_name')
         data = message_payload.get('workflow_data')
         start_workflow(name, data)
     except Exception:
         logger.exception("Exception while processing message")
-    message.delete()
+
+
+def get_starter(workflow_name):
+    "Return the starter class for a workflow name like starter_IngestArticleZip"
+    with starters_lock:
+        if workflow_name not in starters:
+            module = importlib.import_module("starter." + workflow_name)
+            starters[workflow_name] = getattr(module, workflow_name)
+        return starters[workflow_name]
+
 
 @newrelic.agent.background_task(group='queue_workflow_starter.py')
 def start_workflow(workflow_name, workflow_data):
@@ -88,14 +101,7 @@ def start_workflow(workflow_name, workflow_data):
     workflow_name = 'starter_' + workflow_name
     if data_processor is not None:
         workflow_data = data_processor(workflow_name, workflow_data)
-    module_name = "starter." + workflow_name
-    module = importlib.import_module(module_name)
-    try:
-        reload(eval(module))
-    except:
-        pass
-    full_path = "starter." + workflow_name + "." + workflow_name + "()"
-    s = eval(full_path)
+    s = get_starter(workflow_name)()
     s.start(settings=settings, **workflow_data)
 
 # soon to be deprecated
@@ -1,5 +1,6 @@
 from optparse import OptionParser
-import boto.sqs
+import threading
+import time
 from boto.sqs.message import Message
 from boto.s3.key import Key
 from boto.s3.connection import S3Connection
@@ -7,6 +8,8 @@ import requests
 from requests.auth import HTTPBasicAuth
 from provider import process
 from provider import eif as eif_provider
+from provider import endpoint_check
+from provider import sqs_consumer
 import log
 import json
 import newrelic.agent
@@ -15,41 +18,89 @@ import newrelic.agent
 identity = log.identity('shimmy')
 logger = log.logger('shimmy.log', 'INFO', identity)
 
+# messages processed at the same time, unless settings.shimmy_concurrency says otherwise
+CONCURRENCY = 4
+# seconds to wait after Drupal says it is overloaded, doubled each time it says it again
+MIN_BACKOFF = 10
+MAX_BACKOFF = 300
+
+
 class ShortRetryException(RuntimeError):
     pass
 
+
+class Backoff(object):
+    """
+    Delay shared by the workers of a process: once Drupal answers 429 no worker posts
+    until the delay is over, the delay doubles while Drupal stays overloaded and
+    halves again with each successful post
+    """
+
+    def __init__(self, min_delay=MIN_BACKOFF, max_delay=MAX_BACKOFF):
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.delay = 0
+        self.until = 0
+        self.lock = threading.Lock()
+
+    def overloaded(self):
+        "Back off, returns the new delay in seconds"
+        with self.lock:
+            self.delay = min(max(self.delay * 2, self.min_delay), self.max_delay)
+            self.until = time.time() + self.delay
+            return self.delay
+
+    def succeeded(self):
+        with self.lock:
+            self.delay = self.delay / 2 if self.delay > self.min_delay else 0
+
+    def wait(self):
+        "Sleep until the current delay is over"
+        with self.lock:
+            remaining = self.until - time.time()
+        if remaining > 0:
+            time.sleep(remaining)
+
+
 class Shimmy:
-    def __init__(self, settings, logger):
+    def __init__(self, settings, logger, concurrency=None):
         self._settings = settings
         self.logger = logger
+        self.concurrency = concurrency or getattr(settings, 'shimmy_concurrency', CONCURRENCY)
+        self.backoff = Backoff()
+        self.http_session = endpoint_check.session(self.concurrency)
+        self.s3_conn = None
+        self.buckets = {}
+        self.lock = threading.Lock()
 
     def listen(self, flag):
         self.logger.info("started")
-        conn = boto.sqs.connect_to_region(self._settings.sqs_region,
-                                          aws_access_key_id=self._settings.aws_access_key_id,
-                                          aws_secret_access_key=self._settings.aws_secret_access_key)
+        conn = sqs_consumer.connect(self._settings)
         input_queue = conn.get_queue(self._settings.website_ingest_queue)
         output_queue = conn.get_queue(self._settings.workflow_starter_queue)
         if input_queue is not None:
-            while flag.green():
-
-                self.logger.debug('reading queue')
-                queue_message = input_queue.read(visibility_timeout=60, wait_time_seconds=20)
-
-                if queue_message is not None:
-                    self.logger.info('got message id: %s', queue_message.id)
-                    try:
-                        self.process_message(queue_message, output_queue)
-                        queue_message.delete()
-                    except ShortRetryException as e:
-                        self.logger.info('short retry: %s because of %s', queue_message.id, e)
-                        queue_message.change_visibility(visibility_timeout=10)
-
-            self.logger.info("graceful shutdown")
-
+            self.consumer(input_queue, output_queue).run(flag)
         else:
             self.logger.error("Could not obtain queue, exiting")
 
+    def consumer(self, input_queue, output_queue):
+        return sqs_consumer.Consumer(
+            input_queue, lambda queue_message: self.handle_message(queue_message, output_queue),
+            self.logger, batch_size=self.concurrency, concurrency=self.concurrency)
+
+    def handle_message(self, queue_message, output_queue):
+        """
+        Process a message, when Drupal is overloaded it is retried after the backoff delay
+        """
+        self.logger.info('got message id: %s', queue_message.id)
+        try:
+            self.process_message(queue_message, output_queue)
+            return sqs_consumer.DONE
+        except ShortRetryException as e:
+            delay = self.backoff.overloaded()
+            self.logger.info('short retry: %s in %s seconds because of %s', queue_message.id, delay, e)
+            return sqs_consumer.retry(delay)
+
     @newrelic.agent.background_task(group='shimmy.py')
     def process_message(self, message, output_queue):
 
@@ -78,13 +129,15 @@ class Shimmy:
                                                self._settings.drupal_update_pass)
             self.logger.debug("Requests auth set for user %s", self._settings.drupal_update_user)
         headers = {'content-type': 'application/json'}
+        self.backoff.wait()
         try:
-            response = requests.post(ingest_endpoint, data=eif, headers=headers, auth=auth)
+            response = self.http_session.post(ingest_endpoint, data=eif, headers=headers, auth=auth)
             self.logger.info("Response code was %s . Reason was %s", response.status_code, response.reason)
         except Exception as e:
             self.logger.error("Error: %s", e.message)
 
         if response.status_code == 200:
+            self.backoff.succeeded()
 
             update_date = self.extract_update_date(passthrough, response.json())
             ingest_publish = response.json().get('publish')
@@ -119,12 +172,19 @@ class Shimmy:
     def extract_update_date(self, passthrough_json, response_json):
         return eif_provider.extract_update_date(passthrough_json, response_json)
 
-    def slurp_eif(self, bucketname, filename):
+    def get_bucket(self, bucketname):
+        "The S3 connection and its buckets are shared by the workers"
+        with self.lock:
+            if self.s3_conn is None:
+                self.s3_conn = S3Connection(self._settings.aws_access_key_id,
+                                            self._settings.aws_secret_access_key)
+            if bucketname not in self.buckets:
+                self.buckets[bucketname] = self.s3_conn.get_bucket(bucketname, validate=False)
+            return self.buckets[bucketname]
 
-        conn = S3Connection(self._settings.aws_access_key_id,
-                            self._settings.aws_secret_access_key)
+    def slurp_eif(self, bucketname, filename):
 
-        bucket = conn.get_bucket(bucketname)
+        bucket = self.get_bucket(bucketname)
         key = Key(bucket)
         key.key = filename
         json_output = key.get_contents_as_string()
@@ -138,10 +198,12 @@ if __name__ == "__main__":
     parser = OptionParser()
     parser.add_option("-e", "--env", default="dev", action="store", type="string", dest="env",
                       help="set the environment to run, either dev or live")
+    parser.add_option("-c", "--concurrency", default=None, action="store", type="int",
+                      dest="concurrency", help="number of messages to process at the same time")
 
     (options, args) = parser.parse_args()
     ENV = options.env
     settings_lib = __import__('settings')
     settings = settings_lib.get_settings(ENV)
-    shimmy = Shimmy(settings, logger)
+    shimmy = Shimmy(settings, logger, options.concurrency)
     process.monitor_interrupt(lambda flag: shimmy.listen(flag))
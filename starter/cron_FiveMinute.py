@@ -12,6 +12,7 @@ from optparse import OptionParser
 
 import provider.simpleDB as dblib
 import provider.swfmeta as swfmetalib
+import provider.pending_work as pending_work
 import starter
 
 """
@@ -53,12 +54,8 @@ class cron_FiveMinute(object):
 
         # A conditional start for SendQueuedEmail
         #  Only start a workflow if there are emails in the queue ready to send
-        item_list = db.elife_get_email_queue_items(
-            query_type="count",
-            date_scheduled_before=last_startDate)
-
         try:
-            if int(item_list[0]["Count"]) > 0:
+            if pending_work.email_queue_has_items(db, date_scheduled_before=last_startDate):
                 # More than one email in the queue, start a workflow
                 try:
                     starter_name = "starter_SendQueuedEmail"
@@ -49,7 +49,7 @@ class starter_ApproveArticlePublication():
                                                          article_id + "." + str(version))
 
         # Simple connect
-        conn = boto.swf.layer1.Layer1(settings.aws_access_key_id, settings.aws_secret_access_key)
+        conn = helper.get_swf_connection(settings)
 
         try:
             response = conn.start_workflow_execution(settings.domain, workflow_id, workflow_name, workflow_version,
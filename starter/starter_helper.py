@@ -1,7 +1,15 @@
 import os
 import json
+import threading
+import boto.swf
 import log
 
+# a process starting many workflows reuses one SWF connection per thread
+_reuse_swf_connections = False
+_swf_connections = threading.local()
+_starter_loggers = {}
+_starter_loggers_lock = threading.Lock()
+
 class NullRequiredDataException(Exception):
     pass
 
@@ -10,7 +18,33 @@ def get_starter_identity(name):
 
 
 def get_starter_logger(set_level, identity, log_file="starter.log"):
-        return log.logger(log_file, set_level, identity)
+        # log.logger adds handlers on every call, create each starter logger only once
+        with _starter_loggers_lock:
+            key = (log_file, set_level, identity)
+            if key not in _starter_loggers:
+                _starter_loggers[key] = log.logger(log_file, set_level, identity)
+            return _starter_loggers[key]
+
+
+def reuse_swf_connections(reuse=True):
+        """
+        Keep the SWF connection of each thread for the next workflow it starts,
+        for long running processes like queue_workflow_starter
+        """
+        global _reuse_swf_connections
+        _reuse_swf_connections = reuse
+
+
+def get_swf_connection(settings):
+        if not _reuse_swf_connections:
+            return boto.swf.layer1.Layer1(settings.aws_access_key_id,
+                                          settings.aws_secret_access_key)
+        conn = getattr(_swf_connections, 'conn', None)
+        if conn is None:
+            conn = boto.swf.layer1.Layer1(settings.aws_access_key_id,
+                                          settings.aws_secret_access_key)
+            _swf_connections.conn = conn
+        return conn
 
 
 def set_workflow_information(name, workflow_version, child_policy, data, workflow_id_part,
@@ -17,12 +17,18 @@ class FakeSession:
     def store_value(self, execution_id, key, value):
         self.session_dict[key] = value
 
+    def store_values(self, execution_id, values):
+        self.session_dict.update(values)
+
     def get_value(self, execution_id, key):
         try:
             return self.session_dict[key]
         except:
             return None
 
+    def get_values(self, execution_id, keys):
+        return [self.get_value(execution_id, key) for key in keys]
+
     @staticmethod
     def get_full_key(execution_id, key):
         return execution_id + '__' + key
@@ -36,7 +42,7 @@ class FakeS3Connection:
             'dest_bucket': data.bucket_dest_file_name
         }
 
-    def get_bucket(self, mock_bucket_name):
+    def get_bucket(self, mock_bucket_name, validate=True):
         return self.buckets_dict[mock_bucket_name]
 
 
@@ -107,9 +113,15 @@ class FakeStorageContext:
     def set_resource_from_string(self, resource, data, content_type=None):
         pass
 
+    def set_resource_from_file(self, resource, file, metadata=None):
+        pass
+
     def list_resources(self, resource):
         return ["elife-00353-fig1-v1.tif", "elife-00353-v1.pdf", "elife-00353-v1.xml"]
 
+    def list_resource_etags(self, resource):
+        return dict((file_name, '"%s"' % file_name) for file_name in self.list_resources(resource))
+
     def copy_resource(self, origin, destination, additional_dict_metadata=None):
         pass
 
@@ -168,10 +180,6 @@ class FakeKey:
     def cleanup_fake_directories(self):
         self.d.cleanup()
 
-class FakeFileInfo:
-    def __init__(self):
-        self.key = None
-
 class FakeBucket:
 
     def get_key(self, key): #key will be u'00353.1/7d5fa403-cba9-486c-8273-3078a98a0b98/elife-00353-fig1-v1.tif' for example
@@ -16,6 +16,7 @@ archive_bucket = "archive_bucket"
 
 aws_access_key_id = ""
 aws_secret_access_key = ""
+s3_hostname = ""
 
 workflow_starter_queue = ""
 website_ingest_queue = ""
@@ -33,6 +34,10 @@ ses_poa_sender_email = ""
 ses_poa_recipient_email = ""
 templates_bucket = ""
 
+crossref_url = "http://test.crossref.org/servlet/deposit"
+crossref_login_id = ""
+crossref_login_passwd = ""
+
 drupal_EIF_endpoint = "https://website/api/article.json"
 drupal_approve_endpoint = "https://website/api/publish/"
 drupal_update_user = ""
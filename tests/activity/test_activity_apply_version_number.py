@@ -5,7 +5,10 @@ from activity.activity_ApplyVersionNumber import activity_ApplyVersionNumber
 from mock import mock, patch
 import test_activity_data as test_data
 from classes_mock import FakeSession
+import provider.expanded_folder as expanded_folder
 import shutil
+import hashlib
+import os
 import helpers
 
 example_key_names = [u'15224.1/fec8dcd1-76df-4921-93de-4bf8b8ab70eb/elife-15224-fig1-figsupp1.tif',
@@ -101,6 +104,35 @@ example_file_name_map_with_version = {u'elife-15224-fig1-figsupp1-v1.tif': u'eli
                                       u'elife-15224-resp-media1.avi': u'elife-15224-resp-media1.avi'}
 
 
+class FakeS3Key(object):
+    def __init__(self, name, content):
+        self.name = name
+        self.size = len(content)
+        self.etag = '"%s"' % hashlib.md5(content).hexdigest()
+
+
+class FakeS3Bucket(object):
+    "Keys of a bucket kept in a dict of content by key name"
+
+    name = 'expanded'
+
+    def __init__(self, contents):
+        self.contents = dict(contents)
+
+    def list(self, prefix, delimiter):
+        return [FakeS3Key(name, content) for name, content in sorted(self.contents.items())
+                if name.startswith(prefix)]
+
+    def copy_key(self, new_key_name, bucket_name, key_name):
+        self.contents[new_key_name] = self.contents[key_name]
+        return FakeS3Key(new_key_name, self.contents[new_key_name])
+
+    def delete_keys(self, key_names, quiet=False):
+        for key_name in key_names:
+            del self.contents[key_name]
+        return mock.MagicMock(errors=[])
+
+
 @ddt
 class MyTestCase(unittest.TestCase):
 
@@ -133,6 +165,27 @@ class MyTestCase(unittest.TestCase):
                                                    " message: No version available")
         self.assertEqual(result, self.applyversionnumber.ACTIVITY_PERMANENT_FAILURE)
 
+    @patch.object(activity_ApplyVersionNumber, 'rename_article_s3_objects')
+    @patch.object(activity_ApplyVersionNumber, 'emit_monitor_event')
+    @patch('activity.activity_ApplyVersionNumber.Session')
+    @data(test_data.session_example)
+    def test_do_activity_stores_renamed_manifest(self, session_example, mock_session,
+                                                 fake_emit_monitor_event, fake_rename):
+        #given
+        session = FakeSession(session_example.copy())
+        mock_session.return_value = session
+        files = [expanded_folder.manifest_entry(u'elife-00353-v1.xml', 20, '"b"')]
+        fake_rename.return_value = files
+
+        #when
+        result = self.applyversionnumber.do_activity(test_data.ApplyVersionNumber_data_no_renaming)
+
+        #then
+        self.assertEqual(result, self.applyversionnumber.ACTIVITY_SUCCESS)
+        self.assertEqual(expanded_folder.load_manifest(session, None,
+                                                       session_example['expanded_folder']),
+                         files)
+
     def test_find_xml_filename_in_map(self):
         new_name = self.applyversionnumber.find_xml_filename_in_map(example_file_name_map)
         self.assertEqual(new_name, u'elife-15224-v1.xml')
@@ -177,6 +230,47 @@ class MyTestCase(unittest.TestCase):
 
         patcher.stop()
 
+    @patch('activity.activity_ApplyVersionNumber.S3Connection')
+    def test_rename_article_s3_objects_retry(self, fake_s3_connection):
+        folder = u'15224.1/fec8dcd1-76df-4921-93de-4bf8b8ab70eb'
+        contents = dict((key_name, key_name.encode('utf8')) for key_name in example_key_names)
+        with open(u'tests/files_source/ApplyVersionNumber/elife-15224-v1.xml', 'rb') as open_file:
+            contents[folder + u'/elife-15224.xml'] = open_file.read()
+        bucket = FakeS3Bucket(contents)
+        fake_s3_connection.return_value.lookup.return_value = bucket
+        self.applyversionnumber.expanded_bucket_name = bucket.name
+
+        def download(bucket, bucket_folder_name, filename):
+            with self.applyversionnumber.open_file_from_tmp_dir(filename, mode='wb') as open_file:
+                open_file.write(bucket.contents[bucket_folder_name + '/' + filename])
+
+        def upload(bucket, bucket_folder_name, filename):
+            key_name = bucket_folder_name + '/' + filename
+            with open(os.path.join(self.applyversionnumber.get_tmp_dir(), filename), 'rb') as open_file:
+                bucket.contents[key_name] = open_file.read()
+            return FakeS3Key(key_name, bucket.contents[key_name])
+
+        #given the first attempt failed to upload the rewritten XML
+        with patch.object(self.applyversionnumber, 'download_file_from_bucket', side_effect=download):
+            with patch.object(self.applyversionnumber, 'upload_file_to_bucket',
+                              side_effect=RuntimeError("upload failed")):
+                self.assertRaises(RuntimeError, self.applyversionnumber.rename_article_s3_objects,
+                                  folder, '1')
+            # the old files are kept for the next attempt
+            self.assertIn(folder + u'/elife-15224-fig1.tif', bucket.contents)
+
+            #when
+            with patch.object(self.applyversionnumber, 'upload_file_to_bucket', side_effect=upload):
+                files = self.applyversionnumber.rename_article_s3_objects(folder, '1')
+
+        #then
+        self.assertEqual(sorted(bucket.contents),
+                         sorted(folder + u'/' + name for name in example_file_name_map.values()))
+        with open(u'tests/files_source/ApplyVersionNumber/elife-15224-v1-rewritten.xml', 'rb') as expected_file:
+            self.assertEqual(bucket.contents[folder + u'/elife-15224-v1.xml'], expected_file.read())
+        self.assertEqual(sorted(expanded_folder.file_names(files)),
+                         sorted(example_file_name_map.values()))
+
     @patch('activity.activity_ApplyVersionNumber.path.join')
     def test_rewrite_xml_file_no_changes(self, mock_path_join):
         #given
@@ -13,7 +13,7 @@ class TestConvertImagesToJPG(unittest.TestCase):
         self.convertimagestojpg = activity_ConvertImagesToJPG(settings_mock, None, None, None, None)
         self.convertimagestojpg.logger = FakeLogger()
 
-    @patch('provider.image_conversion.generate_images')
+    @patch('provider.image_conversion.convert_figures')
     @patch('activity.activity_ConvertImagesToJPG.Session')
     @patch('activity.activity_ConvertImagesToJPG.StorageContext')
     @patch.object(activity_ConvertImagesToJPG, 'emit_monitor_event')
@@ -27,6 +27,25 @@ class TestConvertImagesToJPG(unittest.TestCase):
 
         self.assertEqual(self.convertimagestojpg.ACTIVITY_SUCCESS, result)
 
+    @patch.object(settings_mock, 'image_conversion_processes', 1, create=True)
+    @patch('provider.image_conversion.convert_figures')
+    @patch('provider.image_conversion.generate_images')
+    @patch('activity.activity_ConvertImagesToJPG.Session')
+    @patch('activity.activity_ConvertImagesToJPG.StorageContext')
+    @patch.object(activity_ConvertImagesToJPG, 'emit_monitor_event')
+    def test_activity_success_one_process(self, fake_emit, fake_storage_context, fake_session,
+                                          fake_generate_images, fake_convert_figures):
+
+        fake_storage_context.return_value = FakeStorageContext()
+        fake_session.return_value = FakeSession(test_activity_data.session_example)
+        activity_data = test_activity_data.data_example_before_publish
+
+        result = self.convertimagestojpg.do_activity(activity_data)
+
+        self.assertEqual(self.convertimagestojpg.ACTIVITY_SUCCESS, result)
+        self.assertTrue(fake_generate_images.called)
+        self.assertFalse(fake_convert_figures.called)
+
 
     @patch('activity.activity_ConvertImagesToJPG.Session')
     @patch('activity.activity_ConvertImagesToJPG.StorageContext')
@@ -184,5 +184,37 @@ class TestCopyGlencoeStillImages(unittest.TestCase):
         cdn_jpg_filename = self.copyglencoestillimages.store_file("http://glencoe.com/some-dir/elife-00666-media1.jpg", "12345600666")
         self.assertEqual(cdn_jpg_filename, "elife-12345600666-media1.jpg")
 
+    @patch('provider.endpoint_check.session')
+    @patch('activity.activity_CopyGlencoeStillImages.StorageContext')
+    def test_store_jpgs_skips_stills_already_in_cdn(self, fake_storage_context, fake_http_session):
+        storage_context = fake_storage_context.return_value
+        storage_context.list_resource_sizes.return_value = {"elife-00353-media1.jpg": 100,
+                                                            "elife-00353-media2.jpg": 5}
+
+        def get(url, **kwargs):
+            response = MagicMock(status_code=200)
+            response.headers = {'content-length': '100', 'content-type': 'image/jpeg'}
+            response.iter_content.return_value = iter(['jpg', 'data'])
+            return response
+        fake_http_session.return_value.get.side_effect = get
+        # recorded in a list, the stills are uploaded from several threads
+        uploaded = []
+        storage_context.set_resource_from_file.side_effect = (
+            lambda resource, jpg_file, metadata=None: uploaded.append(resource))
+
+        cdn_still_jpgs = self.copyglencoestillimages.store_jpgs(
+            ["http://glencoe.com/elife-00353-media1.jpg", "http://glencoe.com/elife-00353-media2.jpg",
+             "http://glencoe.com/elife-00353-media3.jpg"], "00353")
+
+        self.assertEqual(cdn_still_jpgs, ["elife-00353-media1.jpg", "elife-00353-media2.jpg",
+                                          "elife-00353-media3.jpg"])
+        self.assertEqual(sorted(uploaded), [settings_mock.storage_provider + "://" +
+                                    settings_mock.publishing_buckets_prefix +
+                                    settings_mock.ppp_cdn_bucket + "/00353/" + file_name
+                                    for file_name in ["elife-00353-media2.jpg",
+                                                      "elife-00353-media3.jpg"]])
+        self.assertEqual(fake_http_session.return_value.close.call_count, 1)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -3,6 +3,7 @@ from activity.activity_DepositAssets import activity_DepositAssets
 import settings_mock
 from ddt import ddt, data, unpack
 from mock import patch
+from provider import expanded_folder
 
 from classes_mock import FakeStorageContext
 from classes_mock import FakeSession
@@ -60,6 +61,28 @@ class TestDepositAssets(unittest.TestCase):
         self.assertEqual(self.depositassets.ACTIVITY_SUCCESS, result)
 
 
+    @patch('activity.activity_DepositAssets.Session')
+    @patch('activity.activity_DepositAssets.StorageContext')
+    @patch.object(activity_DepositAssets, 'emit_monitor_event')
+    def test_activity_success_from_manifest(self, fake_emit, fake_storage_context, fake_session):
+        storage_context = FakeStorageContext()
+        # recorded in a list, the resources are copied from several threads
+        copied = []
+        storage_context.copy_resource = (
+            lambda orig, dest, additional_dict_metadata=None: copied.append(dest))
+        fake_storage_context.return_value = storage_context
+        session = FakeSession(test_activity_data.session_example.copy())
+        expanded_folder.store_manifest(
+            session, activity_data['run'], session.get_value(None, 'expanded_folder'),
+            [expanded_folder.manifest_entry('elife-00353-v1.pdf', 10, '"a"')])
+        fake_session.return_value = session
+
+        result = self.depositassets.do_activity(activity_data)
+
+        self.assertEqual(self.depositassets.ACTIVITY_SUCCESS, result)
+        # the pdf and its download copy, the other files are not in the manifest
+        self.assertEqual(len(copied), 2)
+
     @patch('activity.activity_DepositAssets.Session')
     @patch('activity.activity_DepositAssets.StorageContext')
     @patch.object(activity_DepositAssets, 'emit_monitor_event')
@@ -0,0 +1,109 @@
+import unittest
+import os
+import shutil
+import tempfile
+import requests
+from mock import MagicMock, patch
+from activity.activity_DepositCrossref import activity_DepositCrossref
+import settings_mock
+
+
+def fake_article(doi):
+    article = MagicMock(doi=doi)
+    article.get_date.return_value = None
+    return article
+
+
+class TestDepositCrossref(unittest.TestCase):
+
+    @patch.object(activity_DepositCrossref, 'create_activity_directories')
+    @patch.object(activity_DepositCrossref, 'import_imports')
+    def setUp(self, fake_import_imports, fake_create_activity_directories):
+        self.activity = activity_DepositCrossref(settings_mock, None, None, None, None)
+        self.tmp_dir = tempfile.mkdtemp()
+        self.activity.elife_poa_lib = MagicMock()
+        self.activity.elife_poa_lib.settings.STAGING_TO_HW_DIR = self.tmp_dir
+        self.activity.elife_poa_lib.parse.build_articles_from_article_xmls.side_effect = (
+            lambda xml_files: [fake_article(os.path.basename(xml_files[0]))])
+        self.activity.article = MagicMock()
+        self.activity.article.get_article_bucket_pub_date.return_value = None
+        self.batches = []
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def add_xml_files(self, file_names):
+        for file_name in file_names:
+            with open(os.path.join(self.tmp_dir, file_name), 'w') as open_file:
+                open_file.write('<article/>')
+        return [os.path.join(self.tmp_dir, file_name) for file_name in file_names]
+
+    def build_crossref_xml_for_articles(self, articles, bad_doi=None):
+        if bad_doi in [article.doi for article in articles]:
+            raise Exception("Cannot generate Crossref XML")
+        self.batches.append([article.doi for article in articles])
+
+    @patch.object(settings_mock, 'crossref_batch_size', 2, create=True)
+    def test_generate_crossref_xml_batches(self):
+        xml_files = self.add_xml_files(
+            ['elife-00353-v1.xml', 'elife-00666-v1.xml', 'elife-03385-v1.xml'])
+        self.activity.elife_poa_lib.generate.build_crossref_xml_for_articles.side_effect = (
+            self.build_crossref_xml_for_articles)
+
+        self.assertTrue(self.activity.generate_crossref_xml())
+
+        self.assertEqual(self.batches, [['elife-00353-v1.xml', 'elife-00666-v1.xml'],
+                                        ['elife-03385-v1.xml']])
+        self.assertEqual(self.activity.article_published_file_names, xml_files)
+        self.assertEqual(self.activity.article_not_published_file_names, [])
+        # the published dates are loaded once before the files are parsed
+        self.assertEqual(self.activity.article.get_article_bucket_published_dates.call_count, 1)
+
+    @patch.object(settings_mock, 'crossref_batch_size', 2, create=True)
+    def test_generate_crossref_xml_failed_batch_one_by_one(self):
+        xml_files = self.add_xml_files(
+            ['elife-00353-v1.xml', 'elife-00666-v1.xml', 'elife-03385-v1.xml'])
+        self.activity.elife_poa_lib.generate.build_crossref_xml_for_articles.side_effect = (
+            lambda articles: self.build_crossref_xml_for_articles(articles, 'elife-00666-v1.xml'))
+
+        self.assertTrue(self.activity.generate_crossref_xml())
+
+        self.assertEqual(self.batches, [['elife-00353-v1.xml'], ['elife-03385-v1.xml']])
+        self.assertEqual(sorted(self.activity.article_published_file_names),
+                         [xml_files[0], xml_files[2]])
+        self.assertEqual(self.activity.article_not_published_file_names, [xml_files[1]])
+
+    @patch('time.sleep')
+    @patch('provider.endpoint_check.session')
+    def test_deposit_retries_connection_errors_and_bad_gateway(self, fake_session, fake_sleep):
+        self.add_xml_files(['crossref-00353.xml'])
+        http_session = fake_session.return_value
+        http_session.post.side_effect = [requests.exceptions.ConnectionError("refused"),
+                                         MagicMock(status_code=502, text='bad gateway'),
+                                         MagicMock(status_code=200, text='ok')]
+
+        self.assertTrue(self.activity.deposit_files_to_endpoint('/*.xml', self.tmp_dir))
+
+        self.assertEqual(http_session.post.call_count, 3)
+        self.assertEqual(http_session.post.call_args[1]['files'],
+                         {'file': ('crossref-00353.xml', '<article/>')})
+
+    @patch('time.sleep')
+    @patch('provider.endpoint_check.session')
+    def test_deposit_not_retried_when_it_may_have_been_received(self, fake_session, fake_sleep):
+        self.add_xml_files(['crossref-00353.xml'])
+        http_session = fake_session.return_value
+
+        http_session.post.side_effect = [MagicMock(status_code=504, text='gateway timeout')]
+        self.assertFalse(self.activity.deposit_files_to_endpoint('/*.xml', self.tmp_dir))
+        self.assertEqual(http_session.post.call_count, 1)
+
+        http_session.post.reset_mock()
+        http_session.post.side_effect = requests.exceptions.ReadTimeout("read timed out")
+        self.assertRaises(requests.exceptions.ReadTimeout,
+                          self.activity.deposit_files_to_endpoint, '/*.xml', self.tmp_dir)
+        self.assertEqual(http_session.post.call_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -11,6 +11,7 @@ import classes_mock
 import test_activity_data as testdata
 from ddt import ddt, data
 import helpers
+import provider.expanded_folder as expanded_folder
 
 @ddt
 class TestExpandArticle(unittest.TestCase):
@@ -29,7 +30,8 @@ class TestExpandArticle(unittest.TestCase):
     @patch('activity.activity_ExpandArticle.StorageContext')
     def test_do_activity(self, mock_storage_context, mock_session, mock_get_tmp_dir):
         mock_storage_context.return_value = FakeStorageContext()
-        mock_session.return_value = FakeSession(testdata.session_example)
+        session = FakeSession(testdata.session_example.copy())
+        mock_session.return_value = session
         mock_get_tmp_dir.return_value = classes_mock.fake_get_tmp_dir(testdata.ExpandArticle_path)
 
         self.expandarticle.emit_monitor_event = mock.MagicMock()
@@ -50,6 +52,12 @@ class TestExpandArticle(unittest.TestCase):
             self.assertEqual(testdata.ExpandArticle_files_dest_bytes_expected[index]['bytes'], statinfo.st_size)
             index += 1
 
+        # the manifest of the expanded folder is in the session
+        manifest = expanded_folder.load_manifest(
+            session, None, session.get_value(None, 'expanded_folder'))
+        self.assertEqual(sorted(expanded_folder.file_names(manifest)), files)
+        self.assertEqual(expanded_folder.article_xml_file_name(manifest), 'elife-00353-v1.xml')
+
     @patch('activity.activity_ExpandArticle.Session')
     @patch('activity.activity_ExpandArticle.StorageContext')
     def test_do_activity_invalid_articleid(self, mock_storage_context, mock_session):
@@ -9,6 +9,7 @@ from classes_mock import FakeSession
 import test_activity_data as testdata
 import helpers
 import classes_mock
+import provider.expanded_folder as expanded_folder
 import shutil
 import unicodedata
 from PIL import Image
@@ -84,11 +85,8 @@ class TestResizeImages(unittest.TestCase):
     def fake_get_file_infos(self):
         file_infos = []
         for key_name in testdata.key_names:
-            key = FakeKey()
-            key.name = key_name
-            file_info = classes_mock.FakeFileInfo()
-            file_info.key = key
-            file_infos.append(file_info)
+            file_name = key_name.rsplit('/', 1)[1]
+            file_infos.append(expanded_folder.manifest_entry(file_name, None, None))
         bucket = classes_mock.FakeBucket()
         return bucket, file_infos
 
@@ -109,15 +107,5 @@ class TestResizeImages(unittest.TestCase):
         return bucket.get_key('00003.1/4676d5c8-8949-40bf-b055-b51fdffafd0a/elife-00003-fig5-v1.tif')
 
 
-
-class FakeKey:
-
-    def __init__(self):
-        self.name = u''
-        self.key = u''
-
-    def get_file(self, param):
-        pass
-
 if __name__ == '__main__':
     unittest.main()
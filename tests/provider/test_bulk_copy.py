@@ -0,0 +1,45 @@
+import unittest
+from mock import MagicMock
+from provider import bulk_copy
+from provider.bulk_copy import Copy
+
+
+class TestBulkCopy(unittest.TestCase):
+
+    def test_copy_resources(self):
+        storage_context = MagicMock()
+        # recorded in a list, the copies are made from several threads
+        copied = []
+
+        def copy_resource(orig, dest, additional_dict_metadata=None):
+            copied.append((orig, dest, additional_dict_metadata))
+            if dest.endswith('c'):
+                self.fail_copy()
+        storage_context.copy_resource.side_effect = copy_resource
+        copies = [Copy('s3://a/1/a', 's3://b/1/a', etag='"1"'),
+                  Copy('s3://a/1/a', 's3://b/1/a-download', {'Content-Type': 'text/plain'}, '"1"'),
+                  Copy('s3://a/1/b', 's3://b/1/b', etag='"2"'),
+                  Copy('s3://a/1/c', 's3://b/1/c', etag='"3"')]
+        dest_etags = {'s3://b/1/a': '"1"', 's3://b/1/b': '"old"'}
+
+        report = bulk_copy.copy_resources(storage_context, copies, dest_etags, pool_size=2)
+
+        self.assertEqual(report['skipped'], ['s3://b/1/a'])
+        self.assertEqual(report['copied'], ['s3://b/1/a-download', 's3://b/1/b'])
+        self.assertEqual(report['failed'], ['s3://b/1/c'])
+        self.assertEqual(sorted(copied), [
+            ('s3://a/1/a', 's3://b/1/a-download', {'Content-Type': 'text/plain'}),
+            ('s3://a/1/b', 's3://b/1/b', None),
+            ('s3://a/1/c', 's3://b/1/c', None)])
+
+    def test_copy_resources_nothing_to_copy(self):
+        storage_context = MagicMock()
+        report = bulk_copy.copy_resources(storage_context, [])
+        self.assertEqual(report, {'copied': [], 'skipped': [], 'failed': []})
+
+    def fail_copy(self):
+        raise Exception("copy failed")
+
+
+if __name__ == '__main__':
+    unittest.main()
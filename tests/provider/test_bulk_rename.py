@@ -0,0 +1,91 @@
+import unittest
+from mock import MagicMock
+from provider import bulk_rename
+from provider.expanded_folder import manifest_entry
+
+
+class DeleteError(object):
+    def __init__(self, key):
+        self.key = key
+        self.message = 'Access Denied'
+
+
+class TestBulkRename(unittest.TestCase):
+
+    def setUp(self):
+        self.bucket = MagicMock()
+        self.bucket.name = 'expanded'
+        self.bucket.delete_keys.return_value = MagicMock(errors=[])
+
+    def test_rename_keys(self):
+        files = [manifest_entry('elife-00353.xml', 10, '"x"'),
+                 manifest_entry('elife-00353-fig1.tif', 20, '"f"'),
+                 manifest_entry('elife-00353-media1.mov', 30, '"m"')]
+        file_name_map = {'elife-00353.xml': 'elife-00353-v1.xml',
+                         'elife-00353-fig1.tif': 'elife-00353-fig1-v1.tif',
+                         'elife-00353-media1.mov': 'elife-00353-media1.mov'}
+        # recorded in a list, the copies are made from several threads
+        copies = []
+
+        def copy_key(*args):
+            copies.append(args)
+            return MagicMock(etag='"c"')
+        self.bucket.copy_key.side_effect = copy_key
+
+        report = bulk_rename.rename_keys(self.bucket, '00353.1/run', file_name_map, files,
+                                         pool_size=2)
+
+        self.assertEqual(sorted(report['copied']), ['elife-00353-fig1-v1.tif', 'elife-00353-v1.xml'])
+        self.assertEqual(report['failed'], [])
+        self.assertEqual(report['etags'], {'elife-00353-fig1-v1.tif': '"c"',
+                                           'elife-00353-v1.xml': '"c"'})
+        self.assertEqual(sorted(copies), [
+            ('00353.1/run/elife-00353-fig1-v1.tif', 'expanded', '00353.1/run/elife-00353-fig1.tif'),
+            ('00353.1/run/elife-00353-v1.xml', 'expanded', '00353.1/run/elife-00353.xml')])
+        self.assertEqual(sorted(self.bucket.delete_keys.call_args[0][0]),
+                         ['00353.1/run/elife-00353-fig1.tif', '00353.1/run/elife-00353.xml'])
+
+    def test_rename_keys_again_only_does_what_is_left(self):
+        # the figure was renamed, the XML copied but not deleted, the PDF not started
+        files = [manifest_entry('elife-00353-fig1-v1.tif', 20, '"f"'),
+                 manifest_entry('elife-00353.xml', 10, '"x"'),
+                 manifest_entry('elife-00353-v1.xml', 10, '"x"'),
+                 manifest_entry('elife-00353.pdf', 40, '"p"')]
+        file_name_map = {'elife-00353-fig1.tif': 'elife-00353-fig1-v1.tif',
+                         'elife-00353.xml': 'elife-00353-v1.xml',
+                         'elife-00353.pdf': 'elife-00353-v1.pdf'}
+
+        report = bulk_rename.rename_keys(self.bucket, '00353.1/run', file_name_map, files)
+
+        self.assertEqual(report['copied'], ['elife-00353-v1.pdf'])
+        self.assertEqual(sorted(report['skipped']), ['elife-00353-fig1-v1.tif', 'elife-00353-v1.xml'])
+        self.bucket.copy_key.assert_called_once_with('00353.1/run/elife-00353-v1.pdf', 'expanded',
+                                                     '00353.1/run/elife-00353.pdf')
+        self.assertEqual(sorted(report['deleted']), ['elife-00353.pdf', 'elife-00353.xml'])
+
+    def test_rename_keys_failures(self):
+        files = [manifest_entry('elife-00353.xml', 10, '"x"'),
+                 manifest_entry('elife-00353.pdf', 40, '"p"')]
+        file_name_map = {'elife-00353.xml': 'elife-00353-v1.xml',
+                         'elife-00353.pdf': 'elife-00353-v1.pdf',
+                         'elife-00353-fig1.tif': 'elife-00353-fig1-v1.tif'}
+        self.bucket.copy_key.side_effect = lambda new, bucket_name, old: \
+            self.fail_copy() if new.endswith('pdf') else None
+        self.bucket.delete_keys.return_value = MagicMock(
+            errors=[DeleteError('00353.1/run/elife-00353.xml')])
+        logger = MagicMock()
+
+        report = bulk_rename.rename_keys(self.bucket, '00353.1/run', file_name_map, files, logger)
+
+        # the missing figure, the PDF not copied and the XML not deleted
+        self.assertEqual(sorted(report['failed']),
+                         ['elife-00353-fig1-v1.tif', 'elife-00353-v1.pdf', 'elife-00353.xml'])
+        self.assertEqual(self.bucket.delete_keys.call_args[0][0], ['00353.1/run/elife-00353.xml'])
+        self.assertTrue(logger.exception.called)
+
+    def fail_copy(self):
+        raise RuntimeError("copy failed")
+
+
+if __name__ == '__main__':
+    unittest.main()
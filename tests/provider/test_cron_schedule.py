@@ -0,0 +1,66 @@
+import unittest
+import time
+from ddt import ddt, data, unpack
+from provider import cron_schedule
+
+
+def at(timestamp):
+    return time.strptime(timestamp, "%Y-%m-%d %H:%M")
+
+
+@ddt
+class TestCronSchedule(unittest.TestCase):
+
+    @unpack
+    @data(
+        ('*', 0, 59, range(0, 60)),
+        ('*/15', 0, 59, [0, 15, 30, 45]),
+        ('30-59', 0, 59, range(30, 60)),
+        ('1,15', 1, 31, [1, 15]),
+        ('0-30/10', 0, 59, [0, 10, 20, 30]),
+        ('5/20', 0, 59, [5, 25, 45]),
+        ('7', 0, 7, [7]),
+    )
+    def test_parse_field(self, field, low, high, expected):
+        self.assertEqual(sorted(cron_schedule.parse_field(field, low, high)), expected)
+
+    @data('60', '10-5', '*/0', 'x')
+    def test_parse_field_invalid(self, field):
+        self.assertRaises(ValueError, cron_schedule.parse_field, field, 0, 59)
+
+    def test_cron_expression_invalid(self):
+        self.assertRaises(ValueError, cron_schedule.CronExpression, '* * * *')
+
+    @unpack
+    @data(
+        ('45-59 16 * * *', '2017-06-01 16:45', True),
+        ('45-59 16 * * *', '2017-06-01 16:44', False),
+        ('45-59 16 * * *', '2017-06-01 17:45', False),
+        # 2017-06-04 is a Sunday
+        ('0 12 * * 0', '2017-06-04 12:00', True),
+        ('0 12 * * 7', '2017-06-04 12:00', True),
+        ('0 12 * * 1-5', '2017-06-04 12:00', False),
+        ('0 12 1 6 *', '2017-06-01 12:00', True),
+        ('0 12 1 7 *', '2017-06-01 12:00', False),
+    )
+    def test_cron_expression_matches(self, expression, timestamp, expected):
+        self.assertEqual(cron_schedule.CronExpression(expression).matches(at(timestamp)), expected)
+
+    def test_job_is_stale(self):
+        job = cron_schedule.Job("AdminEmail", "starter_AdminEmail", "45-59 * * * *", 60 * 31)
+        self.assertTrue(job.is_stale(None, 10000))
+        self.assertTrue(job.is_stale(10000 - 60 * 31, 10000))
+        self.assertFalse(job.is_stale(10000 - 60 * 30, 10000))
+
+    def test_due_jobs(self):
+        schedule = [cron_schedule.Job("A", "starter_A", "0-29 * * * *", 60),
+                    cron_schedule.Job("B", "starter_B", "30-59 * * * *", 60)]
+        self.assertEqual([job.workflow_id for job in
+                          cron_schedule.due_jobs(schedule, at('2017-06-01 10:31'))], ['B'])
+
+    def test_seconds_to_next_minute(self):
+        self.assertEqual(cron_schedule.seconds_to_next_minute(1500000015), 45)
+
+
+if __name__ == '__main__':
+    unittest.main()
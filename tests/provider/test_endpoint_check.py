@@ -0,0 +1,45 @@
+import time
+import unittest
+import requests
+from mock import MagicMock, patch
+import provider.endpoint_check as endpoint_check
+
+
+class TestEndpointCheck(unittest.TestCase):
+
+    @patch('time.sleep')
+    def test_request_retries_connection_errors(self, fake_sleep):
+        http_session = MagicMock()
+        http_session.get.side_effect = [requests.exceptions.ConnectionError("reset"),
+                                        MagicMock(status_code=200)]
+        response = endpoint_check.request('get', 'http://example.org', None, http_session)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(fake_sleep.call_count, 1)
+        http_session.get.assert_called_with('http://example.org', timeout=endpoint_check.TIMEOUT)
+
+    @patch('time.sleep')
+    def test_request_raises_after_max_retries(self, fake_sleep):
+        http_session = MagicMock()
+        http_session.get.side_effect = requests.exceptions.Timeout("timed out")
+        self.assertRaises(requests.exceptions.Timeout, endpoint_check.request,
+                          'get', 'http://example.org', None, http_session, max_retries=2)
+        self.assertEqual(http_session.get.call_count, 3)
+
+    def test_backoff_is_bounded(self):
+        for attempt in range(4):
+            delay = endpoint_check.backoff(attempt)
+            self.assertTrue(0 <= delay <= endpoint_check.RETRY_DELAY * (2 ** attempt))
+
+    def test_check_endpoints_keeps_order(self):
+        results = endpoint_check.check_endpoints(range(25), lambda number: number * 2, pool_size=4)
+        self.assertEqual(results, [number * 2 for number in range(25)])
+        self.assertEqual(endpoint_check.check_endpoints([], None), [])
+
+    def test_report(self):
+        report = endpoint_check.report([(True, 'a'), (False, 'b')], time.time())
+        self.assertEqual(report['checked'], 2)
+        self.assertEqual(report['failed'], ['b'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+from mock import patch, MagicMock
+import provider.execution_context as execution_context
+
+
+class FakeSettings(object):
+    redis_host = 'localhost'
+    redis_port = 6379
+    redis_db = 0
+    redis_expire_key = 60
+
+
+class TestRedisSession(unittest.TestCase):
+
+    def setUp(self):
+        patcher = patch('provider.execution_context.redis.StrictRedis')
+        self.redis = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+        self.redis.hgetall.return_value = {'version': '1', 'article_id': '00353'}
+
+    def test_values_are_read_once(self):
+        session = execution_context.RedisSession(FakeSettings())
+        self.assertEqual(session.get_value('run', 'version'), '1')
+        self.assertEqual(session.get_values('run', ['article_id', 'status']), ['00353', None])
+        self.redis.hgetall.assert_called_once_with('run')
+        self.assertFalse(self.redis.hget.called)
+
+    def test_store_values_is_one_pipeline(self):
+        pipeline = MagicMock()
+        self.redis.pipeline.return_value = pipeline
+        session = execution_context.RedisSession(FakeSettings())
+        session.get_value('run', 'version')
+
+        session.store_values('run', {'version': 2, 'status': u'vor'})
+
+        pipeline.hmset.assert_called_once_with('run', {'version': 2, 'status': u'vor'})
+        pipeline.expire.assert_called_once_with('run', 60)
+        pipeline.execute.assert_called_once_with()
+        # the values read are those Redis would return
+        self.assertEqual(session.get_values('run', ['version', 'status']), ['2', 'vor'])
+        self.redis.hgetall.assert_called_once_with('run')
+
+    def test_store_no_values(self):
+        session = execution_context.RedisSession(FakeSettings())
+        session.store_values('run', {})
+        self.assertFalse(self.redis.pipeline.called)
+
+    def test_connection_pool_is_shared(self):
+        self.assertIs(execution_context.connection_pool(FakeSettings()),
+                      execution_context.connection_pool(FakeSettings()))
+
+
+if __name__ == '__main__':
+    unittest.main()
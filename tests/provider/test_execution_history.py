@@ -0,0 +1,88 @@
+import unittest
+import os
+import shutil
+import tempfile
+import json
+from mock import MagicMock, patch
+from provider import execution_history
+import tests.settings_mock as settings_mock
+
+NOW = 1500000000
+
+
+def execution_info(workflow_id, start_timestamp):
+    return {'execution': {'workflowId': workflow_id, 'runId': 'run'},
+            'startTimestamp': start_timestamp, 'closeStatus': 'COMPLETED'}
+
+
+class TestExecutionHistory(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'cron_history.json')
+        self.swfmeta = MagicMock()
+        patcher = patch('provider.execution_history.calendar.timegm')
+        patcher.start().return_value = NOW
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def last_starts(self, workflow_ids):
+        return execution_history.last_completed_start_timestamps(
+            settings_mock, workflow_ids, self.swfmeta, self.path)
+
+    def test_cold_start_widens_until_all_found(self):
+        self.swfmeta.get_closed_workflow_executionInfos.side_effect = [
+            {'executionInfos': [execution_info('cron_FiveMinute', NOW - 100),
+                                execution_info('cron_FiveMinute', NOW - 400)]},
+            {'executionInfos': [execution_info('cron_FiveMinute', NOW - 100),
+                                execution_info('AdminEmail', NOW - 50000)]}]
+
+        result = self.last_starts(['cron_FiveMinute', 'AdminEmail'])
+
+        self.assertEqual(result, {'cron_FiveMinute': NOW - 100, 'AdminEmail': NOW - 50000})
+        self.assertEqual(self.swfmeta.get_closed_workflow_executionInfos.call_count, 2)
+        self.assertEqual(
+            self.swfmeta.get_closed_workflow_executionInfos.call_args[1]['start_oldest_date'],
+            NOW - 60 * 60 * 24)
+        with open(self.path) as open_file:
+            self.assertEqual(json.load(open_file)['checked'], NOW)
+
+    def test_cold_start_not_found(self):
+        self.swfmeta.get_closed_workflow_executionInfos.return_value = {'executionInfos': []}
+
+        result = self.last_starts(['PublishPOA'])
+
+        self.assertEqual(result, {'PublishPOA': None})
+        self.assertEqual(self.swfmeta.get_closed_workflow_executionInfos.call_count,
+                         len(execution_history.DAYS_LIST))
+
+    def test_warm_start_lists_executions_closed_since_checked(self):
+        execution_history.save_cache(self.path, {
+            'checked': NOW - 60, 'latest': {'cron_FiveMinute': NOW - 300, 'PublishPOA': None},
+            'known': ['cron_FiveMinute', 'PublishPOA']})
+        self.swfmeta.get_closed_workflow_executionInfos.return_value = {
+            'executionInfos': [execution_info('cron_FiveMinute', NOW - 30)]}
+        self.swfmeta.get_last_completed_workflow_execution_startTimestamp.return_value = NOW - 9000
+
+        result = self.last_starts(['cron_FiveMinute', 'PublishPOA', 'AdminEmail'])
+
+        self.assertEqual(result, {'cron_FiveMinute': NOW - 30, 'PublishPOA': None,
+                                  'AdminEmail': NOW - 9000})
+        self.swfmeta.get_closed_workflow_executionInfos.assert_called_once_with(
+            close_oldest_date=NOW - 60, close_latest_date=NOW,
+            close_status="COMPLETED", maximum_page_size=execution_history.PAGE_SIZE)
+        # only the workflow id the index was not built for is looked up on its own
+        self.swfmeta.get_last_completed_workflow_execution_startTimestamp.assert_called_once_with(
+            workflow_id='AdminEmail')
+        self.assertIn('AdminEmail', execution_history.load_cache(self.path)['known'])
+
+    def test_load_cache_unreadable(self):
+        with open(self.path, 'w') as open_file:
+            open_file.write('{not json')
+        self.assertEqual(execution_history.load_cache(self.path), {'checked': None, 'latest': {}})
+
+
+if __name__ == '__main__':
+    unittest.main()
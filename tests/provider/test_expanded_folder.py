@@ -0,0 +1,82 @@
+import unittest
+from mock import MagicMock
+import provider.expanded_folder as expanded_folder
+
+
+class FakeSession(object):
+    def __init__(self):
+        self.values = {}
+
+    def store_value(self, execution_id, key, value):
+        self.values[key] = value
+
+    def get_value(self, execution_id, key):
+        return self.values.get(key)
+
+
+def listed_key(name, size=10, etag='"etag"'):
+    key = MagicMock(size=size, etag=etag)
+    key.name = name
+    return key
+
+
+class TestExpandedFolder(unittest.TestCase):
+
+    def setUp(self):
+        self.bucket = MagicMock()
+        self.bucket.list.return_value = [
+            listed_key('00353.1/run/'),
+            listed_key('00353.1/run/elife-00353-fig1-v1.tif', 100, '"a"'),
+            listed_key('00353.1/run/elife-00353-v1.xml', 20, '"b"')]
+
+    def test_get_manifest_lists_once(self):
+        session = FakeSession()
+        files = expanded_folder.get_manifest(session, 'run', self.bucket, '00353.1/run')
+        self.assertEqual(files, [{'name': 'elife-00353-fig1-v1.tif', 'size': 100, 'etag': '"a"',
+                                  'file_type': 'Figure'},
+                                 {'name': 'elife-00353-v1.xml', 'size': 20, 'etag': '"b"',
+                                  'file_type': 'ArticleXML'}])
+        self.assertEqual(expanded_folder.get_manifest(session, 'run', self.bucket, '00353.1/run'),
+                         files)
+        self.bucket.list.assert_called_once_with('00353.1/run/', '/')
+        self.assertEqual(expanded_folder.article_xml_file_name(files), 'elife-00353-v1.xml')
+
+    def test_manifest_of_another_folder_is_not_used(self):
+        session = FakeSession()
+        expanded_folder.store_manifest(session, 'run', '00353.1/other', [])
+        self.assertIsNone(expanded_folder.load_manifest(session, 'run', '00353.1/run'))
+        expanded_folder.store_manifest(session, 'run', '00353.1/run', [])
+        self.assertEqual(expanded_folder.load_manifest(session, 'run', '00353.1/run'), [])
+
+    def test_renamed_manifest(self):
+        # the figure was copied before, the XML is listed under both names
+        files = [expanded_folder.manifest_entry('elife-00353-fig1-v1.tif', 100, '"a"'),
+                 expanded_folder.manifest_entry('elife-00353-v1.xml', 15, '"old"'),
+                 expanded_folder.manifest_entry('elife-00353.xml', 20, '"b"'),
+                 expanded_folder.manifest_entry('elife-00353-media1.mov', 30, '"m"')]
+        file_name_map = {'elife-00353-fig1-v1.tif': 'elife-00353-fig1-v1.tif',
+                         'elife-00353-v1.xml': 'elife-00353-v1.xml',
+                         'elife-00353.xml': 'elife-00353-v1.xml',
+                         'elife-00353-media1.mov': 'elife-00353-media1.mov'}
+
+        files = expanded_folder.renamed_manifest(files, file_name_map,
+                                                 {'elife-00353-v1.xml': '"c"'})
+
+        self.assertEqual(files, [
+            expanded_folder.manifest_entry('elife-00353-fig1-v1.tif', 100, '"a"'),
+            expanded_folder.manifest_entry('elife-00353-media1.mov', 30, '"m"'),
+            expanded_folder.manifest_entry('elife-00353-v1.xml', 20, '"c"')])
+
+    def test_file_etags(self):
+        files = [expanded_folder.manifest_entry('elife-00353-v1.xml', 20, '"b"'),
+                 expanded_folder.manifest_entry('elife-00353-v1.pdf', 30, None)]
+        self.assertEqual(expanded_folder.file_etags(files),
+                         {'elife-00353-v1.xml': '"b"', 'elife-00353-v1.pdf': None})
+
+    def test_article_xml_file_name_not_found(self):
+        self.assertIsNone(expanded_folder.article_xml_file_name(
+            [{'name': 'elife-00353-fig1-v1.tif', 'size': 1, 'etag': '"a"'}]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+from mock import MagicMock, patch
+from github import GithubException
+from provider import github_sync
+
+
+class TreeElement(object):
+    def __init__(self, path, sha, type='blob'):
+        self.path = path
+        self.sha = sha
+        self.type = type
+
+
+class TestGithubSync(unittest.TestCase):
+
+    def setUp(self):
+        patcher = patch('provider.github_sync.Github')
+        fake_github = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.repo = MagicMock()
+        self.repo.default_branch = 'master'
+        self.repo.create_git_commit.return_value = MagicMock(sha='c2')
+        self.repo.get_git_tree.return_value = MagicMock(tree=[
+            TreeElement('articles', 't1', 'tree'),
+            TreeElement('articles/elife-00353-v1.xml', github_sync.blob_sha('<article/>'))])
+        fake_github.return_value.get_user.return_value.get_repo.return_value = self.repo
+        self.sync = github_sync.GithubSync('token', 'elifesciences', 'elife-articles-xml')
+
+    def test_blob_sha(self):
+        # git hash-object of an empty file
+        self.assertEqual(github_sync.blob_sha(''), 'e69de29bb2d1d6434b8b29ae775ad8c2e48c5391')
+        self.assertEqual(github_sync.blob_sha(u'caf\xe9'), github_sync.blob_sha('caf\xc3\xa9'))
+
+    def test_commit_files(self):
+        files = {'/articles/elife-00353-v1.xml': '<article/>',
+                 '/articles/elife-00353-v2.xml': '<article>v2</article>',
+                 '/articles/elife-04132-v1.xml': '<article>04132</article>'}
+
+        paths, commit_sha = self.sync.commit_files(files, "Updates xml")
+
+        self.assertEqual(paths, ['articles/elife-00353-v2.xml', 'articles/elife-04132-v1.xml'])
+        self.assertEqual(commit_sha, 'c2')
+        tree_elements = self.repo.create_git_tree.call_args[0][0]
+        self.assertEqual([element._identity['path'] for element in tree_elements], paths)
+        self.repo.get_git_ref.return_value.edit.assert_called_once_with('c2')
+        self.assertFalse(self.repo.get_contents.called)
+
+        # the same files again make no commit and do not list the tree again
+        self.assertEqual(self.sync.commit_files(files, "Updates xml"), ([], None))
+        self.assertEqual(self.repo.create_git_commit.call_count, 1)
+        self.assertEqual(self.repo.get_git_tree.call_count, 1)
+
+    def test_commit_files_branch_moved(self):
+        self.repo.get_git_ref.return_value.edit.side_effect = [
+            GithubException(422, {'message': 'Update is not a fast forward'}), None]
+
+        paths, commit_sha = self.sync.commit_files(
+            {'/articles/elife-00353-v1.xml': '<article>corrected</article>'}, "Updates xml")
+
+        self.assertEqual(paths, ['articles/elife-00353-v1.xml'])
+        self.assertEqual(self.repo.create_git_commit.call_count, 2)
+
+    def test_commit_files_conflict(self):
+        self.repo.get_git_ref.return_value.edit.side_effect = GithubException(
+            422, {'message': 'Update is not a fast forward'})
+
+        with self.assertRaises(github_sync.ConflictException):
+            self.sync.commit_files({'/articles/elife-00353-v1.xml': '<article>corrected</article>'},
+                                   "Updates xml")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,5 @@
 import unittest
 from mock import mock, patch
-from provider.iiif import ShortRetryException
 import provider.iiif as iiif
 
 class ObjectView(object):
@@ -44,6 +43,32 @@ class TestIiif(unittest.TestCase):
         self.assertEqual(success, False)
         self.assertEqual(test_endpoint, "test_endpoint")
 
+    @patch('time.sleep')
+    @patch('requests.head')
+    def test_try_endpoint_retries_are_capped(self, request_mock, fake_sleep):
+        request_mock.return_value = ObjectView({'status_code': 504, 'content': ''})
+        fake_logger = FakeLogger()
+        success, test_endpoint = iiif.try_endpoint("test_endpoint", fake_logger)
+
+        self.assertEqual(success, False)
+        self.assertEqual(request_mock.call_count, 4)
+        self.assertEqual(fake_sleep.call_count, 3)
+
+    @patch('provider.endpoint_check.session')
+    def test_try_endpoints(self, fake_session):
+        # recorded in a list, the endpoints are checked from several threads
+        checked = []
+
+        def head(url, **kwargs):
+            checked.append(url)
+            return ObjectView({'status_code': 404 if url.endswith('2') else 200, 'content': ''})
+        fake_session.return_value.head.side_effect = head
+        results = iiif.try_endpoints(["endpoint1", "endpoint2", "endpoint3"], FakeLogger())
+
+        self.assertEqual(results, [(True, "endpoint1"), (False, "endpoint2"), (True, "endpoint3")])
+        self.assertEqual(sorted(checked), ["endpoint1", "endpoint2", "endpoint3"])
+        self.assertEqual(fake_session.return_value.close.call_count, 1)
+
 
 if __name__ == '__main__':
     unittest.main()
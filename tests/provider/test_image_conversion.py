@@ -0,0 +1,60 @@
+import unittest
+import os
+import shutil
+import tempfile
+from mock import MagicMock, patch
+from provider import image_conversion
+
+formats = {"Original": {"sources": "tif", "format": "jpg", "download": "yes"}}
+
+
+class TestImageConversion(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.logger = MagicMock()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def download(self, file_name):
+        file_path = os.path.join(self.tmp_dir, file_name)
+        shutil.copy('tests/files_source/elife-00353-fig1-v1.tif', file_path)
+        return file_path
+
+    @patch('provider.image_conversion.store_in_publish_locations')
+    def test_convert_figures(self, fake_store):
+        stored = {}
+
+        def store(settings, filename, image, publish_locations, download):
+            stored[filename] = (image.read()[:2], download)
+            image.close()
+        fake_store.side_effect = store
+
+        image_conversion.convert_figures(None, formats,
+                                         ['elife-00353-fig1-v1.tif', 'elife-00353-fig2-v1.tif'],
+                                         self.download, ['s3://cdn/00353/'], self.logger,
+                                         processes=2)
+
+        # JPEG start of image marker
+        self.assertEqual(stored, {'elife-00353-fig1-v1.jpg': ('\xff\xd8', 'yes'),
+                                  'elife-00353-fig2-v1.jpg': ('\xff\xd8', 'yes')})
+        timings = [call[0][0] for call in self.logger.info.call_args_list
+                   if call[0][0].startswith('Converted')]
+        self.assertEqual(len(timings), 2)
+
+    def test_convert_figures_failure(self):
+        def download(file_name):
+            file_path = os.path.join(self.tmp_dir, file_name)
+            with open(file_path, 'w') as open_file:
+                open_file.write('not an image')
+            return file_path
+
+        with self.assertRaises(Exception):
+            image_conversion.convert_figures(None, formats, ['elife-00353-fig1-v1.tif'],
+                                             download, ['s3://cdn/00353/'], self.logger,
+                                             processes=2)
+
+
+if __name__ == '__main__':
+    unittest.main()
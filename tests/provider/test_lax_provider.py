@@ -178,5 +178,39 @@ class TestLaxProvider(unittest.TestCase):
         result = lax_provider.was_ever_poa(article_id, settings_mock)
         self.assertEqual(result, None)
 
+    @patch('provider.lax_provider.article_versions')
+    def test_article_status(self, mock_lax_provider_article_versions):
+        mock_lax_provider_article_versions.return_value = 200, test_data.lax_article_versions_response_data
+        status = lax_provider.article_status('04132', settings_mock)
+        self.assertEqual(status, {'poa': True, 'vor': True, 'was_ever_poa': True,
+                                  'highest_version': 3})
+        self.assertEqual(mock_lax_provider_article_versions.call_count, 1)
+
+    @patch('provider.lax_provider.article_versions')
+    def test_article_status_404(self, mock_lax_provider_article_versions):
+        mock_lax_provider_article_versions.return_value = 404, None
+        status = lax_provider.article_status('04132', settings_mock)
+        self.assertEqual(status, {'poa': None, 'vor': None, 'was_ever_poa': None,
+                                  'highest_version': "1"})
+
+    @patch('provider.lax_provider.article_versions')
+    def test_article_statuses(self, mock_lax_provider_article_versions):
+        mock_lax_provider_article_versions.side_effect = lambda article_id, settings: \
+            (200, test_data.lax_article_versions_response_data) if article_id == '04132' else (404, None)
+        statuses = lax_provider.article_statuses(['04132', '00353', '04132'], settings_mock)
+        self.assertEqual(sorted(statuses.keys()), ['00353', '04132'])
+        self.assertEqual(statuses['04132']['was_ever_poa'], True)
+        self.assertEqual(statuses['00353']['was_ever_poa'], None)
+        self.assertEqual(mock_lax_provider_article_versions.call_count, 2)
+
+    def test_is_published(self):
+        poa_only = {'poa': True, 'vor': None}
+        self.assertEqual(lax_provider.is_published(poa_only, True, None), True)
+        self.assertEqual(lax_provider.is_published(poa_only, False, None), True)
+        self.assertEqual(lax_provider.is_published(poa_only, False, True), False)
+        self.assertEqual(lax_provider.is_published({'poa': True, 'vor': True}, False, True), True)
+        self.assertEqual(lax_provider.is_published({'poa': None, 'vor': None}, True, None), False)
+
+
 if __name__ == '__main__':
     unittest.main()
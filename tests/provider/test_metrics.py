@@ -0,0 +1,42 @@
+import unittest
+from provider import metrics
+
+
+class TestMetrics(unittest.TestCase):
+
+    def setUp(self):
+        metrics.start_task()
+
+    def test_timed_counts_calls_and_errors(self):
+        @metrics.timed('s3')
+        def get_resource(fail=False):
+            if fail:
+                raise RuntimeError("failed")
+            return "content"
+
+        self.assertEqual(get_resource(), "content")
+        self.assertRaises(RuntimeError, get_resource, True)
+        calls = metrics.current().to_dict()['calls']
+        self.assertEqual(calls['s3']['count'], 2)
+        self.assertEqual(calls['s3']['errors'], 1)
+        self.assertEqual(calls['s3.get_resource']['count'], 2)
+
+    def test_timed_operation_name(self):
+        metrics.timed('lax', 'versions')(lambda: None)()
+        self.assertEqual(sorted(metrics.current().to_dict()['calls'].keys()),
+                         ['lax', 'lax.versions'])
+
+    def test_span(self):
+        with metrics.span('download'):
+            pass
+        spans = metrics.current().to_dict()['spans']
+        self.assertEqual([span['name'] for span in spans], ['download'])
+
+    def test_start_task_resets(self):
+        metrics.timed('sqs')(lambda: None)()
+        metrics.start_task()
+        self.assertEqual(metrics.current().to_dict()['calls'], {})
+
+
+if __name__ == '__main__':
+    unittest.main()
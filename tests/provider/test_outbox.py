@@ -0,0 +1,74 @@
+import unittest
+from mock import MagicMock
+from provider import outbox
+
+
+class DeleteError(object):
+    def __init__(self, key):
+        self.key = key
+        self.message = 'Access Denied'
+
+
+class TestOutbox(unittest.TestCase):
+
+    def setUp(self):
+        self.bucket = MagicMock()
+        self.bucket.name = 'poa-packaging'
+        self.bucket.delete_keys.return_value = MagicMock(errors=[])
+
+    def test_outbox_key_names(self):
+        self.assertEqual(outbox.outbox_key_names('pubmed/outbox/', ['/tmp/elife00353.xml',
+                                                                    'elife02419.xml']),
+                         ['pubmed/outbox/elife00353.xml', 'pubmed/outbox/elife02419.xml'])
+
+    def test_move_keys(self):
+        key_names = ['pubmed/outbox/', 'pubmed/outbox/elife00353.xml',
+                     'pubmed/outbox/elife02419.xml']
+        # recorded in a list, the copies are made from several threads
+        copies = []
+        self.bucket.copy_key.side_effect = lambda *args: copies.append(args)
+
+        report = outbox.move_keys(self.bucket, key_names, 'pubmed/published/20170101/')
+
+        self.assertEqual(report, {'moved': ['pubmed/outbox/elife00353.xml',
+                                            'pubmed/outbox/elife02419.xml'],
+                                  'failed': []})
+        self.assertEqual(sorted(copies), [
+            ('pubmed/published/20170101/elife00353.xml', 'poa-packaging',
+             'pubmed/outbox/elife00353.xml'),
+            ('pubmed/published/20170101/elife02419.xml', 'poa-packaging',
+             'pubmed/outbox/elife02419.xml')])
+        self.bucket.delete_keys.assert_called_once_with(
+            ['pubmed/outbox/elife00353.xml', 'pubmed/outbox/elife02419.xml'], quiet=True)
+
+    def test_move_keys_failures(self):
+        key_names = ['pubmed/outbox/elife00353.xml', 'pubmed/outbox/elife02419.xml',
+                     'pubmed/outbox/elife04132.xml']
+
+        def copy_key(new_key_name, bucket_name, key_name):
+            if key_name.endswith('02419.xml'):
+                raise RuntimeError("copy failed")
+        self.bucket.copy_key.side_effect = copy_key
+        self.bucket.delete_keys.return_value = MagicMock(
+            errors=[DeleteError('pubmed/outbox/elife04132.xml')])
+        logger = MagicMock()
+
+        report = outbox.move_keys(self.bucket, key_names, 'pubmed/published/20170101/', logger)
+
+        # the key not copied is not deleted
+        self.bucket.delete_keys.assert_called_once_with(
+            ['pubmed/outbox/elife00353.xml', 'pubmed/outbox/elife04132.xml'], quiet=True)
+        self.assertEqual(report['moved'], ['pubmed/outbox/elife00353.xml'])
+        self.assertEqual(report['failed'], ['pubmed/outbox/elife02419.xml',
+                                            'pubmed/outbox/elife04132.xml'])
+        self.assertTrue(logger.exception.called)
+        self.assertTrue(logger.error.called)
+
+    def test_move_no_keys(self):
+        self.assertEqual(outbox.move_keys(self.bucket, ['pubmed/outbox/'], 'pubmed/published/'),
+                         {'moved': [], 'failed': []})
+        self.assertFalse(self.bucket.delete_keys.called)
+
+
+if __name__ == '__main__':
+    unittest.main()
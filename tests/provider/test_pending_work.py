@@ -0,0 +1,70 @@
+import unittest
+from boto.s3.key import Key
+from boto.s3.prefix import Prefix
+from boto.resultset import ResultSet
+from mock import MagicMock, patch
+from provider import pending_work
+
+
+def listing(key_names, prefixes=(), is_truncated=False, next_marker=None):
+    result = ResultSet()
+    result.extend(Prefix(name=name) for name in prefixes)
+    result.extend(Key(name=name) for name in key_names)
+    result.is_truncated = is_truncated
+    result.next_marker = next_marker
+    return result
+
+
+class TestPendingWork(unittest.TestCase):
+
+    def setUp(self):
+        pending_work.answers.clear()
+        self.bucket = MagicMock()
+        self.bucket.name = 'poa-packaging'
+
+    def test_s3_prefix_has_keys(self):
+        self.bucket.get_all_keys.return_value = listing(['pubmed/outbox/',
+                                                         'pubmed/outbox/elife00353.xml'])
+        self.assertTrue(pending_work.s3_prefix_has_keys(self.bucket, 'pubmed/outbox/'))
+        self.bucket.get_all_keys.assert_called_once_with(
+            prefix='pubmed/outbox/', delimiter='/', max_keys=10, marker='')
+
+    def test_s3_prefix_only_the_folder(self):
+        self.bucket.get_all_keys.return_value = listing(['pubmed/outbox/'])
+        self.assertFalse(pending_work.s3_prefix_has_keys(self.bucket, 'pubmed/outbox/'))
+
+    def test_s3_prefix_subfolders_first(self):
+        self.bucket.get_all_keys.side_effect = [
+            listing([], ['pubmed/outbox/archive/'], True, 'pubmed/outbox/archive/'),
+            listing(['pubmed/outbox/elife00353.xml'])]
+        self.assertTrue(pending_work.s3_prefix_has_keys(self.bucket, 'pubmed/outbox/',
+                                                        max_keys=1))
+        self.assertEqual(self.bucket.get_all_keys.call_args[1]['marker'],
+                         'pubmed/outbox/archive/')
+
+    def test_email_queue_has_items(self):
+        db = MagicMock()
+        db.elife_get_email_queue_query.return_value = 'query'
+        db.get_domain.return_value.select.return_value = iter([{'Name': 'item'}])
+
+        self.assertTrue(pending_work.email_queue_has_items(db, '2017-06-01T10:00:00.000Z'))
+        self.assertEqual(db.elife_get_email_queue_query.call_args[1]['query_type'], 'names')
+        db.get_domain.return_value.select.assert_called_once_with('query', max_items=1)
+
+        db.get_domain.return_value.select.return_value = iter([])
+        self.assertFalse(pending_work.email_queue_has_items(db))
+
+    @patch('provider.pending_work.time.time')
+    def test_cached(self, fake_time):
+        probe = MagicMock(side_effect=[False, True])
+        fake_time.return_value = 1000
+        self.assertFalse(pending_work.cached('key', probe, 60))
+        fake_time.return_value = 1059
+        self.assertFalse(pending_work.cached('key', probe, 60))
+        fake_time.return_value = 1060
+        self.assertTrue(pending_work.cached('key', probe, 60))
+        self.assertEqual(probe.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+import json
+import base64
+from mock import Mock, patch
+from provider import sqs_batch
+
+
+class TestSqsBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.logger = Mock()
+        self.queue = Mock()
+
+    def test_send_messages_returns_the_items_sent(self):
+        self.queue.write_batch.side_effect = [Mock(errors=[{'id': '1'}]), Mock(errors=[])]
+        messages = [('item%s' % index, {'index': index}) for index in range(12)]
+
+        sent = sqs_batch.send_messages(self.queue, messages, self.logger)
+
+        self.assertEqual(sent, ['item%s' % index for index in range(12) if index != 1])
+        entries = self.queue.write_batch.call_args_list[1][0][0]
+        self.assertEqual([json.loads(base64.b64decode(entry[1])) for entry in entries],
+                         [{'index': 10}, {'index': 11}])
+        self.assertTrue(self.logger.error.called)
+
+    def test_delete_messages(self):
+        self.queue.delete_message_batch.side_effect = [Mock(errors=[{'id': '0'}]), Mock(errors=[])]
+        self.assertEqual(sqs_batch.delete_messages(self.queue, range(15), self.logger), 14)
+        self.assertEqual(self.queue.delete_message_batch.call_args_list[1][0][0], range(10, 15))
+
+    @patch('provider.sqs_batch.time.time')
+    def test_throughput(self, fake_time):
+        fake_time.return_value = 100
+        throughput = sqs_batch.Throughput(self.logger, interval=60)
+        throughput.add('received', 30)
+        fake_time.return_value = 130
+        self.assertFalse(throughput.log_if_due())
+        fake_time.return_value = 160
+        self.assertTrue(throughput.log_if_due())
+        self.logger.info.assert_called_once_with("throughput over 60 seconds: received 30 (0.50/s)")
+        self.assertEqual(throughput.counts, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+import threading
+from mock import Mock
+from provider import sqs_consumer
+
+
+class BatchResults(object):
+    def __init__(self, errors=None):
+        self.errors = errors or []
+
+
+class FakeFlag(object):
+    "Green for the number of polls given"
+
+    def __init__(self, polls):
+        self.polls = polls
+
+    def green(self):
+        self.polls -= 1
+        return self.polls >= 0
+
+
+class TestConsumer(unittest.TestCase):
+
+    def setUp(self):
+        self.queue = Mock()
+        self.queue.delete_message_batch.return_value = BatchResults()
+        self.out_queue = Mock()
+        self.out_queue.write_batch.return_value = BatchResults()
+        self.logger = Mock()
+
+    def test_outcomes(self):
+        messages = [Mock(id=str(index)) for index in range(5)]
+        outcomes = {'0': None,
+                    '1': sqs_consumer.forward({'workflow_name': 'Ping'}),
+                    '2': sqs_consumer.retry(30),
+                    '3': sqs_consumer.KEEP}
+
+        def handle(message):
+            if message.id == '4':
+                raise ValueError('cannot handle')
+            return outcomes[message.id]
+
+        consumer = sqs_consumer.Consumer(self.queue, handle, self.logger, out_queue=self.out_queue)
+        consumer.process_batch(messages)
+
+        self.assertEqual(len(self.out_queue.write_batch.call_args[0][0]), 1)
+        deleted = self.queue.delete_message_batch.call_args[0][0]
+        self.assertEqual([message.id for message in deleted], ['0', '1'])
+        self.queue.change_message_visibility_batch.assert_called_once_with([(messages[2], 30)])
+        self.assertTrue(self.logger.exception.called)
+        self.assertEqual(consumer.throughput.counts,
+                         {'received': 5, 'sent': 1, 'deleted': 2, 'retried': 1})
+
+    def test_run_finishes_the_batch_and_stops(self):
+        messages = [Mock(id=str(index)) for index in range(3)]
+        self.queue.get_messages.side_effect = [messages, []]
+        handled = []
+        consumer = sqs_consumer.Consumer(self.queue, handled.append, self.logger,
+                                         batch_size=20, concurrency=2)
+
+        consumer.run(FakeFlag(2))
+
+        self.assertEqual(sorted(message.id for message in handled), ['0', '1', '2'])
+        self.assertEqual(self.queue.get_messages.call_count, 2)
+        self.assertEqual(self.queue.get_messages.call_args[1]['num_messages'], 10)
+
+    def test_slow_handler_extends_the_visibility_timeout(self):
+        messages = [Mock(id='quick'), Mock(id='slow')]
+        extended = threading.Event()
+        self.queue.change_message_visibility_batch.side_effect = lambda entries: extended.set()
+
+        def handle(message):
+            if message.id == 'slow':
+                extended.wait(5)
+
+        consumer = sqs_consumer.Consumer(self.queue, handle, self.logger, visibility_timeout=0.1)
+        consumer.process_batch(messages)
+
+        self.assertTrue(extended.is_set())
+        entries = self.queue.change_message_visibility_batch.call_args_list[0][0][0]
+        self.assertEqual(entries, [(messages[1], 0.1)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import os
+import shutil
+import tempfile
+import unittest
+from ddt import ddt, data, unpack
+from mock import Mock
+from provider import workflow_rules
+from provider.workflow_rules import RuleMatcher, RulesFile
+
+RULES = {
+    'ArticleZip': {'bucket_name_pattern': '.*elife-production-final$',
+                   'file_name_pattern': r'.*\.zip',
+                   'starter_name': 'IngestArticleZip'},
+    'PoaXml': {'bucket_name_pattern': 'elife-poa-packaging$',
+               'file_name_pattern': r'outbox/.*\.xml',
+               'starter_name': 'PackagePOA'},
+    'PoaAny': {'bucket_name_pattern': 'elife-poa-packaging$',
+               'file_name_pattern': r'.*',
+               'starter_name': 'Other'},
+}
+
+
+@ddt
+class TestWorkflowRules(unittest.TestCase):
+
+    @unpack
+    @data(
+        ('elife-production-final$', 'elife-production-final'),
+        ('^elife-production-final$', 'elife-production-final'),
+        (r'elife\.bucket$', 'elife.bucket'),
+        ('.*elife-production-final$', None),
+        ('elife-production-final', None),
+        ('elife-(a|b)$', None),
+    )
+    def test_literal_bucket_name(self, pattern, expected):
+        self.assertEqual(workflow_rules.literal_bucket_name(pattern), expected)
+
+    @unpack
+    @data(
+        ('elife-production-final', 'elife-00353-vor-v1.zip', 'IngestArticleZip'),
+        ('prefix-elife-production-final', 'elife-00353-vor-v1.zip', 'IngestArticleZip'),
+        ('elife-production-final', 'elife-00353-vor-v1.xml', None),
+        ('elife-poa-packaging', 'outbox/elife-00353.xml', 'Other'),
+        ('prefix-elife-poa-packaging', 'outbox/elife-00353.xml', None),
+        ('unknown', 'elife-00353-vor-v1.zip', None),
+    )
+    def test_starter_name(self, bucket_name, file_name, expected):
+        matcher = RuleMatcher(RULES)
+        self.assertEqual(matcher.starter_name(bucket_name, file_name), expected)
+        # the second lookup comes from the bucket cache
+        self.assertEqual(matcher.starter_name(bucket_name, file_name), expected)
+        self.assertTrue(bucket_name in matcher.bucket_cache)
+
+    def test_exact_buckets_are_indexed(self):
+        matcher = RuleMatcher(RULES)
+        self.assertEqual(sorted(matcher.exact.keys()), ['elife-poa-packaging'])
+        self.assertEqual([rule.name for rule in matcher.patterns], ['ArticleZip'])
+
+
+class TestRulesFile(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'rules.yaml')
+        self.write("Zip:\n  bucket_name_pattern: 'bucket$'\n"
+                   "  file_name_pattern: '.*\\.zip'\n  starter_name: 'First'\n", 1000)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, content, mtime):
+        with open(self.path, 'w') as open_file:
+            open_file.write(content)
+        os.utime(self.path, (mtime, mtime))
+
+    def test_reload_if_changed(self):
+        rules = RulesFile(self.path)
+        self.assertEqual(rules.starter_name('bucket', 'a.zip'), 'First')
+        self.assertFalse(rules.reload_if_changed())
+        self.write("Zip:\n  bucket_name_pattern: 'bucket$'\n"
+                   "  file_name_pattern: '.*\\.zip'\n  starter_name: 'Second'\n", 2000)
+        self.assertTrue(rules.reload_if_changed())
+        self.assertEqual(rules.starter_name('bucket', 'a.zip'), 'Second')
+
+    def test_bad_file_keeps_the_rules(self):
+        logger = Mock()
+        rules = RulesFile(self.path, logger)
+        self.write("Zip: [", 2000)
+        self.assertFalse(rules.reload_if_changed())
+        self.assertEqual(rules.starter_name('bucket', 'a.zip'), 'First')
+        self.assertEqual(logger.exception.call_count, 1)
+        # the same broken file is not parsed again
+        self.assertFalse(rules.reload_if_changed())
+        self.assertEqual(logger.exception.call_count, 1)
+
+    def test_unsafe_yaml_is_rejected(self):
+        self.write("Zip: !!python/object/apply:os.system ['true']\n", 1000)
+        self.assertRaises(Exception, RulesFile, self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
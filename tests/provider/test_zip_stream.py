@@ -0,0 +1,79 @@
+import unittest
+import zipfile
+from StringIO import StringIO
+from mock import MagicMock
+from provider import zip_stream
+
+
+class FakeKey(object):
+    def __init__(self, name, content):
+        self.name = name
+        self.size = len(content)
+        self.content = content
+
+    def get_contents_to_file(self, fp):
+        fp.write(self.content)
+
+
+class FakeMultipartUpload(object):
+    def __init__(self):
+        self.parts = {}
+        self.completed = False
+        self.cancelled = False
+
+    def upload_part_from_file(self, fp, part_num):
+        self.parts[part_num] = fp.read()
+
+    def complete_upload(self):
+        self.completed = True
+
+    def cancel_upload(self):
+        self.cancelled = True
+
+    def content(self):
+        return ''.join(self.parts[part_num] for part_num in sorted(self.parts))
+
+
+class TestZipStream(unittest.TestCase):
+
+    def setUp(self):
+        self.upload = FakeMultipartUpload()
+        self.bucket = MagicMock()
+        self.bucket.initiate_multipart_upload.return_value = self.upload
+        self.keys = [FakeKey('00353.1/run/', ''),
+                     FakeKey('00353.1/run/elife-00353-v1.xml', '<article>' * 5000),
+                     FakeKey('00353.1/run/elife-00353-media1.mp4', 'video' * 3000),
+                     FakeKey('00353.1/run/elife-00353-v1.pdf', '%PDF' * 100)]
+
+    def test_archive_keys(self):
+        report = zip_stream.archive_keys(self.keys, self.bucket, 'elife-00353.zip',
+                                         pool_size=2, window=2, part_size=1024)
+
+        self.bucket.initiate_multipart_upload.assert_called_once_with('elife-00353.zip')
+        self.assertTrue(self.upload.completed)
+        self.assertTrue(len(self.upload.parts) > 1)
+        self.assertEqual(report['files'], 3)
+        self.assertEqual(report['bytes_out'], len(self.upload.content()))
+
+        archive = zipfile.ZipFile(StringIO(self.upload.content()))
+        self.assertIsNone(archive.testzip())
+        self.assertEqual(archive.namelist(), ['elife-00353-v1.xml', 'elife-00353-media1.mp4',
+                                              'elife-00353-v1.pdf'])
+        self.assertEqual(archive.read('elife-00353-v1.xml'), '<article>' * 5000)
+        self.assertEqual(archive.getinfo('elife-00353-v1.xml').compress_type, zipfile.ZIP_DEFLATED)
+        self.assertEqual(archive.getinfo('elife-00353-media1.mp4').compress_type, zipfile.ZIP_STORED)
+
+    def test_failed_fetch_cancels_the_upload(self):
+        self.keys[2].get_contents_to_file = MagicMock(side_effect=IOError('connection reset'))
+        logger = MagicMock()
+
+        with self.assertRaises(IOError):
+            zip_stream.archive_keys(self.keys, self.bucket, 'elife-00353.zip', logger)
+
+        self.assertTrue(self.upload.cancelled)
+        self.assertFalse(self.upload.completed)
+        self.assertTrue(logger.exception.called)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,6 +3,8 @@ import starter.starter_helper as starter_helper
 import tests.test_data as test_data
 import json
 from ddt import ddt, data, unpack
+from mock import patch
+import tests.settings_mock as settings_mock
 
 
 example_workflow_name = "PostPerfectPublication"
@@ -37,6 +39,18 @@ class TestStarterHelper(unittest.TestCase):
         self.assertEqual("1800", execution_start_to_close_timeout)
         self.assertEqual(json.dumps(data), workflow_input)
 
+    @patch('boto.swf.layer1.Layer1')
+    def test_get_swf_connection(self, fake_layer1):
+        fake_layer1.side_effect = lambda *args: object()
+        self.assertIsNot(starter_helper.get_swf_connection(settings_mock),
+                         starter_helper.get_swf_connection(settings_mock))
+        starter_helper.reuse_swf_connections()
+        try:
+            self.assertIs(starter_helper.get_swf_connection(settings_mock),
+                          starter_helper.get_swf_connection(settings_mock))
+        finally:
+            starter_helper.reuse_swf_connections(False)
+            starter_helper._swf_connections.conn = None
 
 
 if __name__ == '__main__':
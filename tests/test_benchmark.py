@@ -0,0 +1,46 @@
+import unittest
+import zipfile
+from StringIO import StringIO
+from benchmark import articles
+from benchmark import stand_ins
+
+
+class TestBenchmarkStandIns(unittest.TestCase):
+
+    def setUp(self):
+        stand_ins.S3_STORE.clear()
+        stand_ins.RECORDER = stand_ins.Recorder()
+        stand_ins.put_object('bucket', 'folder/a.xml', '<article/>')
+        stand_ins.put_object('bucket', 'folder/sub/b.tif', 'tif')
+        self.bucket = stand_ins.FakeS3Connection().get_bucket('bucket', validate=False)
+
+    def test_list_with_delimiter(self):
+        names = [item.name for item in self.bucket.list('folder/', '/')]
+        self.assertEqual(names, ['folder/a.xml', 'folder/sub/'])
+        self.assertEqual(stand_ins.RECORDER.operations, {'s3.ListObjects': 1})
+
+    def test_copy_and_delete_are_counted(self):
+        self.bucket.copy_key('published/a.xml', 'bucket', 'folder/a.xml')
+        self.bucket.delete_keys(['folder/a.xml', 'folder/sub/b.tif'])
+        self.assertEqual(sorted(stand_ins.S3_STORE['bucket'].keys()), ['published/a.xml'])
+        self.assertEqual(stand_ins.RECORDER.operations,
+                         {'s3.CopyObject': 1, 's3.DeleteObjects': 1})
+
+    def test_get_contents_counts_bytes(self):
+        key = self.bucket.get_key('/folder/a.xml')
+        self.assertEqual(key.get_contents_as_string(), '<article/>')
+        self.assertEqual(stand_ins.RECORDER.bytes_in['s3'], 10)
+
+
+class TestBenchmarkArticles(unittest.TestCase):
+
+    def test_article_zip(self):
+        zip_data = articles.article_zip(figures=2, video_bytes=10)
+        names = zipfile.ZipFile(StringIO(zip_data)).namelist()
+        self.assertEqual(sorted(names), ['elife-00353-fig1-v1.tif', 'elife-00353-fig1-video1.mp4',
+                                         'elife-00353-fig2-v1.tif', 'elife-00353-v1.pdf',
+                                         'elife-00353-v1.xml'])
+
+
+if __name__ == '__main__':
+    unittest.main()
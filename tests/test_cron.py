@@ -0,0 +1,64 @@
+import unittest
+import time
+import cron
+from mock import Mock, patch
+from ddt import ddt, data, unpack
+
+
+def at(timestamp):
+    return time.strptime(timestamp, "%Y-%m-%d %H:%M")
+
+
+@ddt
+class TestCron(unittest.TestCase):
+
+    def setUp(self):
+        self.settings = Mock()
+        self.logger = Mock()
+
+    @unpack
+    @data(
+        ('2017-06-01 09:10', ['cron_FiveMinute', 'DepositCrossref']),
+        ('2017-06-01 11:35', ['cron_FiveMinute', 'PublishPOA', 'S3Monitor_POA']),
+        ('2017-06-01 21:50', ['cron_FiveMinute', 'S3Monitor_POA', 'PubRouterDeposit_WoS',
+                              'PubRouterDeposit_GoOA', 'PubmedArticleDeposit', 'AdminEmail']),
+    )
+    def test_due_jobs(self, timestamp, expected):
+        self.assertEqual([job.workflow_id for job in cron.due_jobs(cron.SCHEDULE, at(timestamp))],
+                         expected)
+
+    @patch('cron.get_starter')
+    @patch('cron.execution_history.last_completed_start_timestamps')
+    def test_run_cron(self, fake_last_starts, fake_get_starter):
+        current_time = at('2017-06-01 21:50')
+        now = cron.calendar.timegm(current_time)
+        fake_last_starts.return_value = {'cron_FiveMinute': now - 60, 'AdminEmail': None,
+                                         'PubRouterDeposit_GoOA': now - 60 * 60 * 24}
+        fake_outbox = Mock(return_value=False)
+        schedule = [job for job in cron.SCHEDULE if job.workflow_id in
+                    ['cron_FiveMinute', 'AdminEmail', 'PubRouterDeposit_GoOA']]
+        schedule.append(cron.Job('PubmedArticleDeposit', 'starter_PubmedArticleDeposit',
+                                 '45-59 * * * *', 60 * 31, condition=fake_outbox))
+
+        # created before the threads start using it
+        fake_start = fake_get_starter.return_value.return_value.start
+
+        started = cron.run_cron(self.settings, self.logger, current_time, schedule)
+
+        # cron_FiveMinute ran a minute ago and the pubmed outbox is empty
+        self.assertEqual(sorted(started), ['AdminEmail', 'PubRouterDeposit_GoOA'])
+        fake_start.assert_any_call(settings=self.settings, workflow='GoOA')
+        fake_start.assert_any_call(settings=self.settings, workflow='AdminEmail')
+        fake_outbox.assert_called_once_with(self.settings)
+
+    @patch('cron.get_starter')
+    def test_start_job_failure(self, fake_get_starter):
+        fake_get_starter.return_value.return_value.start.side_effect = RuntimeError('no SWF')
+        job = cron.Job('AdminEmail', 'starter_AdminEmail', '* * * * *', 60)
+
+        self.assertFalse(cron.start_job(self.settings, job, self.logger))
+        self.assertTrue(self.logger.exception.called)
+
+
+if __name__ == '__main__':
+    unittest.main()
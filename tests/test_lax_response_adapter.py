@@ -40,6 +40,28 @@ class TestLaxResponseAdapter(unittest.TestCase):
         self.assertDictEqual.__self__.maxDiff = None
         self.assertDictEqual(expected_workflow_starter_message, workflow_message_expected)
 
+    def test_process_messages(self):
+        messages = [Mock(id=str(index)) for index in range(12)]
+        for message in messages:
+            message.get_body.return_value = fake_lax_message
+        messages[3].get_body.return_value = 'not json'
+        input_queue = Mock()
+        input_queue.delete_message_batch.return_value = Mock(errors=[])
+        output_queue = Mock()
+        output_queue.write_batch.return_value = Mock(errors=[])
+        consumer = self.laxresponseadapter.consumer(input_queue, output_queue)
+
+        consumer.process_batch(messages)
+
+        self.assertEqual(output_queue.write_batch.call_count, 2)
+        entries = output_queue.write_batch.call_args_list[0][0][0]
+        self.assertDictEqual(json.loads(base64.b64decode(entries[0][1])), workflow_message_expected)
+        deleted = sum([call[0][0] for call in input_queue.delete_message_batch.call_args_list], [])
+        # the message that could not be parsed is left in the queue
+        self.assertEqual([message.id for message in deleted],
+                         [message.id for message in messages if message.id != '3'])
+        self.assertEqual(consumer.throughput.counts, {'received': 12, 'sent': 11, 'deleted': 11})
+
 
 if __name__ == '__main__':
     unittest.main()
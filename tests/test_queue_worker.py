@@ -0,0 +1,77 @@
+import unittest
+import json
+import base64
+from mock import Mock
+from S3utility.s3_sqs_message import S3SQSMessage
+from provider.workflow_rules import RuleMatcher
+import queue_worker
+from provider import sqs_consumer
+
+
+def s3_event_message(message_id, bucket_name, file_name):
+    body = json.dumps({'Records': [{
+        'eventName': 'ObjectCreated:Put',
+        'eventTime': '2016-06-07T10:45:18.141126Z',
+        's3': {'bucket': {'name': bucket_name},
+               'object': {'key': file_name, 'eTag': 'etag', 'size': 1}}}]})
+    message = S3SQSMessage()
+    message.set_body(body)
+    message.id = message_id
+    return message
+
+
+class BatchResults(object):
+    def __init__(self, errors=None):
+        self.errors = errors or []
+
+
+class TestQueueWorker(unittest.TestCase):
+
+    def setUp(self):
+        self.rules = RuleMatcher({'ArticleZip': {'bucket_name_pattern': '.*elife-production-final$',
+                                     'file_name_pattern': r'.*\.zip',
+                                     'starter_name': 'IngestArticleZip'}})
+        self.queue = Mock()
+        self.queue.delete_message_batch.return_value = BatchResults()
+        self.out_queue = Mock()
+        self.out_queue.write_batch.return_value = BatchResults()
+        self.logger = Mock()
+
+    def test_process_messages_batches(self):
+        messages = [s3_event_message(str(i), 'elife-production-final', 'elife-%s.zip' % i)
+                    for i in range(12)]
+        self.process_batch(messages)
+        # 12 starter messages are sent and deleted in batches of 10
+        self.assertEqual(self.out_queue.write_batch.call_count, 2)
+        self.assertEqual(self.queue.delete_message_batch.call_count, 2)
+        entries = self.out_queue.write_batch.call_args_list[0][0][0]
+        self.assertEqual(len(entries), 10)
+        body = json.loads(base64.b64decode(entries[0][1]))
+        self.assertEqual(body['workflow_name'], 'IngestArticleZip')
+        self.assertEqual(body['workflow_data']['file_name'], 'elife-0.zip')
+
+    def test_unmatched_file_does_not_stop_the_batch(self):
+        messages = [s3_event_message('1', 'other-bucket', 'elife-1.zip'),
+                    s3_event_message('2', 'elife-production-final', 'elife-2.zip')]
+        self.process_batch(messages)
+        self.assertEqual(len(self.out_queue.write_batch.call_args[0][0]), 1)
+        deleted = self.queue.delete_message_batch.call_args[0][0]
+        self.assertEqual(sorted(message.id for message in deleted), ['1', '2'])
+
+    def test_failed_send_is_not_deleted(self):
+        self.out_queue.write_batch.return_value = BatchResults([{'id': '0'}])
+        messages = [s3_event_message('1', 'elife-production-final', 'elife-1.zip'),
+                    s3_event_message('2', 'elife-production-final', 'elife-2.zip')]
+        self.process_batch(messages)
+        deleted = self.queue.delete_message_batch.call_args[0][0]
+        self.assertEqual([message.id for message in deleted], ['2'])
+
+    def process_batch(self, messages):
+        consumer = sqs_consumer.Consumer(
+            self.queue, lambda message: queue_worker.handle_message(message, self.rules, self.logger),
+            self.logger, out_queue=self.out_queue)
+        consumer.process_batch(messages)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+import json
+from multiprocessing.pool import ThreadPool
+from boto.sqs.message import Message
+from mock import Mock, patch
+from starter.starter_Ping import starter_Ping
+import queue_workflow_starter
+
+
+def starter_message(workflow_name, workflow_data):
+    message = Message()
+    message.set_body(json.dumps({'workflow_name': workflow_name,
+                                 'workflow_data': workflow_data}))
+    return message
+
+
+class BatchResults(object):
+    def __init__(self, errors=None):
+        self.errors = errors or []
+
+
+class TestQueueWorkflowStarter(unittest.TestCase):
+
+    def setUp(self):
+        queue_workflow_starter.logger = Mock()
+        self.queue = Mock()
+        self.queue.delete_message_batch.return_value = BatchResults()
+        self.pool = ThreadPool(4)
+
+    def tearDown(self):
+        self.pool.close()
+
+    @patch('queue_workflow_starter.start_workflow')
+    def test_process_messages(self, fake_start_workflow):
+        # recorded in a list, the workflows are started from several threads
+        starts = []
+
+        def start_workflow(workflow_name, workflow_data):
+            starts.append(workflow_name)
+            if workflow_name == 'Fail':
+                raise Exception('failed')
+        fake_start_workflow.side_effect = start_workflow
+        queue_workflow_starter.logger.exception = Mock()
+        messages = [starter_message('Ping', {'workflow': 'Ping'}) for _ in range(12)]
+        messages[1] = starter_message('Fail', {'workflow': 'Fail'})
+        queue_workflow_starter.consumer(self.queue).process_batch(messages, self.pool)
+        self.assertEqual(sorted(starts), ['Fail'] + ['Ping'] * 11)
+        # every message is deleted, in batches of 10, even when its workflow failed to start
+        self.assertEqual([len(call[0][0]) for call in
+                          self.queue.delete_message_batch.call_args_list], [10, 2])
+        self.assertEqual(queue_workflow_starter.logger.exception.call_count, 1)
+
+    def test_get_starter(self):
+        starter_class = queue_workflow_starter.get_starter('starter_Ping')
+        self.assertTrue(starter_class is starter_Ping)
+        self.assertTrue(queue_workflow_starter.starters['starter_Ping'] is starter_Ping)
+
+
+if __name__ == '__main__':
+    unittest.main()
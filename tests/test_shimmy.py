@@ -1,6 +1,5 @@
 import unittest
 import logging
-import requests
 import shimmy
 from shimmy import Shimmy
 import activity
@@ -8,6 +7,7 @@ import activity
 from mock import Mock, patch
 from pprint import pprint
 from ddt import ddt, data, unpack
+from multiprocessing.pool import ThreadPool
 
 class FakeResponse:
     def __init__(self, status_code):
@@ -23,34 +23,60 @@ class tests_Shimmy(unittest.TestCase):
     def setUp(self):
         settings = Mock()
         settings.drupal_EIF_endpoint = 'http://example.com/article.json'
+        settings.shimmy_concurrency = 2
         self.logger = Mock()
         self.shimmy = Shimmy(settings, self.logger)
+        self.shimmy.http_session = Mock()
         self.queue = Mock()
 
-    @patch.object(requests, 'post')
-    def test_200_response_code(self, post):
-        post.return_value = FakeResponse(200)
+    def test_200_response_code(self):
+        self.shimmy.http_session.post.return_value = FakeResponse(200)
         attempt = self._post_some_eif()
         attempt()
         self.logger.error.assert_not_called()
         assert self.queue.write.called
 
-    @patch.object(requests, 'post')
-    def test_429_response_code(self, post):
-        post.return_value = FakeResponse(429)
+    def test_429_response_code(self):
+        self.shimmy.http_session.post.return_value = FakeResponse(429)
         attempt = self._post_some_eif()
         self.assertRaises(shimmy.ShortRetryException, attempt)
         self.logger.error.assert_not_called()
         self.queue.write.assert_not_called()
 
-    @patch.object(requests, 'post')
-    def test_500_response_code(self, post):
-        post.return_value = FakeResponse(500)
+    def test_500_response_code(self):
+        self.shimmy.http_session.post.return_value = FakeResponse(500)
         attempt = self._post_some_eif()
         attempt()
         self.logger.error.assert_called_with('Data sent (first 500 characters): %s', '{"field":"value"}')
         self.queue.write.assert_not_called()
 
+    @patch('shimmy.time.sleep')
+    def test_429_response_code_backs_off_all_workers(self, sleep):
+        self.assertEqual(self.shimmy.backoff.overloaded(), shimmy.MIN_BACKOFF)
+        self.assertEqual(self.shimmy.backoff.overloaded(), 2 * shimmy.MIN_BACKOFF)
+        self.shimmy.http_session.post.return_value = FakeResponse(200)
+        self._post_some_eif()()
+        self.assertTrue(sleep.called)
+        self.assertEqual(self.shimmy.backoff.delay, shimmy.MIN_BACKOFF)
+
+    def test_handle_message(self):
+        messages = [Mock(id='processed'), Mock(id='retry'), Mock(id='failed')]
+        outcomes = {'processed': None, 'retry': shimmy.ShortRetryException('429'),
+                    'failed': ValueError('bad message')}
+        input_queue = Mock()
+        input_queue.delete_message_batch.return_value = Mock(errors=[])
+        pool = ThreadPool(2)
+
+        with patch.object(Shimmy, 'process_message') as process_message:
+            process_message.side_effect = lambda message, output_queue: \
+                self._raise(outcomes[message.id])
+            self.shimmy.consumer(input_queue, self.queue).process_batch(messages, pool)
+        pool.close()
+
+        input_queue.delete_message_batch.assert_called_once_with([messages[0]])
+        input_queue.change_message_visibility_batch.assert_called_once_with(
+            [(messages[1], shimmy.MIN_BACKOFF)])
+
     @data(
         ({}, {}, None),
         ({'update_date': u'2012-12-13T00:00:00Z'}, {}, '2012-12-13T00:00:00Z'),
@@ -63,6 +89,10 @@ class tests_Shimmy(unittest.TestCase):
         self.assertEqual(update_date, update_date_extracted)
 
 
+    def _raise(self, exception):
+        if exception:
+            raise exception
+
     def _post_some_eif(self):
         return lambda: self.shimmy.post_eif(
             '{"field":"value"}',
@@ -0,0 +1,86 @@
+import unittest
+from mock import Mock
+from workflow.workflow_ProcessArticleZip import workflow_ProcessArticleZip
+import tests.settings_mock as settings_mock
+
+
+def history(*activities):
+    """
+    Build a decision response from (activity ID, close event type) pairs, the
+    close event type None for an activity that is still running
+    """
+    events = [{"eventId": 1, "eventType": "WorkflowExecutionStarted",
+               "workflowExecutionStartedEventAttributes": {"input": "{}"}}]
+    for activity_id, close_event_type in activities:
+        scheduled_event_id = len(events) + 1
+        events.append({"eventId": scheduled_event_id, "eventType": "ActivityTaskScheduled",
+                       "activityTaskScheduledEventAttributes": {
+                           "activityType": {"name": activity_id, "version": "1"},
+                           "activityId": activity_id}})
+        if close_event_type is not None:
+            attributes_key = close_event_type[0].lower() + close_event_type[1:] + "EventAttributes"
+            events.append({"eventId": len(events) + 1, "eventType": close_event_type,
+                           attributes_key: {"scheduledEventId": scheduled_event_id}})
+    return {"events": events}
+
+
+def activity_ids(activities):
+    return sorted(activity["activity_id"] for activity in activities)
+
+
+class TestWorkflow(unittest.TestCase):
+
+    def workflow(self, decision):
+        return workflow_ProcessArticleZip(settings_mock, Mock(), decision=decision)
+
+    def test_first_activity(self):
+        workflow = self.workflow(history())
+        self.assertEqual(activity_ids(workflow.get_next_activities()), ["PingWorker"])
+
+    def test_fan_out(self):
+        workflow = self.workflow(history(("PingWorker", "ActivityTaskCompleted"),
+                                         ("VerifyLaxResponse", "ActivityTaskCompleted")))
+        self.assertEqual(activity_ids(workflow.get_next_activities()),
+                         ["ConvertJATS", "DepositAssets", "ResizeImages", "ScheduleCrossref"])
+
+    def test_running_activities_are_not_scheduled_again(self):
+        workflow = self.workflow(history(("PingWorker", "ActivityTaskCompleted"),
+                                         ("VerifyLaxResponse", "ActivityTaskCompleted"),
+                                         ("ScheduleCrossref", None),
+                                         ("ConvertJATS", "ActivityTaskCompleted"),
+                                         ("ResizeImages", None),
+                                         ("DepositAssets", "ActivityTaskFailed")))
+        # the failed activity is retried, the activity depending on ConvertJATS can start
+        self.assertEqual(activity_ids(workflow.get_next_activities()),
+                         ["DepositAssets", "SetPublicationStatus"])
+
+    def test_fan_in(self):
+        completed = [("PingWorker", "ActivityTaskCompleted"),
+                     ("VerifyLaxResponse", "ActivityTaskCompleted"),
+                     ("ScheduleCrossref", "ActivityTaskCompleted"),
+                     ("ConvertJATS", "ActivityTaskCompleted"),
+                     ("SetPublicationStatus", "ActivityTaskCompleted"),
+                     ("ResizeImages", "ActivityTaskCompleted")]
+        workflow = self.workflow(history(*(completed + [("DepositAssets", "ActivityTaskTimedOut")])))
+        self.assertEqual(activity_ids(workflow.get_next_activities()), ["DepositAssets"])
+
+        workflow = self.workflow(history(*(completed + [("DepositAssets", "ActivityTaskCompleted")])))
+        self.assertEqual(activity_ids(workflow.get_next_activities()), ["PreparePostEIF"])
+        self.assertFalse(workflow.is_workflow_complete())
+
+        workflow = self.workflow(history(*(completed + [("DepositAssets", "ActivityTaskCompleted"),
+                                                        ("PreparePostEIF", "ActivityTaskCompleted")])))
+        self.assertEqual(workflow.get_next_activities(), [])
+        self.assertTrue(workflow.is_workflow_complete())
+
+    def test_parallel_step_waits_for_all_activities(self):
+        workflow = self.workflow(history(("A", "ActivityTaskCompleted"), ("B", None)))
+        workflow.load_definition({"steps": [
+            [{"activity_type": "A", "activity_id": "A"},
+             {"activity_type": "B", "activity_id": "B"}],
+            {"activity_type": "C", "activity_id": "C"}]})
+        self.assertEqual(workflow.get_next_activities(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,6 +8,7 @@ import importlib
 import time
 import newrelic.agent
 from provider import process
+from provider import metrics
 from optparse import OptionParser
 
 import activity
@@ -67,8 +68,10 @@ def work(ENV, flag):
                             data = get_input(activity_task)
 
                             # Do the activity
+                            metrics.start_task()
                             try:
-                                activity_result = activity_object.do_activity(data)
+                                with metrics.span('do_activity'):
+                                    activity_result = activity_object.do_activity(data)
                             except Exception as e:
                                 logger.error('error executing activity %s' %
                                              activity_name, exc_info=True)
@@ -106,6 +109,8 @@ def work(ENV, flag):
                                     detail = ''
                                     respond_failed(conn, logger, token, detail, reason)
 
+                            log_task_metrics(logger, activity_name, activity_task, activity_result)
+
                         else:
                             reason = 'error: could not load object %s\n' % activity_name
                             detail = ''
@@ -192,9 +197,36 @@ def get_activity_object(activity_name, settings, logger, conn, token, activity_t
     activity_object = f(settings, logger, conn, token, activity_task)
     return activity_object
 
+def task_metrics_record(activity_name, activity_task, activity_result):
+    """
+    Build one structured record of the request counts, latencies and spans
+    of the activity task that was just processed
+    """
+    record = {
+        'activity': activity_name,
+        'workflow_id': activity_task.get('workflowExecution', {}).get('workflowId'),
+        'activity_id': activity_task.get('activityId'),
+        'result': str(activity_result)
+    }
+    record.update(metrics.current().to_dict())
+    return record
+
+def log_task_metrics(logger, activity_name, activity_task, activity_result):
+    """
+    Log the task metrics as JSON, and add the call counts per backend to the
+    New Relic background task
+    """
+    record = task_metrics_record(activity_name, activity_task, activity_result)
+    logger.info('task metrics: %s' % json.dumps(record, sort_keys=True))
+    for name, call in record['calls'].items():
+        if '.' not in name:
+            newrelic.agent.add_custom_parameter(name + '_calls', call['count'])
+            newrelic.agent.add_custom_parameter(name + '_seconds', call['seconds'])
+
 def _log_swf_response_error(logger, e):
     logger.exception('SWFResponseError: status %s, reason %s, body %s', e.status, e.reason, e.body)
 
+@metrics.timed('swf')
 def respond_completed(conn, logger, token, message):
     """
     Given an SWF connection and logger as resources,
@@ -207,6 +239,7 @@ def respond_completed(conn, logger, token, message):
     except boto.exception.SWFResponseError as e:
         _log_swf_response_error(logger, e)
 
+@metrics.timed('swf')
 def respond_failed(conn, logger, token, details, reason):
     """
     Given an SWF connection and logger as resources,
@@ -219,6 +252,7 @@ def respond_failed(conn, logger, token, details, reason):
     except boto.exception.SWFResponseError as e:
         _log_swf_response_error(logger, e)
 
+@metrics.timed('swf')
 def signal_fail_workflow(conn, logger, domain, workflow_id, run_id):
     """
     Given an SWF connection and logger as resources,
@@ -8,6 +8,14 @@ import time
 Amazon SWF workflow base class
 """
 
+# history events that close a scheduled activity task, and their attributes key
+ACTIVITY_CLOSED_EVENTS = {
+    "ActivityTaskCompleted": "activityTaskCompletedEventAttributes",
+    "ActivityTaskFailed": "activityTaskFailedEventAttributes",
+    "ActivityTaskTimedOut": "activityTaskTimedOutEventAttributes",
+    "ActivityTaskCanceled": "activityTaskCanceledEventAttributes",
+}
+
 class workflow(object):
     # Base class for extending
     def __init__(self, settings, logger, conn=None, token=None, decision=None,
@@ -75,69 +83,55 @@ class workflow(object):
         out = self.conn.respond_decision_task_completed(self.token, d._data)
         self.logger.info('respond_decision_task_completed returned %s' % out)
 
-    def is_workflow_complete(self):
+    def get_activities(self):
         """
-        Check each step was completed to determine if workflow is complete
+        Return (activity, requirements) for each activity of the workflow definition,
+        requirements being the activity IDs that must complete before it can start.
+        A step is a single activity or a list of activities to run in parallel, an
+        activity requires every activity of the previous step unless it lists its own
+        "requirements", which lets a workflow declare a graph of activities
         """
+        activities = []
+        previous_ids = []
         for step in self.definition["steps"]:
             # Check for single or multiple activities in the step
-            if type(step) == list:
-                # Is a list of activities to complete in parallel
-                for p_activity in step:
-                    activityType = p_activity["activity_type"]
-                    activityID = p_activity["activity_id"]
-                    if self.activity_status(self.decision, activityType, activityID) is False:
-                        return False
-            else:
-                # A single activity
-                activityType = step["activity_type"]
-                activityID = step["activity_id"]
-
-                if self.activity_status(self.decision, activityType, activityID) is False:
-                    return False
+            if type(step) != list:
+                step = [step]
+            for activity in step:
+                requirements = activity.get("requirements")
+                if requirements is None:
+                    requirements = previous_ids
+                activities.append((activity, requirements))
+            previous_ids = [activity["activity_id"] for activity in step]
+        return activities
 
+    def is_workflow_complete(self):
+        """
+        Check each step was completed to determine if workflow is complete
+        """
+        states = self.activity_states(self.decision)
+        for activity, requirements in self.get_activities():
+            key = (activity["activity_type"], activity["activity_id"])
+            if states.get(key) != "completed":
+                return False
         return True
 
     def get_next_activities(self):
         """
-        For each step of a workflow, determine which activities are completed
-        and return the activities to start next
+        Determine which activities are completed or still running and return all the
+        activities ready to start next, those whose requirements are all completed
         """
-        activities = []
-
-        for step in self.definition["steps"]:
-            # Check for single or multiple activities in the step
-            if type(step) == list:
-                # Is a list of activities to complete in parallel
-                # Check if the entire list of activities is completed
-                all_completed = True
-                none_started = True
-                for p_activity in step:
-                    activityType = p_activity["activity_type"]
-                    activityID = p_activity["activity_id"]
-                    if self.activity_status(self.decision, activityType, activityID) is False:
-                        all_completed = False
-                    if self.activity_status(self.decision, activityType, activityID) is True:
-                        none_started = False
-                if all_completed == False and none_started is True:
-                    # A fresh step not started yet, add the activities
-                    for p_activity in step:
-                        activities.append(p_activity)
-
-            else:
-                # A single activity
-                activityType = step["activity_type"]
-                activityID = step["activity_id"]
-
-                if self.activity_status(self.decision, activityType, activityID) is False:
-                    # Only add one activity at a time, for now
-                    #if(len(activities) == 0):
-                    activities.append(step)
-
-            # Return the activities not completed yet
-            if len(activities) > 0:
-                return activities
+        states = self.activity_states(self.decision)
+        completed_ids = set(activity_id for (activity_type, activity_id), state
+                            in states.items() if state == "completed")
 
+        activities = []
+        for activity, requirements in self.get_activities():
+            key = (activity["activity_type"], activity["activity_id"])
+            if states.get(key) in ("completed", "open"):
+                continue
+            if all(activity_id in completed_ids for activity_id in requirements):
+                activities.append(activity)
         return activities
 
     def schedule_activity(self, activity, d=None):
@@ -238,6 +232,33 @@ class workflow(object):
         # Default
         return False
 
+    def activity_states(self, decision):
+        """
+        Given a decision response from SWF, return the state of each activity
+        scheduled so far keyed by (activityType, activityID): "completed" once it has
+        completed, "open" while it is scheduled or running, otherwise "closed"
+        when it failed, timed out or was cancelled
+        """
+        scheduled = {}
+        states = {}
+        for event in decision["events"]:
+            event_type = event.get("eventType")
+            if event_type == "ActivityTaskScheduled":
+                attributes = event["activityTaskScheduledEventAttributes"]
+                key = (attributes["activityType"]["name"], attributes["activityId"])
+                scheduled[event["eventId"]] = key
+                if states.get(key) != "completed":
+                    states[key] = "open"
+            elif event_type in ACTIVITY_CLOSED_EVENTS:
+                attributes = event[ACTIVITY_CLOSED_EVENTS[event_type]]
+                key = scheduled.get(attributes["scheduledEventId"])
+                if key is not None and states.get(key) != "completed":
+                    if event_type == "ActivityTaskCompleted":
+                        states[key] = "completed"
+                    else:
+                        states[key] = "closed"
+        return states
+
     def last_activity_status(self, decision):
         """
         Given a decision response from SWF, determine whether the
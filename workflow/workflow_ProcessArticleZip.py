@@ -32,6 +32,8 @@ class workflow_ProcessArticleZip(workflow.workflow):
                     "requirements": None
                 },
 
+            # after VerifyLaxResponse, ScheduleCrossref, ConvertJATS then
+            # SetPublicationStatus, ResizeImages and DepositAssets run in parallel
             "steps":
                 [
                     {
@@ -73,6 +75,7 @@ class workflow_ProcessArticleZip(workflow.workflow):
                         "version": "1",
                         "input": data,
                         "control": None,
+                        "requirements": ["VerifyLaxResponse"],
                         "heartbeat_timeout": 60 * 5,
                         "schedule_to_close_timeout": 60 * 5,
                         "schedule_to_start_timeout": 300,
@@ -95,6 +98,7 @@ class workflow_ProcessArticleZip(workflow.workflow):
                         "version": "1",
                         "input": data,
                         "control": None,
+                        "requirements": ["VerifyLaxResponse"],
                         "heartbeat_timeout": 60 * 30,
                         "schedule_to_close_timeout": 60 * 30,
                         "schedule_to_start_timeout": 300,
@@ -106,6 +110,7 @@ class workflow_ProcessArticleZip(workflow.workflow):
                         "version": "1",
                         "input": data,
                         "control": None,
+                        "requirements": ["VerifyLaxResponse"],
                         "heartbeat_timeout": 60 * 5,
                         "schedule_to_close_timeout": 60 * 5,
                         "schedule_to_start_timeout": 300,
@@ -117,6 +122,8 @@ class workflow_ProcessArticleZip(workflow.workflow):
                         "version": "1",
                         "input": data,
                         "control": None,
+                        "requirements": ["ScheduleCrossref", "SetPublicationStatus",
+                                         "ResizeImages", "DepositAssets"],
                         "heartbeat_timeout": 60 * 5,
                         "schedule_to_close_timeout": 60 * 5,
                         "schedule_to_start_timeout": 300,